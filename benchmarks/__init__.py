@@ -0,0 +1 @@
+"""Offline benchmarks for classic-rag components. Run modules with `python -m benchmarks.<name>`."""
@@ -0,0 +1,125 @@
+"""
+Measures what storing embeddings as float32 arrays saves over lists of Python
+floats, the representation DocumentChunk used before.
+
+- memory: bytes allocated (tracemalloc) per chunk held after parsing an
+  /ingest body of --chunks chunks, including the ~1 KB of chunk text.
+- ingest: size and parse time of an /ingest body with embeddings as JSON
+  number arrays (legacy model) vs JSON arrays and base64 (current model).
+- sources: size and serialization time of a /chat response with --top-k
+  sources that carry their embeddings.
+
+    python -m benchmarks.embedding_representation --dim 1536 --chunks 2000
+"""
+import argparse
+import base64
+import json
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+from src.core.domain import DocumentChunk, LLMResponse
+
+class LegacyChunk(BaseModel):
+    id: str
+    content: str
+    metadata: Dict[str, Any] = Field(default_factory=dict)
+    embedding: Optional[List[float]] = None
+
+class LegacyIngestRequest(BaseModel):
+    chunks: List[LegacyChunk]
+
+class IngestRequest(BaseModel):
+    chunks: List[DocumentChunk]
+
+class LegacyResponse(BaseModel):
+    answer: str
+    sources: List[LegacyChunk]
+
+def timed(function: Callable[[], Any], repeat: int) -> float:
+    """Best of `repeat` runs, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+def allocated(build: Callable[[], Any]) -> int:
+    tracemalloc.start()
+    kept = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return size
+
+def chunk_fields(i: int) -> Dict[str, Any]:
+    return {"id": f"chunk-{i}", "content": "lorem ipsum " * 80, "metadata": {"source": "doc.txt", "chunk_index": i}}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    vectors = np.random.default_rng(0).standard_normal((args.chunks, args.dim)).astype(np.float32)
+    as_lists = vectors.tolist()
+    results: Dict[str, Any] = {"dim": args.dim, "chunks": args.chunks}
+
+    body_lists = json.dumps({"chunks": [dict(chunk_fields(i), embedding=as_lists[i]) for i in range(args.chunks)]})
+    body_base64 = json.dumps({"chunks": [
+        dict(chunk_fields(i), embedding=base64.b64encode(vectors[i].astype("<f4").tobytes()).decode("ascii"))
+        for i in range(args.chunks)
+    ]})
+    # Parsed from the request body, as /ingest does, so every float is a new object
+    legacy_bytes = allocated(lambda: LegacyIngestRequest.model_validate_json(body_lists))
+    array_bytes = allocated(lambda: IngestRequest.model_validate_json(body_base64))
+    results["memory_kb_per_chunk"] = {
+        "list": round(legacy_bytes / args.chunks / 1024, 1),
+        "float32": round(array_bytes / args.chunks / 1024, 1),
+    }
+    results["ingest"] = {
+        "json_mb": round(len(body_lists) / 1024 ** 2, 1),
+        "base64_mb": round(len(body_base64) / 1024 ** 2, 1),
+        "parse_ms_list_model": round(timed(lambda: LegacyIngestRequest.model_validate_json(body_lists), args.repeat), 1),
+        "parse_ms_json": round(timed(lambda: IngestRequest.model_validate_json(body_lists), args.repeat), 1),
+        "parse_ms_base64": round(timed(lambda: IngestRequest.model_validate_json(body_base64), args.repeat), 1),
+    }
+
+    legacy_response = LegacyResponse(answer="answer", sources=[
+        LegacyChunk(**chunk_fields(i), embedding=as_lists[i]) for i in range(args.top_k)
+    ])
+    response = LLMResponse(answer="answer", sources=[
+        DocumentChunk(**chunk_fields(i), embedding=vectors[i]) for i in range(args.top_k)
+    ])
+    results["sources"] = {
+        "legacy_kb": round(len(legacy_response.model_dump_json()) / 1024, 1),
+        "current_kb": round(len(response.model_dump_json()) / 1024, 1),
+        "legacy_ms": round(timed(legacy_response.model_dump_json, args.repeat * 20), 3),
+        "current_ms": round(timed(response.model_dump_json, args.repeat * 20), 3),
+    }
+
+    memory, ingest, sources = results["memory_kb_per_chunk"], results["ingest"], results["sources"]
+    print(f"memory per chunk:  list {memory['list']} KB   float32 {memory['float32']} KB")
+    print(
+        f"ingest body:       JSON arrays {ingest['json_mb']} MB   base64 {ingest['base64_mb']} MB\n"
+        f"ingest parse:      list model {ingest['parse_ms_list_model']} ms   "
+        f"JSON arrays {ingest['parse_ms_json']} ms   base64 {ingest['parse_ms_base64']} ms"
+    )
+    print(
+        f"/chat response:    with embeddings {sources['legacy_kb']} KB in {sources['legacy_ms']} ms   "
+        f"without {sources['current_kb']} KB in {sources['current_ms']} ms"
+    )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
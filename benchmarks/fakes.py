@@ -0,0 +1,59 @@
+"""
+Deterministic stand-ins for external services, so benchmarks measure the
+pipeline itself rather than OpenAI.
+"""
+import asyncio
+import hashlib
+import random
+from typing import AsyncIterator, List
+
+import numpy as np
+
+from src.core.domain import DocumentChunk
+from src.ports.llm import LLMPort
+
+class FakeLLM(LLMPort):
+    """
+    LLMPort with hash-seeded embeddings: the same text always maps to the same
+    unit vector, independent of process or call order. Every request (one
+    embedding batch, one answer) sleeps `latency_ms` plus up to `jitter_ms` of
+    seeded random jitter to model network round trips.
+    """
+
+    def __init__(self, dim: int = 1536, latency_ms: float = 0.0, jitter_ms: float = 0.0, seed: int = 0):
+        self.dim = dim
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self._rng = random.Random(seed)
+        self.embedding_requests = 0
+        self.embedded_texts = 0
+        self.answer_requests = 0
+
+    def embed(self, text: str) -> List[float]:
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+        vector = np.random.default_rng(seed).standard_normal(self.dim, dtype=np.float32)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    async def _round_trip(self) -> None:
+        delay = self.latency_ms + self._rng.uniform(0, self.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+    async def generate_answer(self, query: str, context_chunks: List[DocumentChunk]) -> str:
+        self.answer_requests += 1
+        await self._round_trip()
+        return f"Answer to {query!r} from {len(context_chunks)} chunks."
+
+    async def stream_answer(self, query: str, context_chunks: List[DocumentChunk]) -> AsyncIterator[str]:
+        answer = await self.generate_answer(query, context_chunks)
+        for word in answer.split(" "):
+            yield word + " "
+
+    async def generate_embeddings(self, text: str) -> List[float]:
+        return (await self.generate_embeddings_batch([text]))[0]
+
+    async def generate_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
+        self.embedding_requests += 1
+        self.embedded_texts += len(texts)
+        await self._round_trip()
+        return [self.embed(text) for text in texts]
@@ -0,0 +1,125 @@
+"""
+Compares the local hashing embedding backend with the remote OpenAI one.
+
+A corpus (synthetic text, or the .txt files under --corpus) is chunked, and
+queries are sentences sampled from the chunks, so every query has a known
+source chunk. For each backend the benchmark reports embedding throughput,
+single-query embedding latency and hit@k (share of queries whose source chunk
+is in the top k). With --remote, it also reports overlap@k: the average share
+of the remote top-k that the local backend retrieves too.
+
+--remote calls the OpenAI API and needs a real OPENAI_API_KEY:
+
+    python -m benchmarks.local_embeddings --size-mb 5
+    python -m benchmarks.local_embeddings --size-mb 1 --remote --max-chunks 2000
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import statistics
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+import structlog
+
+# Settings() reads the API key from the environment; the remote path needs a real one
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from benchmarks.chunking import synthetic_pages
+from src.adapters.hashing_embedding_adapter import HashingEmbeddingAdapter
+from src.adapters.openai_adapter import OpenAIAdapter
+from src.config import Settings
+from src.core.chunking import CharacterChunker
+from src.ports.llm import LLMPort
+
+def corpus(args: argparse.Namespace) -> List[str]:
+    if args.corpus:
+        pages = [path.read_text(errors="ignore") for path in sorted(Path(args.corpus).rglob("*.txt"))]
+    else:
+        pages = list(synthetic_pages(int(args.size_mb * 1024 * 1024)))
+    chunks = list(CharacterChunker(chunk_size=args.chunk_size, overlap=args.chunk_size // 5).chunks(pages))
+    return chunks[:args.max_chunks] if args.max_chunks else chunks
+
+def queries(chunks: List[str], count: int) -> List[Tuple[str, int]]:
+    rng = random.Random(0)
+    sampled = []
+    for index in rng.sample(range(len(chunks)), min(count, len(chunks))):
+        sentences = [s.strip() for s in chunks[index].split(".") if len(s.strip().split()) >= 5]
+        if sentences:
+            sampled.append((rng.choice(sentences) + "?", index))
+    return sampled
+
+def top_k(matrix: np.ndarray, query_matrix: np.ndarray, k: int) -> np.ndarray:
+    scores = query_matrix @ matrix.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+async def evaluate(name: str, llm: LLMPort, chunks: List[str], sampled: List[Tuple[str, int]], args) -> Dict:
+    started = time.perf_counter()
+    embeddings = []
+    for start in range(0, len(chunks), args.batch_size):
+        embeddings.extend(await llm.generate_embeddings_batch(chunks[start:start + args.batch_size]))
+    elapsed = time.perf_counter() - started
+
+    latencies, query_vectors = [], []
+    for query, _ in sampled:
+        query_started = time.perf_counter()
+        query_vectors.append(await llm.generate_embeddings(query))
+        latencies.append((time.perf_counter() - query_started) * 1000)
+
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+    query_matrix = np.asarray(query_vectors, dtype=np.float32)
+    top = top_k(matrix, query_matrix, args.k)
+    hits = [source in row for (_, source), row in zip(sampled, top.tolist())]
+    return {
+        "backend": name,
+        "chunks_per_sec": round(len(chunks) / elapsed, 1),
+        "query_p50_ms": round(statistics.median(latencies), 3),
+        f"hit@{args.k}": round(sum(hits) / len(hits), 3),
+        "top": top,
+    }
+
+async def main_async(args: argparse.Namespace) -> None:
+    chunks = corpus(args)
+    sampled = queries(chunks, args.queries)
+    print(f"{len(chunks)} chunks, {len(sampled)} queries")
+
+    settings = Settings()
+    backends: List[Tuple[str, LLMPort]] = [("hashing", HashingEmbeddingAdapter(None, dim=args.dim))]
+    if args.remote:
+        backends.append(("openai", OpenAIAdapter(settings)))
+
+    results = [await evaluate(name, llm, chunks, sampled, args) for name, llm in backends]
+    print(f"{'backend':<8} {'chunks/s':>10} {'query p50 ms':>13} {f'hit@{args.k}':>8}")
+    for result in results:
+        print(
+            f"{result['backend']:<8} {result['chunks_per_sec']:>10} "
+            f"{result['query_p50_ms']:>13} {result[f'hit@{args.k}']:>8}"
+        )
+    if len(results) == 2:
+        local, remote = results[0]["top"], results[1]["top"]
+        overlap = np.mean([len(set(a) & set(b)) / args.k for a, b in zip(local.tolist(), remote.tolist())])
+        print(f"overlap@{args.k} (local vs remote top-{args.k}): {overlap:.3f}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=float, default=5)
+    parser.add_argument("--corpus", help="Directory of .txt files to use instead of synthetic text")
+    parser.add_argument("--max-chunks", type=int, default=0, help="Limit the corpus (0: no limit)")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--remote", action="store_true", help="Also embed with the OpenAI API")
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    asyncio.run(main_async(args))
+
+if __name__ == "__main__":
+    main()
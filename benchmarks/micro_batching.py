@@ -0,0 +1,84 @@
+"""
+Shows the throughput/latency tradeoff of micro-batching query embeddings.
+
+Concurrent clients each embed a stream of distinct queries through
+`BatchingLLMAdapter` wrapping `FakeLLM`, whose every request costs a fixed
+round trip. For each concurrency level and `max_wait_ms` setting the
+benchmark reports embeddings/sec, per-call p50/p95 latency, the number of
+upstream requests, and the batcher's mean batch size and queue wait.
+`max_wait_ms=off` calls the fake LLM directly, one request per query.
+
+    python -m benchmarks.micro_batching --concurrency 1 16 64 --max-wait-ms 0 2 5 --llm-latency-ms 50
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+from typing import Dict, List, Optional
+
+import structlog
+
+from benchmarks.fakes import FakeLLM
+from src.adapters.batching_llm_adapter import BatchingLLMAdapter
+
+async def run(concurrency: int, max_wait_ms: Optional[float], args: argparse.Namespace) -> Dict:
+    llm = FakeLLM(dim=args.dim, latency_ms=args.llm_latency_ms, jitter_ms=args.llm_jitter_ms)
+    port = llm if max_wait_ms is None else BatchingLLMAdapter(llm, max_batch_size=args.max_batch_size, max_wait_ms=max_wait_ms)
+    latencies: List[float] = []
+
+    async def client(index: int) -> None:
+        for i in range(args.queries_per_client):
+            started = time.perf_counter()
+            await port.generate_embeddings(f"client {index} question {i}")
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+
+    stats = port.stats() if isinstance(port, BatchingLLMAdapter) else {"mean_batch_size": 1.0, "mean_wait_ms": 0.0}
+    return {
+        "concurrency": concurrency,
+        "max_wait_ms": max_wait_ms,
+        "embeddings": len(latencies),
+        "embeddings_per_sec": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2], 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95)], 2),
+        "upstream_requests": llm.embedding_requests,
+        "mean_batch_size": stats["mean_batch_size"],
+        "mean_wait_ms": stats["mean_wait_ms"],
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--max-wait-ms", type=float, nargs="+", default=[0, 2, 5])
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--queries-per-client", type=int, default=20)
+    parser.add_argument("--llm-latency-ms", type=float, default=50.0)
+    parser.add_argument("--llm-jitter-ms", type=float, default=10.0)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--json", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    results = []
+    print(f"{'clients':>7} {'wait ms':>7} {'emb/s':>8} {'p50 ms':>7} {'p95 ms':>7} {'requests':>8} {'batch':>6} {'queued ms':>9}")
+    for concurrency in args.concurrency:
+        for max_wait_ms in [None] + args.max_wait_ms:
+            result = asyncio.run(run(concurrency, max_wait_ms, args))
+            results.append(result)
+            print(
+                f"{concurrency:>7} {'off' if max_wait_ms is None else f'{max_wait_ms:g}':>7} "
+                f"{result['embeddings_per_sec']:>8} {result['p50_ms']:>7} {result['p95_ms']:>7} "
+                f"{result['upstream_requests']:>8} {result['mean_batch_size']:>6} {result['mean_wait_ms']:>9}"
+            )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+End-to-end pipeline benchmark with a deterministic fake LLM.
+
+For every vector store and corpus size, a fresh store is filled through
+`RAGService.process_file_upload` (synthetic .txt documents through the real
+document processor and chunker), then through `ingest_documents` with
+pre-chunked text, and finally queried with `answer_query`. Embeddings and
+answers come from `benchmarks.fakes.FakeLLM`, so the numbers are the
+pipeline's own overhead plus whatever latency is injected.
+
+Each run happens in a fresh subprocess so peak RSS is per configuration.
+Results are written as JSON together with the commit and environment, and a
+previous results file can be passed to `--compare` to print relative changes.
+
+    python -m benchmarks.pipeline --sizes-mb 1 5 --stores chroma numpy --json before.json
+    python -m benchmarks.pipeline --sizes-mb 1 5 --stores chroma numpy --compare before.json
+"""
+import argparse
+import asyncio
+import io
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Dict, List
+
+import structlog
+
+from benchmarks.chunking import synthetic_pages
+from benchmarks.fakes import FakeLLM
+from src.adapters.chroma_adapter import ChromaAdapter
+from src.adapters.document_processor_adapter import LocalDocumentProcessor
+from src.adapters.numpy_adapter import NumpyAdapter
+from src.config import Settings
+from src.core.domain import DocumentChunk
+from src.core.rag_service import RAGService
+from src.ports.storage import VectorStoragePort
+
+STORES = ("chroma", "numpy", "numpy-int8")
+
+def build_store(name: str, directory: str) -> VectorStoragePort:
+    if name == "chroma":
+        return ChromaAdapter(Settings(
+            OPENAI_API_KEY="benchmark", CHROMA_PERSIST_DIRECTORY=directory, CHROMA_COLLECTION_NAME="benchmark"
+        ))
+    return NumpyAdapter(Settings(
+        OPENAI_API_KEY="benchmark",
+        NUMPY_STORE_DIRECTORY=directory,
+        NUMPY_STORE_QUANTIZATION="int8" if name == "numpy-int8" else "none",
+    ))
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, round(p / 100 * len(sorted_values)) - 1))
+    return round(sorted_values[index], 2)
+
+def documents(size_mb: float, doc_kb: int) -> List[str]:
+    docs, current, current_len = [], [], 0
+    for page in synthetic_pages(int(size_mb * 1024 * 1024)):
+        current.append(page)
+        current_len += len(page)
+        if current_len >= doc_kb * 1024:
+            docs.append("".join(current))
+            current, current_len = [], 0
+    if current:
+        docs.append("".join(current))
+    return docs
+
+async def run_async(store_name: str, size_mb: float, args: argparse.Namespace) -> Dict:
+    llm = FakeLLM(dim=args.dim, latency_ms=args.llm_latency_ms, jitter_ms=args.llm_jitter_ms)
+    docs = documents(size_mb, args.doc_kb)
+    rng = random.Random(0)
+
+    with tempfile.TemporaryDirectory() as directory:
+        service = RAGService(
+            storage=build_store(store_name, directory),
+            llm=llm,
+            doc_processor=LocalDocumentProcessor(),
+            ingest_batch_size=args.batch_size,
+        )
+
+        # 1. Upload path: extraction, chunking, embedding and upserts
+        started = time.perf_counter()
+        upload_chunks = 0
+        for i, doc in enumerate(docs):
+            result = await service.process_file_upload(doc.encode("utf-8"), f"doc_{i}.txt")
+            upload_chunks += result.chunks_ingested
+        upload_seconds = time.perf_counter() - started
+
+        # 2. Direct ingestion of pre-chunked text
+        texts = [page for doc in docs for page in doc.split("\n\n") if page.strip()][:args.ingest_chunks]
+        chunks = [
+            DocumentChunk(id=f"raw_{i}", content=text, metadata={"source": "raw.txt", "chunk_index": i})
+            for i, text in enumerate(texts)
+        ]
+        started = time.perf_counter()
+        for start in range(0, len(chunks), args.batch_size):
+            await service.ingest_documents(chunks[start:start + args.batch_size])
+        ingest_seconds = time.perf_counter() - started
+
+        # 3. Queries: sentences sampled from the corpus
+        sentences = [s.strip() + "." for doc in rng.sample(docs, min(len(docs), 8)) for s in doc.split(".") if s.strip()]
+        latencies = []
+        for query in rng.sample(sentences, min(args.queries, len(sentences))):
+            started = time.perf_counter()
+            await service.answer_query(query)
+            latencies.append((time.perf_counter() - started) * 1000)
+        latencies.sort()
+
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss_mb = peak_rss / (1024 * 1024) if sys.platform == "darwin" else peak_rss / 1024
+
+    return {
+        "store": store_name,
+        "size_mb": size_mb,
+        "documents": len(docs),
+        "upload_chunks": upload_chunks,
+        "upload_chunks_per_sec": round(upload_chunks / upload_seconds, 1),
+        "ingest_chunks": len(chunks),
+        "ingest_chunks_per_sec": round(len(chunks) / ingest_seconds, 1) if chunks else None,
+        "queries": len(latencies),
+        "query_p50_ms": percentile(latencies, 50),
+        "query_p95_ms": percentile(latencies, 95),
+        "query_p99_ms": percentile(latencies, 99),
+        "embedding_requests": llm.embedding_requests,
+        "peak_rss_mb": round(peak_rss_mb, 1),
+    }
+
+def run(store_name: str, size_mb: float, args: argparse.Namespace) -> Dict:
+    # Logging every batch and query would dominate the measurements
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    return asyncio.run(run_async(store_name, size_mb, args))
+
+def environment() -> Dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = bool(subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True
+        ).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        commit, dirty = None, None
+    return {
+        "commit": commit,
+        "dirty": dirty,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+def compare(results: List[Dict], baseline_path: str) -> None:
+    with open(baseline_path) as f:
+        baseline = {(r["store"], r["size_mb"]): r for r in json.load(f)["results"]}
+    metrics = ("upload_chunks_per_sec", "ingest_chunks_per_sec", "query_p50_ms", "query_p95_ms", "peak_rss_mb")
+    print(f"\nChange vs {baseline_path} (throughput: higher is better, latency/RSS: lower is better)")
+    for result in results:
+        before = baseline.get((result["store"], result["size_mb"]))
+        if before is None:
+            continue
+        changes = []
+        for metric in metrics:
+            if before.get(metric) and result.get(metric) is not None:
+                changes.append(f"{metric}={(result[metric] / before[metric] - 1) * 100:+.1f}%")
+        print(f"{result['store']:<11} {result['size_mb']:>6g} MB  " + "  ".join(changes))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes-mb", type=float, nargs="+", default=[1, 5])
+    parser.add_argument("--stores", nargs="+", choices=STORES, default=list(STORES))
+    parser.add_argument("--doc-kb", type=int, default=256, help="Size of each uploaded document")
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--ingest-chunks", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0)
+    parser.add_argument("--llm-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--json", help="Write results as JSON to this path")
+    parser.add_argument("--compare", help="Previous --json output to compare against")
+    args = parser.parse_args()
+
+    results = []
+    context = multiprocessing.get_context("spawn")
+    print(
+        f"{'store':<11} {'MB':>6} {'upload c/s':>11} {'ingest c/s':>11} "
+        f"{'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7} {'RSS MB':>7}"
+    )
+    for size_mb in args.sizes_mb:
+        for store_name in args.stores:
+            with context.Pool(1) as pool:
+                result = pool.apply(run, (store_name, size_mb, args))
+            results.append(result)
+            print(
+                f"{store_name:<11} {size_mb:>6g} {result['upload_chunks_per_sec']:>11} "
+                f"{result['ingest_chunks_per_sec']:>11} {result['query_p50_ms']:>7} "
+                f"{result['query_p95_ms']:>7} {result['query_p99_ms']:>7} {result['peak_rss_mb']:>7}"
+            )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"environment": environment(), "arguments": vars(args), "results": results}, f, indent=2)
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
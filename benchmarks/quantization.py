@@ -0,0 +1,123 @@
+"""
+Compares exact float32 search in the NumPy vector store with int8 quantized
+search at several re-rank factors.
+
+A synthetic corpus of clustered unit vectors (closer to real embeddings than
+uniform noise) is written to a temporary store. For every configuration the
+same queries are run through `NumpyAdapter.search`; recall@k is measured
+against exact search, and `scan_mb` is the size of the arrays each query
+scans (float32 vectors, or int8 codes plus per-row scales).
+
+    python -m benchmarks.quantization --rows 100000 --dim 1536 --json quantization.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import tempfile
+import time
+from typing import List
+
+import numpy as np
+import structlog
+
+from src.adapters.numpy_adapter import NumpyAdapter
+from src.config import Settings
+from src.core.domain import DocumentChunk, SearchQuery
+
+def synthetic_vectors(rows: int, dim: int, clusters: int = 64, noise: float = 0.6, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, clusters, rows)] + noise * rng.standard_normal((rows, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def open_store(directory: str, quantization: str, rerank_factor: int = 4) -> NumpyAdapter:
+    return NumpyAdapter(Settings(
+        OPENAI_API_KEY="benchmark",
+        NUMPY_STORE_DIRECTORY=directory,
+        NUMPY_STORE_QUANTIZATION=quantization,
+        NUMPY_STORE_RERANK_FACTOR=rerank_factor,
+    ))
+
+async def load(store: NumpyAdapter, vectors: np.ndarray, batch_size: int = 5000) -> None:
+    for start in range(0, len(vectors), batch_size):
+        await store.upsert([
+            DocumentChunk(id=str(start + i), content="", metadata={"source": "synthetic"}, embedding=vector)
+            for i, vector in enumerate(vectors[start:start + batch_size])
+        ])
+
+async def run(store: NumpyAdapter, queries: List[List[float]], top_k: int):
+    ids, latencies = [], []
+    for query in queries:
+        started = time.perf_counter()
+        results = await store.search(SearchQuery(query="q", embedding=query, top_k=top_k))
+        latencies.append((time.perf_counter() - started) * 1000)
+        ids.append([r.chunk.id for r in results])
+    return ids, latencies
+
+async def main_async(args) -> List[dict]:
+    vectors = synthetic_vectors(args.rows, args.dim)
+    # Queries are perturbed corpus vectors, so each has close neighbours
+    rng = np.random.default_rng(1)
+    queries = vectors[rng.integers(0, args.rows, args.queries)] + 0.3 * rng.standard_normal((args.queries, args.dim))
+    queries = queries.astype(np.float32).tolist()
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        store = open_store(directory, "int8")
+        await load(store, vectors)
+
+        configs = [("none", 1)] + [("int8", factor) for factor in args.rerank_factors]
+        exact_ids = None
+        for quantization, factor in configs:
+            store = open_store(directory, quantization, factor)
+            if quantization == "none":
+                exact_ids, latencies = await run(store, queries, args.top_k)
+                recall = 1.0
+                scan_bytes = args.rows * args.dim * 4
+            else:
+                ids, latencies = await run(store, queries, args.top_k)
+                recall = statistics.mean(
+                    len(set(found) & set(expected)) / len(expected) for found, expected in zip(ids, exact_ids)
+                )
+                scan_bytes = args.rows * (args.dim + 4)
+            latencies.sort()
+            results.append({
+                "quantization": quantization,
+                "rerank_factor": factor if quantization == "int8" else None,
+                "rows": args.rows,
+                "dim": args.dim,
+                "top_k": args.top_k,
+                f"recall_at_{args.top_k}": round(recall, 4),
+                "scan_mb": round(scan_bytes / (1024 * 1024), 1),
+                "p50_ms": round(latencies[len(latencies) // 2], 2),
+                "p95_ms": round(latencies[int(len(latencies) * 0.95)], 2),
+            })
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--rerank-factors", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--json", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    results = asyncio.run(main_async(args))
+    print(f"{'mode':<6} {'rerank':>6} {'recall':>7} {'scan MB':>8} {'p50 ms':>7} {'p95 ms':>7}")
+    for result in results:
+        print(
+            f"{result['quantization']:<6} {result['rerank_factor'] or '-':>6} "
+            f"{result[f'recall_at_{args.top_k}']:>7} {result['scan_mb']:>8} {result['p50_ms']:>7} {result['p95_ms']:>7}"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Search latency and rebuild time of the sharded vector store per shard count.
+
+A synthetic corpus of clustered unit vectors, grouped into sources of
+--chunks-per-source chunks, is loaded into a fresh store for every store kind
+and shard count (1 means the plain adapter, without ShardedVectorStore).
+Reported per configuration:
+
+- load_s: time to upsert the corpus.
+- p50_ms / p95_ms: latency of single searches, run one at a time.
+- batch_ms: one search_many call with all queries.
+- rebuild_s: time to clear one shard and upsert its chunks again, the cost of
+  rebuilding a shard (with one shard, the whole store).
+
+    python -m benchmarks.sharding --rows 200000 --dim 384 --shards 1 2 4 8
+    python -m benchmarks.sharding --stores chroma numpy --rows 50000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Dict, List
+
+import numpy as np
+import structlog
+
+from benchmarks.quantization import synthetic_vectors
+from src.adapters.chroma_adapter import ChromaAdapter
+from src.adapters.numpy_adapter import NumpyAdapter
+from src.adapters.sharded_storage_adapter import ShardedVectorStore
+from src.config import Settings
+from src.core.domain import DocumentChunk, SearchQuery
+from src.ports.storage import VectorStoragePort
+
+def build_store(kind: str, directory: str, shards: int) -> VectorStoragePort:
+    def create(shard: int) -> VectorStoragePort:
+        if kind == "chroma":
+            return ChromaAdapter(Settings(
+                OPENAI_API_KEY="benchmark", CHROMA_PERSIST_DIRECTORY=directory, CHROMA_COLLECTION_NAME=f"shard{shard}"
+            ))
+        return NumpyAdapter(Settings(
+            OPENAI_API_KEY="benchmark", NUMPY_STORE_DIRECTORY=os.path.join(directory, f"shard{shard}")
+        ))
+
+    if shards == 1:
+        return create(0)
+    return ShardedVectorStore([create(shard) for shard in range(shards)])
+
+async def load(store: VectorStoragePort, chunks: List[DocumentChunk], batch_size: int = 5000) -> None:
+    for start in range(0, len(chunks), batch_size):
+        await store.upsert(chunks[start:start + batch_size])
+
+async def run_config(kind: str, shards: int, chunks: List[DocumentChunk], queries: List[SearchQuery]) -> Dict:
+    with tempfile.TemporaryDirectory() as directory:
+        store = build_store(kind, directory, shards)
+        started = time.perf_counter()
+        await load(store, chunks)
+        load_seconds = time.perf_counter() - started
+
+        await store.search(queries[0])
+        latencies = []
+        for query in queries:
+            started = time.perf_counter()
+            await store.search(query)
+            latencies.append((time.perf_counter() - started) * 1000)
+        latencies.sort()
+
+        started = time.perf_counter()
+        await store.search_many(queries)
+        batch_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        if isinstance(store, ShardedVectorStore):
+            await store.clear_shard(0)
+            await load(store, [chunk for chunk in chunks if store.shard_for_source(chunk.metadata["source"]) == 0])
+        else:
+            await store.clear_all()
+            await load(store, chunks)
+        rebuild_seconds = time.perf_counter() - started
+
+    return {
+        "store": kind,
+        "shards": shards,
+        "rows": len(chunks),
+        "load_s": round(load_seconds, 2),
+        "p50_ms": round(latencies[len(latencies) // 2], 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95)], 2),
+        "batch_ms": round(batch_ms, 1),
+        "rebuild_s": round(rebuild_seconds, 2),
+    }
+
+async def main_async(args: argparse.Namespace) -> List[Dict]:
+    vectors = synthetic_vectors(args.rows, args.dim)
+    chunks = [
+        DocumentChunk(
+            id=str(i), content="", metadata={"source": f"doc{i // args.chunks_per_source}.txt"}, embedding=vector
+        )
+        for i, vector in enumerate(vectors)
+    ]
+    rng = np.random.default_rng(1)
+    query_vectors = vectors[rng.integers(0, args.rows, args.queries)] + 0.3 * rng.standard_normal((args.queries, args.dim))
+    queries = [SearchQuery(query="q", embedding=vector, top_k=args.top_k) for vector in query_vectors.astype(np.float32)]
+
+    results = []
+    for kind in args.stores:
+        for shards in args.shards:
+            result = await run_config(kind, shards, chunks, queries)
+            results.append(result)
+            print(
+                f"{kind:<7} {shards:>6} {result['load_s']:>7} {result['p50_ms']:>7} "
+                f"{result['p95_ms']:>7} {result['batch_ms']:>9} {result['rebuild_s']:>10}"
+            )
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stores", nargs="+", choices=["numpy", "chroma"], default=["numpy"])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--chunks-per-source", type=int, default=50)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--json", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    print(f"{'store':<7} {'shards':>6} {'load s':>7} {'p50 ms':>7} {'p95 ms':>7} {'batch ms':>9} {'rebuild s':>10}")
+    results = asyncio.run(main_async(args))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
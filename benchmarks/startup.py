@@ -0,0 +1,202 @@
+"""
+Cold-start and first-request latency of the app, with and without the startup
+warm-up (STARTUP_WARMUP).
+
+Every run is a fresh Python process, so imports are cold (the OS file cache is
+warm after the first run). A store of --chunks chunks is built once with
+local hashing embeddings, and OpenAI is replaced by a fake HTTP server on
+localhost, so /chat needs no network. Reported per configuration, as the
+median over --repeat runs:
+
+- import_ms: importing src.api.main.
+- startup_ms: the lifespan startup, i.e. until the server accepts requests.
+- ready_ms: from then until /ready returns 200.
+- first_ms / second_ms: the first and second /chat request after /ready.
+- total_ms: process start to the first answer (import + startup + ready + first).
+
+    python -m benchmarks.startup --stores numpy chroma --chunks 50000
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+import numpy as np
+
+QUESTIONS = ["What is the vacation policy?", "How do I file an expense report?"]
+
+class FakeOpenAI(BaseHTTPRequestHandler):
+    """Answers the model metadata and chat completion calls the app makes."""
+
+    def _reply(self, body: Dict) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        self._reply({"id": self.path.rsplit("/", 1)[-1], "object": "model", "created": 0, "owned_by": "benchmark"})
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self._reply({
+            "id": "benchmark", "object": "chat.completion", "created": 0, "model": "benchmark",
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": "answer"}, "finish_reason": "stop"}],
+        })
+
+    def log_message(self, *args) -> None:
+        pass
+
+def child_env(args: argparse.Namespace, store: str, directory: str, warm_up: bool, base_url: str) -> Dict[str, str]:
+    return dict(
+        os.environ,
+        OPENAI_API_KEY="benchmark",
+        OPENAI_BASE_URL=base_url,
+        ENV="prod",
+        EMBEDDING_BACKEND="hashing",
+        HASHING_EMBEDDING_DIM=str(args.dim),
+        VECTOR_STORE_BACKEND=store,
+        CHROMA_PERSIST_DIRECTORY=os.path.join(directory, "chroma"),
+        NUMPY_STORE_DIRECTORY=os.path.join(directory, "numpy"),
+        PDF_EXTRACTION_WORKERS=str(args.pdf_workers),
+        STARTUP_WARMUP=str(warm_up).lower(),
+    )
+
+def build_store(args: argparse.Namespace, store: str, directory: str) -> None:
+    """Fills the store the child processes open, in a child process of its own."""
+    subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--fill", "--chunks", str(args.chunks), "--dim", str(args.dim)],
+        env=child_env(args, store, directory, False, "http://127.0.0.1:9/v1"),
+        stdout=subprocess.DEVNULL,
+        check=True,
+    )
+
+def fill(chunks: int) -> None:
+    from src.api.dependencies import get_settings, get_storage_port
+    from src.core.domain import DocumentChunk
+
+    settings = get_settings()
+    store = get_storage_port(settings)
+    vectors = np.random.default_rng(0).standard_normal((chunks, settings.HASHING_EMBEDDING_DIM)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    async def upsert() -> None:
+        for start in range(0, len(vectors), 5000):
+            await store.upsert([
+                DocumentChunk(id=str(i), content=f"chunk {i}", metadata={"source": f"doc{i // 50}.txt"}, embedding=vectors[i])
+                for i in range(start, min(start + 5000, len(vectors)))
+            ])
+
+    asyncio.run(upsert())
+
+def measure() -> Dict[str, float]:
+    """Runs in a fresh process: imports the app, starts it and sends the first requests."""
+    started = time.perf_counter()
+    from src.api.main import app
+    import httpx
+
+    import_ms = (time.perf_counter() - started) * 1000
+
+    async def run() -> Dict[str, float]:
+        stage_started = time.perf_counter()
+        async with app.router.lifespan_context(app):
+            startup_ms = (time.perf_counter() - stage_started) * 1000
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+                stage_started = time.perf_counter()
+                while (await client.get("/ready")).status_code == 503:
+                    await asyncio.sleep(0.005)
+                ready_ms = (time.perf_counter() - stage_started) * 1000
+                latencies = []
+                for question in QUESTIONS:
+                    stage_started = time.perf_counter()
+                    response = await client.post("/chat", json={"message": question})
+                    response.raise_for_status()
+                    latencies.append((time.perf_counter() - stage_started) * 1000)
+        return {
+            "import_ms": import_ms,
+            "startup_ms": startup_ms,
+            "ready_ms": ready_ms,
+            "first_ms": latencies[0],
+            "second_ms": latencies[1],
+            "total_ms": import_ms + startup_ms + ready_ms + latencies[0],
+        }
+
+    return asyncio.run(run())
+
+def run_config(args: argparse.Namespace, store: str, directory: str, warm_up: bool, base_url: str) -> Dict:
+    runs = []
+    for _ in range(args.repeat):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.startup", "--child"],
+            env=child_env(args, store, directory, warm_up, base_url),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        # The app logs to stdout as well; the measurements are the last line
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    result: Dict = {"store": store, "warm_up": warm_up}
+    for key in runs[0]:
+        result[key] = round(statistics.median(run[key] for run in runs), 1)
+    return result
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stores", nargs="+", choices=["numpy", "chroma"], default=["numpy", "chroma"])
+    parser.add_argument("--chunks", type=int, default=20_000)
+    parser.add_argument("--dim", type=int, default=1024)
+    parser.add_argument("--pdf-workers", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="Write results as JSON to this path")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--fill", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure()))
+        return
+    if args.fill:
+        fill(args.chunks)
+        return
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOpenAI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+    print(
+        f"{'store':<7} {'warm-up':>7} {'import':>7} {'startup':>8} {'ready':>7} "
+        f"{'first':>7} {'second':>7} {'total':>7}   (ms)"
+    )
+    results: List[Dict] = []
+    try:
+        for store in args.stores:
+            with tempfile.TemporaryDirectory() as directory:
+                build_store(args, store, directory)
+                for warm_up in (False, True):
+                    result = run_config(args, store, directory, warm_up, base_url)
+                    results.append(result)
+                    print(
+                        f"{store:<7} {'on' if warm_up else 'off':>7} {result['import_ms']:>7} "
+                        f"{result['startup_ms']:>8} {result['ready_ms']:>7} {result['first_ms']:>7} "
+                        f"{result['second_ms']:>7} {result['total_ms']:>7}"
+                    )
+    finally:
+        server.shutdown()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
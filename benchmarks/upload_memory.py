@@ -0,0 +1,161 @@
+"""
+Peak memory of an /upload as a function of the file size.
+
+For every size a synthetic .txt file is written to disk and sent to the
+/upload route through the ASGI interface in 64 KB messages, as a server would
+receive it, and the ingestion job is awaited. Peak Python allocations
+(tracemalloc) are measured from the start of the request until the job has
+finished. For reference, `whole` holds the file in memory as one bytes object
+and passes it to `RAGService.process_file_upload`, which is what the route
+did before uploads were streamed to a temporary file.
+
+Embeddings come from `benchmarks.fakes.FakeLLM` with a small dimension and
+chunks go to a temporary NumPy store, so the numbers are dominated by the
+upload path. What still grows with the size is per-chunk bookkeeping for
+incremental re-uploads (chunk ids and content hashes of the source).
+
+    python -m benchmarks.upload_memory --sizes-mb 5 20 50
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import tracemalloc
+from typing import Dict, List
+
+import structlog
+
+# get_settings() reads the API key from the environment; no API calls are made here
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from benchmarks.chunking import synthetic_pages
+from benchmarks.fakes import FakeLLM
+from src.adapters.document_processor_adapter import LocalDocumentProcessor
+from src.adapters.numpy_adapter import NumpyAdapter
+from src.api.dependencies import get_job_manager, get_rag_service, get_settings
+from src.api.main import app
+from src.config import Settings
+from src.core.rag_service import RAGService
+
+BOUNDARY = "benchmark-boundary"
+MESSAGE_BYTES = 64 * 1024
+
+def write_corpus(path: str, size_mb: float) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for page in synthetic_pages(int(size_mb * 1024 * 1024)):
+            f.write(page)
+
+def build_service(directory: str, args: argparse.Namespace) -> RAGService:
+    return RAGService(
+        storage=NumpyAdapter(Settings(OPENAI_API_KEY="benchmark", NUMPY_STORE_DIRECTORY=directory)),
+        llm=FakeLLM(dim=args.dim),
+        doc_processor=LocalDocumentProcessor(),
+    )
+
+async def post_upload(path: str) -> Dict:
+    """Calls the /upload route with the multipart body streamed from `path`."""
+    prefix = (
+        f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="file"; filename="corpus.txt"\r\n'
+        f"Content-Type: text/plain\r\n\r\n"
+    ).encode()
+    suffix = f"\r\n--{BOUNDARY}--\r\n".encode()
+    size = len(prefix) + os.path.getsize(path) + len(suffix)
+
+    def messages():
+        yield prefix
+        with open(path, "rb") as f:
+            while block := f.read(MESSAGE_BYTES):
+                yield block
+        yield suffix
+
+    body = messages()
+    response: Dict = {"body": b""}
+
+    async def receive() -> Dict:
+        data = next(body, None)
+        return {"type": "http.request", "body": data or b"", "more_body": data is not None}
+
+    async def send(message: Dict) -> None:
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            response["body"] += message.get("body", b"")
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": "/upload", "raw_path": b"/upload", "query_string": b"",
+        "root_path": "", "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 80),
+        "headers": [
+            (b"content-type", f"multipart/form-data; boundary={BOUNDARY}".encode()),
+            (b"content-length", str(size).encode()),
+        ],
+    }
+    await app(scope, receive, send)
+    if response["status"] != 202:
+        raise RuntimeError(f"/upload returned {response['status']}: {response['body'][:200]!r}")
+    return json.loads(response["body"])
+
+async def wait_for_job(job_id: str) -> None:
+    job_manager = get_job_manager(get_settings())
+    while job_manager.get(job_id).status not in ("completed", "failed"):
+        await asyncio.sleep(0.01)
+    if job_manager.get(job_id).status == "failed":
+        raise RuntimeError(job_manager.get(job_id).error)
+
+async def measure(mode: str, path: str, args: argparse.Namespace) -> float:
+    with tempfile.TemporaryDirectory() as directory:
+        service = build_service(directory, args)
+        app.dependency_overrides[get_rag_service] = lambda: service
+        tracemalloc.start()
+        try:
+            if mode == "streamed":
+                accepted = await post_upload(path)
+                await wait_for_job(accepted["job_id"])
+            else:
+                with open(path, "rb") as f:
+                    await service.process_file_upload(f.read(), "corpus.txt")
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+            app.dependency_overrides.clear()
+    return peak / (1024 * 1024)
+
+async def main_async(args: argparse.Namespace) -> List[Dict]:
+    settings = get_settings()
+    settings.MAX_UPLOAD_BYTES = max(settings.MAX_UPLOAD_BYTES, int(max(args.sizes_mb) * 1024 * 1024) * 2)
+    job_manager = get_job_manager(settings)
+    job_manager.start()
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            for size_mb in args.sizes_mb:
+                path = os.path.join(directory, f"corpus_{size_mb}.txt")
+                write_corpus(path, size_mb)
+                result = {"size_mb": size_mb}
+                for mode in ("streamed", "whole"):
+                    result[f"{mode}_peak_mb"] = round(await measure(mode, path, args), 1)
+                results.append(result)
+                print(f"{size_mb:>8g} {result['streamed_peak_mb']:>12} {result['whole_peak_mb']:>10}")
+    finally:
+        await job_manager.stop()
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes-mb", type=float, nargs="+", default=[5, 20])
+    parser.add_argument("--dim", type=int, default=64)
+    parser.add_argument("--json", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    print(f"{'file MB':>8} {'streamed MB':>12} {'whole MB':>10}")
+    results = asyncio.run(main_async(args))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
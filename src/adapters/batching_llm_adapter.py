@@ -0,0 +1,39 @@
+from typing import AsyncIterator, Dict, List
+
+from src.ports.llm import LLMPort
+from src.core.domain import DocumentChunk
+from src.core.micro_batcher import MicroBatcher
+
+class BatchingLLMAdapter(LLMPort):
+    """
+    LLMPort decorator that micro-batches single-text `generate_embeddings`
+    calls from concurrent requests into one `generate_embeddings_batch` call on
+    the wrapped port. Batch calls and answer generation are passed through.
+    """
+
+    def __init__(self, inner: LLMPort, max_batch_size: int = 64, max_wait_ms: float = 2.0):
+        self._inner = inner
+        self._batcher: MicroBatcher[str, List[float]] = MicroBatcher(
+            inner.generate_embeddings_batch, max_size=max_batch_size, max_wait_ms=max_wait_ms, name="query_embedding"
+        )
+
+    def stats(self) -> Dict[str, float]:
+        return self._batcher.stats()
+
+    async def generate_answer(self, query: str, context_chunks: List[DocumentChunk]) -> str:
+        return await self._inner.generate_answer(query, context_chunks)
+
+    def stream_answer(self, query: str, context_chunks: List[DocumentChunk]) -> AsyncIterator[str]:
+        return self._inner.stream_answer(query, context_chunks)
+
+    async def warm_up(self) -> None:
+        await self._inner.warm_up()
+
+    async def close(self) -> None:
+        await self._inner.close()
+
+    async def generate_embeddings(self, text: str) -> List[float]:
+        return await self._batcher.submit(text)
+
+    async def generate_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
+        return await self._inner.generate_embeddings_batch(texts)
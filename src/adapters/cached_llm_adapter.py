@@ -0,0 +1,206 @@
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, List, Optional
+
+import numpy as np
+
+from src.ports.llm import LLMPort
+from src.core.domain import DocumentChunk
+from src.core.metrics import EMBEDDING_CACHE_LOOKUPS
+from src.core.priority import current_priority
+import structlog
+
+logger = structlog.get_logger()
+
+class CachedLLMAdapter(LLMPort):
+    """
+    LLMPort decorator that caches embeddings by a hash of (model, text).
+
+    Lookups go through an in-memory LRU tier first, then an SQLite tier that
+    survives restarts. Both hold float32 vectors (arrays in memory, packed blobs
+    on disk) and are trimmed least recently used first once they exceed
+    `max_memory_bytes` / `max_disk_bytes`. Embeddings looked up under background
+    priority (bulk ingestion) only go to disk, so they do not push the query
+    embeddings out of memory. Answer generation is passed straight through.
+    """
+
+    def __init__(
+        self,
+        inner: LLMPort,
+        model: str,
+        path: str,
+        max_memory_bytes: int = 32 * 1024 * 1024,
+        max_disk_bytes: int = 512 * 1024 * 1024,
+    ):
+        self._inner = inner
+        self._model = model
+        self._max_memory_bytes = max_memory_bytes
+        self._max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings(last_access)")
+        self._db.commit()
+        self._disk_bytes = self._db.execute(
+            "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+        ).fetchone()[0]
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "memory_items": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "disk_bytes": self._disk_bytes,
+        }
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self._model}\0{text}".encode("utf-8")).hexdigest()
+
+    async def generate_answer(self, query: str, context_chunks: List[DocumentChunk]) -> str:
+        return await self._inner.generate_answer(query, context_chunks)
+
+    def stream_answer(self, query: str, context_chunks: List[DocumentChunk]) -> AsyncIterator[str]:
+        return self._inner.stream_answer(query, context_chunks)
+
+    async def warm_up(self) -> None:
+        await self._inner.warm_up()
+
+    async def generate_embeddings(self, text: str) -> List[float]:
+        embeddings = await self.generate_embeddings_batch([text])
+        return embeddings[0]
+
+    async def generate_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key(text) for text in texts]
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        admit = current_priority() == "interactive"
+
+        # 1. Memory tier
+        missing: Dict[str, List[int]] = {}
+        for i, key in enumerate(keys):
+            vector = self._memory.get(key)
+            if vector is not None:
+                if admit:
+                    self._memory.move_to_end(key)
+                results[i] = vector.tolist()
+                self.memory_hits += 1
+                EMBEDDING_CACHE_LOOKUPS.inc(result="memory_hit")
+            else:
+                missing.setdefault(key, []).append(i)
+
+        # 2. Disk tier
+        if missing:
+            found = await asyncio.to_thread(self._disk_get, list(missing))
+            for key, vector in found.items():
+                if admit:
+                    self._remember(key, vector)
+                indices = missing.pop(key)
+                for i in indices:
+                    results[i] = vector.tolist()
+                self.disk_hits += len(indices)
+                EMBEDDING_CACHE_LOOKUPS.inc(len(indices), result="disk_hit")
+
+        # 3. Upstream, once per distinct text
+        if missing:
+            miss_keys = list(missing)
+            miss_count = sum(len(indices) for indices in missing.values())
+            self.misses += miss_count
+            EMBEDDING_CACHE_LOOKUPS.inc(miss_count, result="miss")
+            vectors = await self._inner.generate_embeddings_batch([texts[missing[k][0]] for k in miss_keys])
+            for key, vector in zip(miss_keys, vectors):
+                if admit:
+                    # A copy, so a row of a batch matrix does not keep the whole matrix alive
+                    self._remember(key, np.array(vector, dtype=np.float32))
+                for i in missing[key]:
+                    results[i] = vector
+            await asyncio.to_thread(self._disk_put, dict(zip(miss_keys, vectors)))
+
+        return results
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= previous.nbytes
+        self._memory[key] = vector
+        self._memory_bytes += vector.nbytes
+        while self._memory_bytes > self._max_memory_bytes and self._memory:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted.nbytes
+
+    def _disk_get(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        found: Dict[str, np.ndarray] = {}
+        now = time.time()
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._db.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+                if rows:
+                    self._db.executemany(
+                        "UPDATE embeddings SET last_access = ? WHERE key = ?",
+                        [(now, key) for key, _ in rows],
+                    )
+            self._db.commit()
+        return found
+
+    def _disk_put(self, entries: Dict[str, List[float]]) -> None:
+        now = time.time()
+        rows = [(key, np.asarray(vector, dtype=np.float32).tobytes(), now) for key, vector in entries.items()]
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_access) VALUES (?, ?, ?)", rows
+            )
+            self._disk_bytes += sum(len(blob) for _, blob, _ in rows)
+            if self._disk_bytes > self._max_disk_bytes:
+                self._evict()
+            self._db.commit()
+
+    def _evict(self) -> None:
+        """Drops least recently used rows until the disk tier is back under budget."""
+        # Trim to 90% of the budget so we don't evict on every insert once full
+        target = int(self._max_disk_bytes * 0.9)
+        # The running total can drift when concurrent misses replace the same key
+        self._disk_bytes = self._db.execute(
+            "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+        ).fetchone()[0]
+        cursor = self._db.execute("SELECT key, LENGTH(vector) FROM embeddings ORDER BY last_access")
+        doomed = []
+        for key, size in cursor:
+            if self._disk_bytes <= target:
+                break
+            doomed.append((key,))
+            self._disk_bytes -= size
+        self._db.executemany("DELETE FROM embeddings WHERE key = ?", doomed)
+        self.evictions += len(doomed)
+        logger.info("embedding_cache_evicted", count=len(doomed), disk_bytes=self._disk_bytes)
+
+    async def close(self) -> None:
+        with self._lock:
+            self._db.close()
+        await self._inner.close()
@@ -1,7 +1,12 @@
-from typing import List
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Dict, List
 import chromadb
 from src.ports.storage import VectorStoragePort
 from src.core.domain import DocumentChunk, SearchQuery, SearchResult
+from src.core.metrics import VECTOR_STORE_DURATION, VECTOR_STORE_PENDING
 from src.config import Settings
 import structlog
 
@@ -10,64 +15,211 @@ logger = structlog.get_logger()
 class ChromaAdapter(VectorStoragePort):
     def __init__(self, settings: Settings):
         self._client = chromadb.PersistentClient(path=settings.CHROMA_PERSIST_DIRECTORY)
-        self._collection = self._client.get_or_create_collection(name=settings.CHROMA_COLLECTION_NAME)
+        self._collection_name = settings.CHROMA_COLLECTION_NAME
+        self._collection = self._client.get_or_create_collection(
+            name=self._collection_name, metadata={"embedding_model": settings.embedding_model_id}
+        )
+        # Existing collections keep their metadata; refuse to mix embedding spaces
+        stored_model = (self._collection.metadata or {}).get("embedding_model")
+        if stored_model is not None and stored_model != settings.embedding_model_id:
+            raise ValueError(
+                f"Collection '{self._collection_name}' holds {stored_model} embeddings, "
+                f"but the configured embedding model is {settings.embedding_model_id}"
+            )
+        self._read_executor = ThreadPoolExecutor(
+            max_workers=settings.CHROMA_READ_WORKERS, thread_name_prefix="chroma-read"
+        )
+        self._write_executor = ThreadPoolExecutor(
+            max_workers=settings.CHROMA_WRITE_WORKERS, thread_name_prefix="chroma-write"
+        )
+        self._upsert_batch_size = settings.CHROMA_UPSERT_BATCH_SIZE
+        self._upsert_slots = asyncio.Semaphore(settings.CHROMA_MAX_INFLIGHT_UPSERTS)
+        self._pending = {"read": 0, "write": 0}
+        # clear_all replaces the collection; calls wait while it runs, and it
+        # waits for the calls already running
+        self._open = asyncio.Event()
+        self._open.set()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._clearing = asyncio.Lock()
+
+    @property
+    def pending_operations(self) -> Dict[str, int]:
+        """Number of Chroma calls submitted but not yet finished, per pool."""
+        return dict(self._pending)
+
+    async def _run(self, kind: str, method: str, **kwargs: Any) -> Any:
+        """Calls `method` of the current collection on the `kind` ("read" or "write") pool."""
+        executor = self._read_executor if kind == "read" else self._write_executor
+        while not self._open.is_set():
+            await self._open.wait()
+        self._started(kind)
+        try:
+            fn = partial(getattr(self._collection, method), **kwargs)
+            # Includes time queued for a pool thread, which is what callers wait for
+            with VECTOR_STORE_DURATION.time(backend="chroma", operation=method):
+                return await asyncio.get_running_loop().run_in_executor(executor, fn)
+        finally:
+            self._finished(kind)
+
+    def _started(self, kind: str) -> None:
+        self._pending[kind] += 1
+        self._idle.clear()
+        VECTOR_STORE_PENDING.inc(backend="chroma", pool=kind)
+
+    def _finished(self, kind: str) -> None:
+        self._pending[kind] -= 1
+        if not any(self._pending.values()):
+            self._idle.set()
+        VECTOR_STORE_PENDING.inc(-1, backend="chroma", pool=kind)
 
     async def upsert(self, chunks: List[DocumentChunk]) -> None:
-        logger.info("upserting_to_chroma", count=len(chunks))
-        
-        ids = [chunk.id for chunk in chunks]
-        documents = [chunk.content for chunk in chunks]
-        metadatas = [chunk.metadata for chunk in chunks]
-        # Chroma expects embeddings as a list of lists or None
-        embeddings = [chunk.embedding for chunk in chunks]
-
-        self._collection.upsert(
-            ids=ids,
-            documents=documents,
-            metadatas=metadatas,
-            embeddings=embeddings
-        )
+        logger.info("upserting_to_chroma", count=len(chunks), pending=self.pending_operations)
+
+        async def upsert_batch(batch: List[DocumentChunk]) -> None:
+            # Bound the number of batches queued on the write pool so memory and
+            # queueing delay stay flat no matter how large the upsert is.
+            async with self._upsert_slots:
+                await self._run(
+                    "write",
+                    "upsert",
+                    ids=[chunk.id for chunk in batch],
+                    documents=[chunk.content for chunk in batch],
+                    metadatas=[chunk.metadata for chunk in batch],
+                    # Chroma takes the float32 embedding arrays as they are
+                    embeddings=[chunk.embedding for chunk in batch],
+                )
+
+        size = self._upsert_batch_size
+        await asyncio.gather(*(upsert_batch(chunks[i:i + size]) for i in range(0, len(chunks), size)))
 
     async def search(self, query: SearchQuery) -> List[SearchResult]:
         logger.debug("searching_chroma", query=query.query)
         
         # We use the pre-calculated query embedding generated in rag_service.py
-        if not query.embedding:
+        if query.embedding is None:
             # Fallback to text search if no embedding (Chroma will use its default embedding function)
-            results = self._collection.query(
+            results = await self._run(
+                "read",
+                "query",
                 query_texts=[query.query],
                 n_results=query.top_k,
                 where=query.filters
             )
         else:
-            results = self._collection.query(
+            results = await self._run(
+                "read",
+                "query",
                 query_embeddings=[query.embedding],
                 n_results=query.top_k,
                 where=query.filters
             )
         
+        return self._to_results(results, 0)
+
+    async def search_many(self, queries: List[SearchQuery]) -> List[List[SearchResult]]:
+        """
+        Sends all queries that share the same filters as one `query` call with
+        several `query_embeddings`, asking for the largest `top_k` among them.
+        """
+        logger.debug("searching_chroma_many", count=len(queries))
+        groups: Dict[str, List[int]] = {}
+        for index, query in enumerate(queries):
+            if query.embedding is not None:
+                groups.setdefault(json.dumps(query.filters, sort_keys=True), []).append(index)
+
+        async def search_group(indexes: List[int]) -> None:
+            results = await self._run(
+                "read",
+                "query",
+                query_embeddings=[queries[i].embedding for i in indexes],
+                n_results=max(queries[i].top_k for i in indexes),
+                where=queries[indexes[0]].filters,
+            )
+            for position, i in enumerate(indexes):
+                found[i] = self._to_results(results, position)[:queries[i].top_k]
+
+        async def search_one(index: int) -> None:
+            found[index] = await self.search(queries[index])
+
+        found: List[List[SearchResult]] = [[] for _ in queries]
+        await asyncio.gather(
+            *(search_group(indexes) for indexes in groups.values()),
+            # Queries without an embedding fall back to Chroma's text search
+            *(search_one(i) for i, query in enumerate(queries) if query.embedding is None),
+        )
+        return found
+
+    @staticmethod
+    def _to_results(results: Dict[str, Any], position: int) -> List[SearchResult]:
         search_results = []
-        # Chroma returns results in a nested list format
+        # Chroma returns results in a nested list format, one list per query
         if results and results["ids"]:
-            for i in range(len(results["ids"][0])):
+            for i in range(len(results["ids"][position])):
                 chunk = DocumentChunk(
-                    id=results["ids"][0][i],
-                    content=results["documents"][0][i],
-                    metadata=results["metadatas"][0][i]
+                    id=results["ids"][position][i],
+                    content=results["documents"][position][i],
+                    metadata=results["metadatas"][position][i]
                 )
-                search_results.append(SearchResult(chunk=chunk, score=results["distances"][0][i]))
+                search_results.append(SearchResult(chunk=chunk, score=results["distances"][position][i]))
             
         return search_results
 
+    async def update_metadata(self, chunks: List[DocumentChunk]) -> None:
+        logger.info("updating_chroma_metadata", count=len(chunks))
+        await self._run(
+            "write",
+            "update",
+            ids=[chunk.id for chunk in chunks],
+            metadatas=[chunk.metadata for chunk in chunks],
+        )
+
     async def delete(self, ids: List[str]) -> None:
         logger.info("deleting_from_chroma", count=len(ids))
-        self._collection.delete(ids=ids)
+        await self._run("write", "delete", ids=ids)
+
+    async def delete_where(self, filters: Dict[str, Any]) -> None:
+        logger.info("deleting_from_chroma_where", filters=filters)
+        # Chroma resolves the filter internally, so no ids are loaded here
+        await self._run("write", "delete", where=filters)
+
+    async def warm_up(self) -> None:
+        """
+        Loads the collection's index with a one-result query for a stored
+        vector, and starts a thread in each pool.
+        """
+        sample = await self._run("read", "peek", limit=1)
+        embeddings = sample.get("embeddings")
+        if embeddings is not None and len(embeddings):
+            await self._run("read", "query", query_embeddings=[embeddings[0]], n_results=1)
+        count = await self._run("write", "count")
+        logger.info("chroma_warm_up_completed", collection=self._collection_name, count=count)
+
+    def close(self) -> None:
+        # Lets calls already submitted finish first
+        self._read_executor.shutdown()
+        self._write_executor.shutdown()
 
     async def clear_all(self) -> None:
         logger.info("clearing_entire_chroma_collection")
-        # In Chroma, deleting by an empty 'where' or no 'ids' isn't supported for clearing all.
-        # But we can just delete by IDs if we had them, OR just reset the collection.
-        # A simple way is to get all IDs and then delete.
-        results = self._collection.get()
-        if results["ids"]:
-            self._collection.delete(ids=results["ids"])
+        # Dropping and recreating the collection takes constant memory, unlike
+        # fetching every id to delete them. Collection metadata (e.g. the
+        # distance function) is carried over.
+        def recreate() -> None:
+            metadata = self._collection.metadata
+            self._client.delete_collection(self._collection_name)
+            self._collection = self._client.get_or_create_collection(name=self._collection_name, metadata=metadata)
+
+        async with self._clearing:
+            # New calls wait, so none of them uses the deleted collection
+            self._open.clear()
+            try:
+                await self._idle.wait()
+                self._started("write")
+                try:
+                    with VECTOR_STORE_DURATION.time(backend="chroma", operation="clear_all"):
+                        await asyncio.get_running_loop().run_in_executor(self._write_executor, recreate)
+                finally:
+                    self._finished("write")
+            finally:
+                self._open.set()
@@ -0,0 +1,35 @@
+from typing import AsyncIterator, List
+
+from src.ports.llm import LLMPort
+from src.core.domain import DocumentChunk
+from src.core.singleflight import SingleFlight
+
+class CoalescingLLMAdapter(LLMPort):
+    """
+    LLMPort decorator that lets concurrent `generate_embeddings` calls for the
+    same text share one upstream request, e.g. many users asking the same
+    question right after an announcement. Batch embeddings and answer
+    generation are passed straight through.
+    """
+
+    def __init__(self, inner: LLMPort):
+        self._inner = inner
+        self._embeddings: SingleFlight[List[float]] = SingleFlight("embedding")
+
+    async def generate_answer(self, query: str, context_chunks: List[DocumentChunk]) -> str:
+        return await self._inner.generate_answer(query, context_chunks)
+
+    def stream_answer(self, query: str, context_chunks: List[DocumentChunk]) -> AsyncIterator[str]:
+        return self._inner.stream_answer(query, context_chunks)
+
+    async def warm_up(self) -> None:
+        await self._inner.warm_up()
+
+    async def close(self) -> None:
+        await self._inner.close()
+
+    async def generate_embeddings(self, text: str) -> List[float]:
+        return await self._embeddings.do(text, lambda: self._inner.generate_embeddings(text))
+
+    async def generate_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
+        return await self._inner.generate_embeddings_batch(texts)
@@ -1,12 +1,61 @@
-import io
-from typing import BinaryIO
+import asyncio
+import codecs
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, BinaryIO, List, Optional
 from pypdf import PdfReader
 from src.ports.document_processor import DocumentProcessorPort
 import structlog
 
 logger = structlog.get_logger()
 
+# Text files are decoded and yielded in blocks of this many bytes, so memory
+# does not grow with the file size
+TEXT_BLOCK_BYTES = 1024 * 1024
+
+def _page_text(reader: PdfReader, index: int) -> str:
+    page_text = reader.pages[index].extract_text()
+    return page_text + "\n" if page_text else ""
+
+def _extract_page_range(path: str, start: int, stop: int) -> List[str]:
+    """Runs in a worker process: parses the PDF at `path` and extracts pages [start, stop)."""
+    reader = PdfReader(path)
+    return [_page_text(reader, i) for i in range(start, stop)]
+
+def _worker_ready() -> int:
+    """Runs in a worker process; unpickling it there imports this module and pypdf."""
+    return os.getpid()
+
+def _copy_file(source: BinaryIO, target: BinaryIO) -> None:
+    source.seek(0)
+    shutil.copyfileobj(source, target, TEXT_BLOCK_BYTES)
+    target.flush()
+
+@asynccontextmanager
+async def _file_path(file: BinaryIO) -> AsyncIterator[str]:
+    """
+    Path of `file` on disk for worker processes to open. Files without one
+    (in memory, or anonymous temporary files) are copied to a temporary file
+    in blocks, which is deleted afterwards.
+    """
+    name = getattr(file, "name", None)
+    if isinstance(name, str) and os.path.isfile(name):
+        yield name
+        return
+    with tempfile.NamedTemporaryFile(suffix=".pdf") as copy:
+        await asyncio.to_thread(_copy_file, file, copy)
+        yield copy.name
+
 class LocalDocumentProcessor(DocumentProcessorPort):
+    def __init__(self, pdf_workers: int = 1, pages_per_task: int = 8):
+        self._pdf_workers = pdf_workers
+        self._pages_per_task = pages_per_task
+        self._pool: Optional[ProcessPoolExecutor] = None
+
     def extract_text(self, file: BinaryIO, filename: str) -> str:
         logger.info("extracting_text", filename=filename)
         
@@ -19,9 +68,90 @@ class LocalDocumentProcessor(DocumentProcessorPort):
 
     def _extract_from_pdf(self, file: BinaryIO) -> str:
         reader = PdfReader(file)
-        text = ""
-        for page in reader.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text + "\n"
-        return text
+        return "".join(_page_text(reader, i) for i in range(len(reader.pages)))
+
+    async def extract_pages(self, file: BinaryIO, filename: str) -> AsyncIterator[str]:
+        logger.info("extracting_pages", filename=filename)
+        
+        if filename.lower().endswith(".pdf"):
+            async for page in self._extract_pdf_pages(file):
+                yield page
+        elif filename.lower().endswith(".txt"):
+            async for block in self._read_text_blocks(file):
+                yield block
+        else:
+            raise ValueError(f"Unsupported file type: {filename}")
+
+    async def _read_text_blocks(self, file: BinaryIO) -> AsyncIterator[str]:
+        # The incremental decoder carries multi-byte characters split across blocks
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        while True:
+            data = await asyncio.to_thread(file.read, TEXT_BLOCK_BYTES)
+            text = decoder.decode(data, final=not data)
+            if text:
+                yield text
+            if not data:
+                return
+
+    async def _extract_pdf_pages(self, file: BinaryIO) -> AsyncIterator[str]:
+        # pypdf reads objects from the file as pages are extracted, rather than
+        # loading the whole document
+        reader = await asyncio.to_thread(PdfReader, file)
+        page_count = len(reader.pages)
+
+        if self._pdf_workers <= 1 or page_count <= self._pages_per_task:
+            # Small documents are not worth the inter-process overhead
+            for i in range(page_count):
+                yield await asyncio.to_thread(_page_text, reader, i)
+            return
+
+        async with _file_path(file) as path:
+            async for page in self._extract_pdf_pages_in_pool(path, page_count):
+                yield page
+
+    async def _extract_pdf_pages_in_pool(self, path: str, page_count: int) -> AsyncIterator[str]:
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        ranges = [
+            (start, min(start + self._pages_per_task, page_count))
+            for start in range(0, page_count, self._pages_per_task)
+        ]
+        # Keep a bounded window of page ranges in flight and yield them in order
+        window = self._pdf_workers * 2
+        in_flight: List[asyncio.Future] = []
+        next_range = 0
+        try:
+            while next_range < len(ranges) or in_flight:
+                while next_range < len(ranges) and len(in_flight) < window:
+                    start, stop = ranges[next_range]
+                    in_flight.append(loop.run_in_executor(pool, _extract_page_range, path, start, stop))
+                    next_range += 1
+                for page in await in_flight.pop(0):
+                    yield page
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+    async def warm_up(self) -> None:
+        """Starts the PDF worker processes, so the first large PDF does not wait for them to spawn."""
+        if self._pdf_workers <= 1:
+            return
+        pool = self._get_pool()
+        loop = asyncio.get_running_loop()
+        # Submitted together, so the pool spawns a process for each
+        pids = await asyncio.gather(*(loop.run_in_executor(pool, _worker_ready) for _ in range(self._pdf_workers)))
+        logger.info("pdf_workers_started", workers=len(set(pids)))
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn avoids forking a process that already runs threads (event loop
+            # executors, Chroma), which is unsafe
+            self._pool = ProcessPoolExecutor(
+                max_workers=self._pdf_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
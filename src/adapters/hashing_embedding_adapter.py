@@ -0,0 +1,95 @@
+import asyncio
+import re
+import zlib
+from typing import AsyncIterator, Dict, List, Tuple
+
+import numpy as np
+import structlog
+
+from src.ports.llm import LLMPort
+from src.core.domain import DocumentChunk
+
+logger = structlog.get_logger()
+
+_TOKEN = re.compile(r"\w+")
+
+# Batches at least this large are embedded in a worker thread to keep the event loop responsive
+_THREAD_MIN_TEXTS = 64
+
+# Bounds the memory of the feature -> (column, sign) cache
+_MAX_CACHED_FEATURES = 500_000
+
+class HashingEmbeddingAdapter(LLMPort):
+    """
+    LLMPort decorator that computes embeddings locally on the CPU and passes
+    answer generation to `inner`.
+
+    Each text is tokenized into lowercase words, and every word and word bigram
+    is hashed (CRC32, so vectors are stable across processes) to one of `dim`
+    columns with a hash-derived sign. Counts are dampened to log(1 + count)
+    and rows L2-normalized, so cosine similarity is a TF-weighted lexical
+    overlap. There is no IDF: it would depend on the corpus and change every
+    stored vector as documents are added.
+
+    Retrieval quality is below a neural embedding model, but it needs no
+    network, embeds thousands of chunks per second and costs nothing.
+    """
+
+    def __init__(self, inner: LLMPort, dim: int = 1024):
+        self._inner = inner
+        self._dim = dim
+        self._features: Dict[str, Tuple[int, float]] = {}
+
+    async def generate_answer(self, query: str, context_chunks: List[DocumentChunk]) -> str:
+        return await self._inner.generate_answer(query, context_chunks)
+
+    def stream_answer(self, query: str, context_chunks: List[DocumentChunk]) -> AsyncIterator[str]:
+        return self._inner.stream_answer(query, context_chunks)
+
+    async def warm_up(self) -> None:
+        await self._inner.warm_up()
+
+    async def close(self) -> None:
+        await self._inner.close()
+
+    # Embeddings are returned as float32 arrays, which the domain models and
+    # vector stores take without converting them from Python floats
+    async def generate_embeddings(self, text: str) -> np.ndarray:
+        return self.embed([text])[0]
+
+    async def generate_embeddings_batch(self, texts: List[str]) -> np.ndarray:
+        if len(texts) >= _THREAD_MIN_TEXTS:
+            return await asyncio.to_thread(self.embed, texts)
+        return self.embed(texts)
+
+    def _feature(self, feature: str) -> Tuple[int, float]:
+        cached = self._features.get(feature)
+        if cached is None:
+            digest = zlib.crc32(feature.encode("utf-8"))
+            cached = (digest % self._dim, 1.0 if digest & 0x80000000 else -1.0)
+            if len(self._features) >= _MAX_CACHED_FEATURES:
+                self._features.clear()
+            self._features[feature] = cached
+        return cached
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Embeds `texts` into a float32 matrix with one L2-normalized row per text."""
+        rows: List[int] = []
+        columns: List[int] = []
+        signs: List[float] = []
+        for row, text in enumerate(texts):
+            words = _TOKEN.findall(text.lower())
+            for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+                column, sign = self._feature(feature)
+                rows.append(row)
+                columns.append(column)
+                signs.append(sign)
+
+        # One bincount over flattened (row, column) cells sums all hashed features
+        cells = np.asarray(rows, dtype=np.int64) * self._dim + np.asarray(columns, dtype=np.int64)
+        counts = np.bincount(cells, weights=np.asarray(signs), minlength=len(texts) * self._dim)
+        matrix = counts.reshape(len(texts), self._dim).astype(np.float32)
+        np.copysign(np.log1p(np.abs(matrix)), matrix, out=matrix)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
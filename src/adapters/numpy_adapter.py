@@ -0,0 +1,625 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+import structlog
+
+from src.adapters.quantization import int8_scores, quantize_int8
+from src.ports.storage import VectorStoragePort
+from src.core.domain import DocumentChunk, SearchQuery, SearchResult
+from src.core.exceptions import InvalidFilterError
+from src.core.metrics import VECTOR_STORE_DURATION
+from src.config import Settings
+
+logger = structlog.get_logger()
+
+# name -> (dtype, file extension, one column per embedding dimension)
+_ARRAYS = {
+    "vectors": (np.float32, "f32", True),
+    "codes": (np.int8, "i8", True),
+    "scales": (np.float32, "f32", False),
+}
+
+# search_many scores this many queries per matrix product; the score matrix is
+# rows x queries float32, so this bounds its size
+SEARCH_MANY_BLOCK_QUERIES = 64
+
+class _ReadWriteLock:
+    """
+    Searches share the lock; a writer first reserves it, which excludes other
+    writers but not searches, and holds it exclusively only while it publishes
+    its changes. Waiting writers block new searches, so they are not starved.
+    """
+
+    def __init__(self):
+        self._writers = threading.Lock()
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._exclusive = False
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        with self._condition:
+            while self._exclusive:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def reserve(self) -> Iterator[None]:
+        with self._writers:
+            yield
+
+    @contextmanager
+    def exclusive(self) -> Iterator[None]:
+        """Waits for running searches; only valid while the lock is reserved."""
+        with self._condition:
+            self._exclusive = True
+            while self._readers:
+                self._condition.wait()
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._exclusive = False
+                self._condition.notify_all()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        with self.reserve(), self.exclusive():
+            yield
+
+class NumpyAdapter(VectorStoragePort):
+    """
+    In-process vector store for collections up to a few million chunks.
+
+    Embeddings live in a memory-mapped float32 matrix (`vectors.<gen>.f32`) with
+    L2-normalized rows, so a search is a single matrix-vector product followed by
+    an `argpartition` top-k. Ids, contents and metadata live in an SQLite side
+    table keyed by row number; only a boolean liveness mask is held in memory, so
+    opening a large store is close to instant.
+
+    Upserts append rows (an existing id is tombstoned and re-appended), deletes
+    only tombstone rows, and a background compaction rewrites both files once
+    the share of tombstoned rows passes `compaction_threshold`.
+
+    With `quantization="int8"` every row also gets a 1-byte scalar-quantized
+    copy (`codes.<gen>.i8` plus a per-row scale). Searches scan the codes, a
+    quarter of the float32 bytes, and re-rank the best `top_k * rerank_factor`
+    candidates against the exact vectors, which are then only paged in for
+    those rows.
+
+    Searches run concurrently, with each other and with the slow part of a
+    write or compaction. Those prepare files and an uncommitted SQLite
+    transaction on the writer connection, while searches read the side table
+    through a second connection (WAL mode) and so only see committed rows.
+    Writers then wait for running searches just to commit and swap the
+    in-memory state.
+
+    Scores are cosine distances (1 - cosine similarity): lower is better, like
+    Chroma's distances.
+    """
+
+    def __init__(self, settings: Settings):
+        self._directory = settings.NUMPY_STORE_DIRECTORY
+        self._compaction_threshold = settings.NUMPY_STORE_COMPACTION_THRESHOLD
+        self._quantized = settings.NUMPY_STORE_QUANTIZATION == "int8"
+        self._rerank_factor = max(1, settings.NUMPY_STORE_RERANK_FACTOR)
+        os.makedirs(self._directory, exist_ok=True)
+        self._lock = _ReadWriteLock()
+        self._compaction: Optional[asyncio.Task] = None
+
+        path = os.path.join(self._directory, "chunks.sqlite")
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(
+            """
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS chunks (
+                row INTEGER PRIMARY KEY,
+                id TEXT NOT NULL,
+                content TEXT NOT NULL,
+                metadata TEXT NOT NULL,
+                deleted INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_chunks_live_id ON chunks(id) WHERE deleted = 0;
+            CREATE TABLE IF NOT EXISTS store_info (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            """
+        )
+        self._db.commit()
+        # Searches read through their own connection, so they never see a
+        # writer's uncommitted rows
+        self._reader = sqlite3.connect(path, check_same_thread=False)
+        self._check_embedding_model(settings.embedding_model_id)
+        self._open()
+
+    def _check_embedding_model(self, model_id: str) -> None:
+        row = self._db.execute("SELECT value FROM store_info WHERE key = 'embedding_model'").fetchone()
+        if row is None:
+            self._db.execute("INSERT INTO store_info (key, value) VALUES ('embedding_model', ?)", (model_id,))
+            self._db.commit()
+        elif row[0] != model_id:
+            raise ValueError(
+                f"Store at {self._directory} holds {row[0]} embeddings, but the configured embedding model is {model_id}"
+            )
+
+    # --- Storage layout -------------------------------------------------
+
+    def _open(self) -> None:
+        """Maps the array files and rebuilds the liveness mask from the side table."""
+        info = dict(self._db.execute("SELECT key, value FROM store_info"))
+        self._dim: Optional[int] = int(info["dim"]) if "dim" in info else None
+        # Compaction writes new array files and switches the generation in the
+        # same transaction that renumbers the side table, so both always agree.
+        self._generation = int(info.get("generation", 0))
+        self._count = self._db.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM chunks").fetchone()[0]
+        self._alive = np.ones(self._count, dtype=bool)
+        tombstones = [row for (row,) in self._db.execute("SELECT row FROM chunks WHERE deleted = 1")]
+        self._alive[tombstones] = False
+
+        self._arrays: Dict[str, np.memmap] = {}
+        for name in self._array_names():
+            path = self._path_for(name, self._generation)
+            if self._dim is not None and os.path.exists(path):
+                capacity = os.path.getsize(path) // self._row_bytes(name)
+                if capacity:
+                    self._arrays[name] = np.memmap(path, dtype=_ARRAYS[name][0], mode="r+", shape=self._shape(name, capacity))
+        if self._quantized and self._count and "codes" not in self._arrays:
+            self._build_codes()
+        elif not self._quantized:
+            # Codes would go stale while quantization is off, so drop them;
+            # they are rebuilt from the vectors when it is switched back on.
+            for name in ("codes", "scales"):
+                self._remove_file(self._path_for(name, self._generation))
+        logger.info(
+            "numpy_store_opened",
+            rows=self._count,
+            tombstones=len(tombstones),
+            dim=self._dim,
+            quantization="int8" if self._quantized else "none",
+        )
+
+    def _array_names(self) -> List[str]:
+        return ["vectors", "codes", "scales"] if self._quantized else ["vectors"]
+
+    def _path_for(self, name: str, generation: int) -> str:
+        return os.path.join(self._directory, f"{name}.{generation}.{_ARRAYS[name][1]}")
+
+    def _shape(self, name: str, rows: int):
+        return (rows, self._dim) if _ARRAYS[name][2] else (rows,)
+
+    def _row_bytes(self, name: str) -> int:
+        dtype, _, per_dim = _ARRAYS[name]
+        return np.dtype(dtype).itemsize * (self._dim if per_dim else 1)
+
+    @staticmethod
+    def _remove_file(path: str) -> None:
+        if os.path.exists(path):
+            os.remove(path)
+
+    def _ensure_capacity(self, rows: int) -> None:
+        for name in self._array_names():
+            array = self._arrays.get(name)
+            capacity = array.shape[0] if array is not None else 0
+            if rows <= capacity:
+                continue
+            new_capacity = max(rows, capacity * 2, 1024)
+            if array is not None:
+                # Running searches keep the old, shorter mapping of the same file
+                array.flush()
+            path = self._path_for(name, self._generation)
+            with open(path, "ab") as f:
+                f.truncate(new_capacity * self._row_bytes(name))
+            self._arrays[name] = np.memmap(path, dtype=_ARRAYS[name][0], mode="r+", shape=self._shape(name, new_capacity))
+
+    def _write_rows(self, start: int, vectors: np.ndarray) -> None:
+        stop = start + len(vectors)
+        self._arrays["vectors"][start:stop] = vectors
+        if self._quantized:
+            self._arrays["codes"][start:stop], self._arrays["scales"][start:stop] = quantize_int8(vectors)
+        for array in self._arrays.values():
+            array.flush()
+
+    def _build_codes(self) -> None:
+        """Quantizes the existing float32 vectors, e.g. after enabling int8 on an existing store."""
+        self._ensure_capacity(self._count)
+        vectors = self._arrays["vectors"]
+        for start in range(0, self._count, 65_536):
+            stop = min(start + 65_536, self._count)
+            self._arrays["codes"][start:stop], self._arrays["scales"][start:stop] = quantize_int8(vectors[start:stop])
+        self._arrays["codes"].flush()
+        self._arrays["scales"].flush()
+        logger.info("numpy_store_codes_built", rows=self._count)
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    @property
+    def tombstone_ratio(self) -> float:
+        return float((~self._alive).sum()) / self._count if self._count else 0.0
+
+    # --- Port implementation --------------------------------------------
+
+    async def _run(self, operation: str, fn: Callable[..., Any], *args: Any) -> Any:
+        with VECTOR_STORE_DURATION.time(backend="numpy", operation=operation):
+            return await asyncio.to_thread(fn, *args)
+
+    async def upsert(self, chunks: List[DocumentChunk]) -> None:
+        logger.info("upserting_to_numpy_store", count=len(chunks))
+        await self._run("upsert", self._upsert, chunks)
+        self._maybe_compact()
+
+    def _upsert(self, chunks: List[DocumentChunk]) -> None:
+        if not chunks:
+            return
+        # Later duplicates of an id within one call win, as with Chroma
+        unique = list({chunk.id: chunk for chunk in chunks}.values())
+        vectors = self._normalize(np.asarray([chunk.embedding for chunk in unique], dtype=np.float32))
+        with self._lock.reserve():
+            first_rows = self._dim is None
+            if first_rows:
+                self._dim = vectors.shape[1]
+            elif vectors.shape[1] != self._dim:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match store dimension {self._dim}")
+
+            try:
+                if first_rows:
+                    self._db.execute("INSERT OR REPLACE INTO store_info (key, value) VALUES ('dim', ?)", (str(self._dim),))
+                tombstoned = self._tombstone([chunk.id for chunk in unique])
+                # Rows past the published count are invisible to searches, so
+                # they are written without waiting for them
+                start = self._count
+                self._ensure_capacity(start + len(unique))
+                self._write_rows(start, vectors)
+                # Metadata is committed after the vectors are on disk, so a crash in
+                # between leaves unreferenced rows rather than rows without vectors.
+                self._db.executemany(
+                    "INSERT INTO chunks (row, id, content, metadata) VALUES (?, ?, ?, ?)",
+                    [
+                        (start + i, chunk.id, chunk.content, json.dumps(chunk.metadata))
+                        for i, chunk in enumerate(unique)
+                    ],
+                )
+                with self._lock.exclusive():
+                    self._db.commit()
+                    self._alive[tombstoned] = False
+                    self._alive = np.concatenate([self._alive, np.ones(len(unique), dtype=bool)])
+                    self._count = start + len(unique)
+            except BaseException:
+                self._db.rollback()
+                if first_rows:
+                    self._dim = None
+                raise
+
+    def _tombstone(self, ids: List[str]) -> List[int]:
+        """Marks the live rows of `ids` deleted in the open transaction; the caller commits and updates `_alive`."""
+        rows: List[int] = []
+        for start in range(0, len(ids), 500):
+            batch = ids[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows.extend(
+                row for (row,) in self._db.execute(
+                    f"UPDATE chunks SET deleted = 1 WHERE deleted = 0 AND id IN ({placeholders}) RETURNING row", batch
+                )
+            )
+        return rows
+
+    async def search(self, query: SearchQuery) -> List[SearchResult]:
+        logger.debug("searching_numpy_store", query=query.query)
+        if query.embedding is None:
+            raise ValueError("NumpyAdapter requires a query embedding")
+        return await self._run("search", self._search, query)
+
+    def _search(self, query: SearchQuery) -> List[SearchResult]:
+        with self._lock.read():
+            return self._scan(query)
+
+    def _scan(self, query: SearchQuery) -> List[SearchResult]:
+        if "vectors" not in self._arrays or self._count == 0:
+            return []
+        vector = self._normalize(np.asarray(query.embedding, dtype=np.float32))
+        candidates = self._alive if not query.filters else self._alive & self._filter_mask(query.filters)
+        k = min(query.top_k, int(candidates.sum()))
+        if k <= 0:
+            return []
+
+        if self._quantized:
+            approximate = int8_scores(self._arrays["codes"][:self._count], self._arrays["scales"][:self._count], vector)
+            approximate[~candidates] = -np.inf
+            rows = self._top(approximate, min(k * self._rerank_factor, int(candidates.sum())))
+            # Sorted rows keep the reads from the memory-mapped file sequential
+            rows.sort()
+            exact = self._arrays["vectors"][rows] @ vector
+            top = rows[self._top(exact, k)]
+            return self._load_results(top.tolist(), dict(zip(rows.tolist(), exact.tolist())))
+
+        scores = self._arrays["vectors"][:self._count] @ vector
+        scores[~candidates] = -np.inf
+        top = self._top(scores, k)
+        return self._load_results(top.tolist(), scores)
+
+    async def search_many(self, queries: List[SearchQuery]) -> List[List[SearchResult]]:
+        logger.debug("searching_numpy_store_many", count=len(queries))
+        if any(query.embedding is None for query in queries):
+            raise ValueError("NumpyAdapter requires a query embedding")
+        return await self._run("search_many", self._search_many, queries)
+
+    def _search_many(self, queries: List[SearchQuery]) -> List[List[SearchResult]]:
+        """
+        Scores unfiltered float32 queries with one matrix-matrix product per
+        block of queries, so the stored vectors are read once per block instead
+        of once per query. Filtered or quantized searches go through `_scan`.
+        """
+        with self._lock.read():
+            return self._scan_many(queries)
+
+    def _scan_many(self, queries: List[SearchQuery]) -> List[List[SearchResult]]:
+        if "vectors" not in self._arrays or self._count == 0:
+            return [[] for _ in queries]
+        found: List[List[SearchResult]] = [[] for _ in queries]
+        batched = [] if self._quantized else [i for i, query in enumerate(queries) if not query.filters]
+        for i in sorted(set(range(len(queries))) - set(batched)):
+            found[i] = self._scan(queries[i])
+
+        alive = int(self._alive.sum())
+        for start in range(0, len(batched), SEARCH_MANY_BLOCK_QUERIES):
+            block = batched[start:start + SEARCH_MANY_BLOCK_QUERIES]
+            matrix = self._normalize(np.asarray([queries[i].embedding for i in block], dtype=np.float32))
+            scores = self._arrays["vectors"][:self._count] @ matrix.T
+            scores[~self._alive] = -np.inf
+            for column, i in enumerate(block):
+                k = min(queries[i].top_k, alive)
+                if k > 0:
+                    top = self._top(scores[:, column], k)
+                    found[i] = self._load_results(top.tolist(), scores[:, column])
+        return found
+
+    @staticmethod
+    def _top(scores: np.ndarray, k: int) -> np.ndarray:
+        """Indices of the `k` highest scores, best first."""
+        top = np.argpartition(-scores, k - 1)[:k]
+        return top[np.argsort(-scores[top])]
+
+    def _load_results(self, rows: List[int], scores) -> List[SearchResult]:
+        placeholders = ",".join("?" * len(rows))
+        records = {
+            row: (chunk_id, content, metadata)
+            for row, chunk_id, content, metadata in self._reader.execute(
+                f"SELECT row, id, content, metadata FROM chunks WHERE row IN ({placeholders})", rows
+            )
+        }
+        return [
+            SearchResult(
+                chunk=DocumentChunk(id=records[row][0], content=records[row][1], metadata=json.loads(records[row][2])),
+                score=float(1.0 - scores[row]),
+            )
+            for row in rows
+        ]
+
+    def _filter_mask(self, filters: Dict[str, Any]) -> np.ndarray:
+        """
+        Supports the equality subset of Chroma's `where` syntax:
+        {"key": value}, {"key": {"$eq": value}} and {"$and": [...]}. Any other
+        operator raises InvalidFilterError.
+        """
+        clauses, params = self._where_clauses(filters)
+        if not clauses:
+            # e.g. {"$and": [{}]}: like an empty filter, it matches every row
+            return np.ones(self._count, dtype=bool)
+        mask = np.zeros(self._count, dtype=bool)
+        rows = [row for (row,) in self._reader.execute(
+            f"SELECT row FROM chunks WHERE deleted = 0 AND {' AND '.join(clauses)}", params
+        )]
+        mask[rows] = True
+        return mask
+
+    def _where_clauses(self, filters: Dict[str, Any]):
+        clauses: List[str] = []
+        params: List[Any] = []
+        for key, value in filters.items():
+            if key == "$and":
+                if not isinstance(value, list) or not value:
+                    raise InvalidFilterError(f"$and needs a non-empty list of filters, got {value!r}")
+                for sub in value:
+                    sub_clauses, sub_params = self._where_clauses(sub)
+                    clauses.extend(sub_clauses)
+                    params.extend(sub_params)
+                continue
+            if key.startswith("$"):
+                # e.g. $or: rejected here rather than filtering on a metadata key named "$or"
+                raise InvalidFilterError(f"Unsupported filter operator for NumpyAdapter: {key}")
+            if isinstance(value, dict):
+                if set(value) != {"$eq"}:
+                    raise InvalidFilterError(f"Unsupported filter operator for NumpyAdapter: {value}")
+                value = value["$eq"]
+            clauses.append("json_extract(metadata, ?) = ?")
+            params.extend([f'$."{key}"', value])
+        return clauses, params
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        """Reserves the lock for a write and rolls its open transaction back if it fails."""
+        with self._lock.reserve():
+            try:
+                yield
+            except BaseException:
+                self._db.rollback()
+                raise
+
+    async def update_metadata(self, chunks: List[DocumentChunk]) -> None:
+        logger.info("updating_numpy_store_metadata", count=len(chunks))
+
+        def update() -> None:
+            with self._transaction():
+                self._db.executemany(
+                    "UPDATE chunks SET metadata = ? WHERE deleted = 0 AND id = ?",
+                    [(json.dumps(chunk.metadata), chunk.id) for chunk in chunks],
+                )
+                self._db.commit()
+
+        await self._run("update_metadata", update)
+
+    async def delete(self, ids: List[str]) -> None:
+        logger.info("deleting_from_numpy_store", count=len(ids))
+
+        def delete() -> None:
+            with self._transaction():
+                rows = self._tombstone(ids)
+                with self._lock.exclusive():
+                    self._db.commit()
+                    self._alive[rows] = False
+
+        await self._run("delete", delete)
+        self._maybe_compact()
+
+    async def delete_where(self, filters: Dict[str, Any]) -> None:
+        logger.info("deleting_from_numpy_store_where", filters=filters)
+
+        def delete() -> None:
+            clauses, params = self._where_clauses(filters)
+            if not clauses:
+                raise ValueError("delete_where requires at least one filter")
+            with self._transaction():
+                rows = [row for (row,) in self._db.execute(
+                    f"UPDATE chunks SET deleted = 1 WHERE deleted = 0 AND {' AND '.join(clauses)} RETURNING row", params
+                )]
+                with self._lock.exclusive():
+                    self._db.commit()
+                    self._alive[rows] = False
+
+        await self._run("delete_where", delete)
+        self._maybe_compact()
+
+    async def warm_up(self) -> None:
+        await self._run("warm_up", self._page_in)
+
+    def _page_in(self) -> None:
+        """Reads the array that searches scan and the side table, so they are in the page cache."""
+        with self._lock.read():
+            name = "codes" if self._quantized else "vectors"
+            if name in self._arrays and self._count:
+                flat = self._arrays[name][:self._count].reshape(-1)
+                # Reading one element per 4 KB page faults every page in
+                flat[::4096 // flat.itemsize].sum()
+            self._reader.execute("SELECT COUNT(*), SUM(LENGTH(metadata)) FROM chunks").fetchone()
+
+    def close(self) -> None:
+        # Waits for running searches and for a running compaction
+        with self._lock.write():
+            for array in self._arrays.values():
+                array.flush()
+            self._arrays = {}
+            self._reader.close()
+            self._db.close()
+
+    async def clear_all(self) -> None:
+        logger.info("clearing_numpy_store")
+        await self._run("clear_all", self._clear)
+
+    def _clear(self) -> None:
+        with self._lock.write():
+            self._arrays = {}
+            self._db.execute("DELETE FROM chunks")
+            self._db.execute("DELETE FROM store_info WHERE key = 'dim'")
+            self._db.commit()
+            for name in _ARRAYS:
+                self._remove_file(self._path_for(name, self._generation))
+            self._open()
+
+    # --- Compaction -----------------------------------------------------
+
+    def _maybe_compact(self) -> None:
+        if self.tombstone_ratio < self._compaction_threshold:
+            return
+        if self._compaction is not None and not self._compaction.done():
+            return
+        self._compaction = asyncio.create_task(asyncio.to_thread(self.compact))
+        self._compaction.add_done_callback(self._compaction_done)
+
+    @staticmethod
+    def _compaction_done(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("numpy_store_compaction_failed", error=str(task.exception()))
+
+    def compact(self) -> None:
+        """
+        Rewrites the array files and side table without tombstoned rows. Runs on a
+        worker thread; writes wait for it, searches only while it swaps the files.
+        """
+        with self._lock.reserve():
+            if "vectors" not in self._arrays or self._alive.all():
+                return
+            live_rows = np.flatnonzero(self._alive)
+            new_generation = self._generation + 1
+            committed = False
+            try:
+                for name, array in self._arrays.items():
+                    compacted = np.memmap(
+                        self._path_for(name, new_generation),
+                        dtype=_ARRAYS[name][0],
+                        mode="w+",
+                        shape=self._shape(name, max(len(live_rows), 1)),
+                    )
+                    for start in range(0, len(live_rows), 65_536):
+                        block = live_rows[start:start + 65_536]
+                        compacted[start:start + len(block)] = array[block]
+                    compacted.flush()
+                    del compacted
+
+                # The renumbered table is built in a transaction that searches,
+                # on the reader connection, do not see until it commits
+                self._db.execute("BEGIN")
+                self._db.execute(
+                    """
+                    CREATE TABLE chunks_compacted (
+                        row INTEGER PRIMARY KEY,
+                        id TEXT NOT NULL,
+                        content TEXT NOT NULL,
+                        metadata TEXT NOT NULL,
+                        deleted INTEGER NOT NULL DEFAULT 0
+                    )
+                    """
+                )
+                self._db.execute(
+                    """
+                    INSERT INTO chunks_compacted (row, id, content, metadata)
+                        SELECT ROW_NUMBER() OVER (ORDER BY row) - 1, id, content, metadata
+                        FROM chunks WHERE deleted = 0
+                    """
+                )
+                self._db.execute("DROP INDEX idx_chunks_live_id")
+                self._db.execute("CREATE UNIQUE INDEX idx_chunks_live_id ON chunks_compacted(id) WHERE deleted = 0")
+                with self._lock.exclusive():
+                    self._db.execute("DROP TABLE chunks")
+                    self._db.execute("ALTER TABLE chunks_compacted RENAME TO chunks")
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO store_info (key, value) VALUES ('generation', ?)", (str(new_generation),)
+                    )
+                    self._db.commit()
+                    committed = True
+                    old_names = list(self._arrays)
+                    self._arrays = {}
+                    for name in old_names:
+                        self._remove_file(self._path_for(name, self._generation))
+                    removed = self._count - len(live_rows)
+                    self._open()
+            except BaseException:
+                if not committed:
+                    self._db.rollback()
+                    for name in _ARRAYS:
+                        self._remove_file(self._path_for(name, new_generation))
+                raise
+            logger.info("numpy_store_compacted", removed=removed, rows=self._count)
@@ -1,27 +1,111 @@
-from typing import List
+import asyncio
+import time
+from contextlib import contextmanager
+from typing import AsyncIterator, Awaitable, Callable, Iterator, List, Optional, TypeVar
+import httpx
 import openai
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import AsyncRetrying, RetryCallState, retry_if_exception_type, stop_after_attempt, wait_random_exponential
 
+from src.adapters.rate_limiter import RateLimiter, retry_after_seconds
 from src.ports.llm import LLMPort
 from src.core.domain import DocumentChunk
+from src.core.metrics import LLM_REQUEST_DURATION, LLM_REQUEST_ERRORS
+from src.core.tokens import estimate_tokens
 from src.config import Settings
 import structlog
 
 logger = structlog.get_logger()
 
+T = TypeVar("T")
+
+WARM_UP_TIMEOUT_SECONDS = 5.0
+
+_RETRYABLE_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+_exponential_wait = wait_random_exponential(multiplier=0.5, max=20)
+
+def _retry_wait(retry_state: RetryCallState) -> float:
+    error = retry_state.outcome.exception()
+    if isinstance(error, openai.RateLimitError) and retry_after_seconds(error.response.headers) is not None:
+        # The rate limiter is paused for the Retry-After period already
+        return 0.0
+    return _exponential_wait(retry_state)
+
+def _pack_batches(texts: List[str], max_tokens: int, max_inputs: int) -> List[List[int]]:
+    """
+    Greedily packs text indices into request batches that stay under both the
+    per-request token budget and the per-request input limit.
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = 0
+    for i, text in enumerate(texts):
+        tokens = estimate_tokens(text)
+        if current and (current_tokens + tokens > max_tokens or len(current) >= max_inputs):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(i)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
 class OpenAIAdapter(LLMPort):
-    def __init__(self, settings: Settings):
-        self._client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+    def __init__(self, settings: Settings, http_client: Optional[httpx.AsyncClient] = None):
+        self._client = openai.AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_BASE_URL,
+            # Retries are done by _call, so that every attempt goes through the rate limiter
+            max_retries=0,
+            http_client=http_client,
+        )
         self._model = settings.OPENAI_MODEL
+        self._embedding_model = settings.OPENAI_EMBEDDING_MODEL
+        self._batch_max_tokens = settings.EMBEDDING_BATCH_MAX_TOKENS
+        self._batch_max_inputs = settings.EMBEDDING_BATCH_MAX_INPUTS
+        self._batch_semaphore = asyncio.Semaphore(settings.EMBEDDING_MAX_CONCURRENT_BATCHES)
+        self._max_attempts = settings.OPENAI_MAX_ATTEMPTS
+        self._chat_limiter = RateLimiter("chat", settings.OPENAI_CHAT_RPM, settings.OPENAI_CHAT_TPM)
+        self._embedding_limiter = RateLimiter(
+            "embeddings", settings.OPENAI_EMBEDDING_RPM, settings.OPENAI_EMBEDDING_TPM
+        )
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10),
-        reraise=True
-    )
-    async def generate_answer(self, query: str, context_chunks: List[DocumentChunk]) -> str:
-        logger.debug("generating_answer_with_openai", model=self._model)
-        
+    async def _call(self, operation: str, limiter: RateLimiter, tokens: int, request: Callable[[], Awaitable[T]]) -> T:
+        """
+        Sends one provider request through the rate limiter, retrying rate
+        limits, connection errors and 5xx responses. A 429 pauses the limiter for
+        the server's Retry-After, so all callers back off, not just this one.
+        """
+        async for attempt in AsyncRetrying(
+            stop=stop_after_attempt(self._max_attempts),
+            retry=retry_if_exception_type(_RETRYABLE_ERRORS),
+            wait=_retry_wait,
+            reraise=True,
+        ):
+            with attempt:
+                await limiter.acquire(tokens)
+                try:
+                    with self._timed(operation):
+                        result = await request()
+                except openai.RateLimitError as e:
+                    limiter.on_rate_limited(retry_after_seconds(e.response.headers))
+                    raise
+                limiter.on_success()
+                return result
+
+    @staticmethod
+    @contextmanager
+    def _timed(operation: str) -> Iterator[None]:
+        """Records the latency of each attempt, so retried attempts count separately."""
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            LLM_REQUEST_ERRORS.inc(operation=operation)
+            raise
+        finally:
+            LLM_REQUEST_DURATION.observe(time.perf_counter() - started, operation=operation)
+
+    def _build_messages(self, query: str, context_chunks: List[DocumentChunk]) -> List[dict]:
         context_text = "\n\n".join([f"Source {i+1}:\n{chunk.content}" for i, chunk in enumerate(context_chunks)])
         
         prompt = f"""You are a helpful corporate assistant. Use the following context to answer the user's question. 
@@ -32,23 +116,82 @@ class OpenAIAdapter(LLMPort):
         
         Question: {query}
         Answer:"""
-        
-        response = await self._client.chat.completions.create(
-            model=self._model,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0,
+        return [{"role": "user", "content": prompt}]
+
+    @staticmethod
+    def _prompt_tokens(messages: List[dict]) -> int:
+        return sum(estimate_tokens(message["content"]) for message in messages)
+
+    async def generate_answer(self, query: str, context_chunks: List[DocumentChunk]) -> str:
+        logger.debug("generating_answer_with_openai", model=self._model)
+        messages = self._build_messages(query, context_chunks)
+        response = await self._call(
+            "chat",
+            self._chat_limiter,
+            self._prompt_tokens(messages),
+            lambda: self._client.chat.completions.create(model=self._model, messages=messages, temperature=0),
         )
         return response.choices[0].message.content
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=4, max=10),
-        reraise=True
-    )
+    async def stream_answer(self, query: str, context_chunks: List[DocumentChunk]) -> AsyncIterator[str]:
+        logger.debug("streaming_answer_with_openai", model=self._model)
+        messages = self._build_messages(query, context_chunks)
+        # Only opening the stream is retried; once tokens have been sent to the
+        # client a failure can no longer be transparently replayed.
+        stream = await self._call(
+            "chat_stream_open",
+            self._chat_limiter,
+            self._prompt_tokens(messages),
+            lambda: self._client.chat.completions.create(
+                model=self._model, messages=messages, temperature=0, stream=True
+            ),
+        )
+        async for event in stream:
+            if event.choices and event.choices[0].delta.content:
+                yield event.choices[0].delta.content
+
+    async def warm_up(self) -> None:
+        """
+        Opens a connection to the API with a cheap metadata request, so the
+        first query does not pay for DNS, TCP and TLS setup. Failures are only
+        logged: the API may well be reachable by the time requests arrive.
+        """
+        try:
+            await self._client.with_options(timeout=WARM_UP_TIMEOUT_SECONDS).models.retrieve(self._model)
+            logger.debug("openai_warm_up_completed", model=self._model)
+        except openai.OpenAIError as e:
+            logger.warning("openai_warm_up_failed", error=str(e))
+
+    async def close(self) -> None:
+        await self._client.close()
+
     async def generate_embeddings(self, text: str) -> List[float]:
         logger.debug("generating_embeddings_with_openai")
-        response = await self._client.embeddings.create(
-            input=[text],
-            model="text-embedding-3-small"
+        embeddings = await self._embed_request([text])
+        return embeddings[0]
+
+    async def generate_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+
+        batches = _pack_batches(texts, self._batch_max_tokens, self._batch_max_inputs)
+        logger.debug("generating_embeddings_batch_with_openai", count=len(texts), batches=len(batches))
+
+        async def run(indices: List[int]) -> List[List[float]]:
+            async with self._batch_semaphore:
+                return await self._embed_request([texts[i] for i in indices])
+
+        # gather preserves batch order, and batches are contiguous index ranges,
+        # so flattening restores the original input order.
+        results = await asyncio.gather(*(run(indices) for indices in batches))
+        return [embedding for batch in results for embedding in batch]
+
+    async def _embed_request(self, texts: List[str]) -> List[List[float]]:
+        response = await self._call(
+            "embeddings",
+            self._embedding_limiter,
+            sum(estimate_tokens(text) for text in texts),
+            lambda: self._client.embeddings.create(input=texts, model=self._embedding_model),
         )
-        return response.data[0].embedding
+        # The API does not guarantee response order, so sort by the returned index.
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
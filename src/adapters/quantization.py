@@ -0,0 +1,34 @@
+from typing import Tuple
+
+import numpy as np
+
+# Rows converted to float32 per block; small enough for the buffer to stay in cache
+SCORE_BLOCK_ROWS = 1024
+
+def quantize_int8(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Symmetric per-row scalar quantization: each row is scaled so its largest
+    absolute component maps to 127. Returns (codes, scales) with
+    `vectors ~= codes * scales[:, None]`.
+    """
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+def int8_scores(codes: np.ndarray, scales: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """
+    Asymmetric inner products: the query stays float32 and only the stored side
+    is quantized, which keeps most of the ranking accuracy of exact search.
+    """
+    query = np.asarray(query, dtype=np.float32)
+    scores = np.empty(codes.shape[0], dtype=np.float32)
+    buffer = np.empty((SCORE_BLOCK_ROWS, codes.shape[1]), dtype=np.float32)
+    for start in range(0, codes.shape[0], SCORE_BLOCK_ROWS):
+        block = codes[start:start + SCORE_BLOCK_ROWS]
+        rows = len(block)
+        buffer[:rows] = block
+        np.dot(buffer[:rows], query, out=scores[start:start + rows])
+    scores *= scales
+    return scores
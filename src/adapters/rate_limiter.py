@@ -0,0 +1,150 @@
+import asyncio
+import heapq
+import itertools
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import List, Mapping, Optional, Tuple
+
+import structlog
+
+from src.core.metrics import LLM_RATE_LIMITED, RATE_LIMIT_WAIT
+from src.core.priority import Priority, current_priority
+
+logger = structlog.get_logger()
+
+# Buckets hold this many seconds' worth of quota, which bounds bursts
+BURST_SECONDS = 5.0
+
+# A 429 halves the effective rate (at most once per second, since one burst
+# typically produces several 429s); each success wins back a little of it
+_DECREASE_FACTOR = 0.5
+_MIN_SCALE = 0.1
+_RECOVERY_STEP = 0.02
+
+_PRIORITY_ORDER = {"interactive": 0, "background": 1}
+
+def retry_after_seconds(headers: Mapping[str, str]) -> Optional[float]:
+    """
+    Delay requested by the server, from `retry-after-ms` (sent by OpenAI) or
+    `retry-after` in seconds or as an HTTP date. None if absent or unparsable.
+    """
+    try:
+        if "retry-after-ms" in headers:
+            return max(0.0, float(headers["retry-after-ms"]) / 1000)
+        value = headers.get("retry-after")
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+class TokenBucket:
+    """
+    Refills at `per_minute / 60` units per second up to BURST_SECONDS of quota.
+    A request is admitted once the bucket holds its cost (capped at the
+    capacity) and may take the level negative, so oversized requests are not
+    starved and the long-run rate still matches `per_minute`.
+    """
+
+    def __init__(self, per_minute: float):
+        self.per_minute = per_minute
+        self.capacity = max(1.0, per_minute / 60 * BURST_SECONDS)
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def wait_time(self, cost: float, now: float, scale: float = 1.0) -> float:
+        """Seconds until `cost` can be taken at `scale` times the configured rate."""
+        rate = self.per_minute / 60 * scale
+        self.level = min(self.capacity, self.level + (now - self._updated) * rate)
+        self._updated = now
+        missing = min(cost, self.capacity) - self.level
+        return missing / rate if missing > 0 else 0.0
+
+    def take(self, cost: float) -> None:
+        self.level -= cost
+
+class RateLimiter:
+    """
+    Client-side limiter for one kind of upstream request, with optional
+    requests-per-minute and tokens-per-minute buckets.
+
+    - Waiting calls are admitted strictly by priority, then in arrival order,
+      so interactive calls overtake queued background work.
+    - `on_rate_limited` pauses every call until the server's Retry-After has
+      passed and lowers the effective rate; successes restore it gradually.
+    """
+
+    def __init__(self, name: str, requests_per_minute: Optional[int] = None, tokens_per_minute: Optional[int] = None):
+        self.name = name
+        self._requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self._tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._scale = 1.0
+        self._last_decrease = 0.0
+        self._paused_until = 0.0
+        self._waiters: List[Tuple[int, int, "asyncio.Future[None]", int]] = []
+        self._sequence = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def scale(self) -> float:
+        """Fraction of the configured rates currently in effect."""
+        return self._scale
+
+    @property
+    def waiting(self) -> int:
+        return sum(not future.done() for _, _, future, _ in self._waiters)
+
+    async def acquire(self, tokens: int = 0, priority: Optional[Priority] = None) -> None:
+        """Waits until one request costing `tokens` may be sent."""
+        priority = priority or current_priority()
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (_PRIORITY_ORDER[priority], next(self._sequence), future, tokens))
+        started = time.monotonic()
+        self._dispatch()
+        await future
+        RATE_LIMIT_WAIT.observe(time.monotonic() - started, limiter=self.name, priority=priority)
+
+    def on_rate_limited(self, retry_after: Optional[float]) -> None:
+        now = time.monotonic()
+        if retry_after:
+            self._paused_until = max(self._paused_until, now + retry_after)
+        if (self._requests or self._tokens) and now - self._last_decrease >= 1.0:
+            self._scale = max(_MIN_SCALE, self._scale * _DECREASE_FACTOR)
+            self._last_decrease = now
+        LLM_RATE_LIMITED.inc(operation=self.name)
+        logger.warning("llm_rate_limited", limiter=self.name, retry_after=retry_after, rate_scale=self._scale)
+        self._dispatch()
+
+    def on_success(self) -> None:
+        self._scale = min(1.0, self._scale + _RECOVERY_STEP)
+
+    def _dispatch(self) -> None:
+        """Admits waiters from the head of the queue until one has to wait, then sets a timer for it."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._waiters:
+            _, _, future, tokens = self._waiters[0]
+            if future.done():
+                # The caller was cancelled while waiting
+                heapq.heappop(self._waiters)
+                continue
+            now = time.monotonic()
+            wait = max(
+                self._paused_until - now,
+                self._requests.wait_time(1, now, self._scale) if self._requests else 0.0,
+                self._tokens.wait_time(tokens, now, self._scale) if self._tokens else 0.0,
+            )
+            if wait > 0:
+                self._timer = asyncio.get_running_loop().call_later(wait, self._dispatch)
+                return
+            heapq.heappop(self._waiters)
+            if self._requests:
+                self._requests.take(1)
+            if self._tokens:
+                self._tokens.take(tokens)
+            future.set_result(None)
@@ -0,0 +1,120 @@
+import asyncio
+import heapq
+import itertools
+import zlib
+from typing import Any, Dict, List, Optional
+
+import structlog
+
+from src.ports.storage import ShardedVectorStoragePort, VectorStoragePort
+from src.core.domain import DocumentChunk, SearchQuery, SearchResult
+
+logger = structlog.get_logger()
+
+class ShardedVectorStore(ShardedVectorStoragePort):
+    """
+    VectorStoragePort that spreads chunks over several underlying stores of
+    the same kind.
+
+    - Chunks are routed by a CRC32 of their `source` metadata (of the chunk id
+      if they have none), so routing is stable across processes and every
+      chunk of a source lives in one shard.
+    - Searches go to all shards concurrently; each returns its own top_k, and
+      the sorted lists are merged with a heap into the global top_k.
+    - Searches and deletes filtered on exactly one source only touch its shard.
+    """
+
+    def __init__(self, shards: List[VectorStoragePort]):
+        if not shards:
+            raise ValueError("ShardedVectorStore needs at least one shard")
+        self._shards = shards
+
+    @property
+    def shard_count(self) -> int:
+        return len(self._shards)
+
+    @property
+    def shards(self) -> List[VectorStoragePort]:
+        return list(self._shards)
+
+    def shard_for_source(self, source: str) -> int:
+        return zlib.crc32(source.encode("utf-8")) % len(self._shards)
+
+    def _shard_for_chunk(self, chunk: DocumentChunk) -> int:
+        source = chunk.metadata.get("source")
+        return self.shard_for_source(source if isinstance(source, str) else chunk.id)
+
+    def _shard_for_filters(self, filters: Optional[Dict[str, Any]]) -> Optional[int]:
+        """The only shard that can match `filters`, or None if any can."""
+        if filters and len(filters) == 1 and isinstance(filters.get("source"), str):
+            return self.shard_for_source(filters["source"])
+        return None
+
+    def _group(self, chunks: List[DocumentChunk]) -> Dict[int, List[DocumentChunk]]:
+        groups: Dict[int, List[DocumentChunk]] = {}
+        for chunk in chunks:
+            groups.setdefault(self._shard_for_chunk(chunk), []).append(chunk)
+        return groups
+
+    def _merge(self, per_shard: List[List[SearchResult]], top_k: int) -> List[SearchResult]:
+        # Each list is sorted by distance, so a lazy k-way heap merge stops after top_k
+        merged = heapq.merge(*per_shard, key=lambda result: result.score)
+        return list(itertools.islice(merged, top_k))
+
+    async def upsert(self, chunks: List[DocumentChunk]) -> None:
+        groups = self._group(chunks)
+        logger.debug("upserting_to_shards", count=len(chunks), shards=sorted(groups))
+        await asyncio.gather(*(self._shards[index].upsert(group) for index, group in groups.items()))
+
+    async def search(self, query: SearchQuery) -> List[SearchResult]:
+        index = self._shard_for_filters(query.filters)
+        if index is not None:
+            return await self._shards[index].search(query)
+        per_shard = await asyncio.gather(*(shard.search(query) for shard in self._shards))
+        return self._merge(per_shard, query.top_k)
+
+    async def search_many(self, queries: List[SearchQuery]) -> List[List[SearchResult]]:
+        # Each shard answers the queries that can match it with one batched search_many
+        positions: List[List[int]] = [[] for _ in self._shards]
+        for position, query in enumerate(queries):
+            index = self._shard_for_filters(query.filters)
+            for shard_index in range(len(self._shards)) if index is None else [index]:
+                positions[shard_index].append(position)
+
+        async def search_shard(shard_index: int) -> None:
+            if positions[shard_index]:
+                results = await self._shards[shard_index].search_many([queries[p] for p in positions[shard_index]])
+                for position, found in zip(positions[shard_index], results):
+                    per_query[position][shard_index] = found
+
+        # Indexed by shard rather than by completion, so ties merge deterministically
+        per_query: List[List[List[SearchResult]]] = [[[] for _ in self._shards] for _ in queries]
+        await asyncio.gather(*(search_shard(index) for index in range(len(self._shards))))
+        return [self._merge(per_shard, query.top_k) for query, per_shard in zip(queries, per_query)]
+
+    async def update_metadata(self, chunks: List[DocumentChunk]) -> None:
+        groups = self._group(chunks)
+        await asyncio.gather(*(self._shards[index].update_metadata(group) for index, group in groups.items()))
+
+    async def delete(self, ids: List[str]) -> None:
+        # Ids do not tell which shard holds them
+        await asyncio.gather(*(shard.delete(ids) for shard in self._shards))
+
+    async def delete_where(self, filters: Dict[str, Any]) -> None:
+        index = self._shard_for_filters(filters)
+        shards = self._shards if index is None else [self._shards[index]]
+        await asyncio.gather(*(shard.delete_where(filters) for shard in shards))
+
+    async def clear_all(self) -> None:
+        await asyncio.gather(*(shard.clear_all() for shard in self._shards))
+
+    async def clear_shard(self, index: int) -> None:
+        logger.info("clearing_shard", shard=index)
+        await self._shards[index].clear_all()
+
+    async def warm_up(self) -> None:
+        await asyncio.gather(*(shard.warm_up() for shard in self._shards))
+
+    def close(self) -> None:
+        for shard in self._shards:
+            shard.close()
@@ -0,0 +1,100 @@
+import asyncio
+import os
+import sqlite3
+import threading
+from typing import Dict, List
+
+from src.core.domain import DocumentSource
+from src.ports.manifest import SourceManifestPort
+import structlog
+
+logger = structlog.get_logger()
+
+class SqliteManifestAdapter(SourceManifestPort):
+    """Source manifest kept in a single SQLite table of (source, chunk_id, chunk_index)."""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS source_chunks ("
+            "chunk_id TEXT PRIMARY KEY, source TEXT NOT NULL, chunk_index INTEGER NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_source_chunks_source ON source_chunks(source)")
+        self._db.commit()
+
+    async def get(self, source: str) -> Dict[str, int]:
+        def get() -> Dict[str, int]:
+            with self._lock:
+                return dict(self._db.execute(
+                    "SELECT chunk_id, chunk_index FROM source_chunks WHERE source = ?", (source,)
+                ))
+
+        return await asyncio.to_thread(get)
+
+    async def add(self, source: str, chunks: Dict[str, int]) -> None:
+        def add() -> None:
+            with self._lock:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO source_chunks (chunk_id, source, chunk_index) VALUES (?, ?, ?)",
+                    [(chunk_id, source, index) for chunk_id, index in chunks.items()],
+                )
+                self._db.commit()
+
+        await asyncio.to_thread(add)
+
+    async def replace(self, source: str, chunks: Dict[str, int]) -> None:
+        def replace() -> None:
+            with self._lock:
+                self._db.execute("DELETE FROM source_chunks WHERE source = ?", (source,))
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO source_chunks (chunk_id, source, chunk_index) VALUES (?, ?, ?)",
+                    [(chunk_id, source, index) for chunk_id, index in chunks.items()],
+                )
+                self._db.commit()
+
+        logger.debug("replacing_source_manifest", source=source, count=len(chunks))
+        await asyncio.to_thread(replace)
+
+    async def list_sources(self) -> List[DocumentSource]:
+        def list_sources() -> List[DocumentSource]:
+            with self._lock:
+                return [
+                    DocumentSource(source=source, chunks=count)
+                    for source, count in self._db.execute(
+                        "SELECT source, COUNT(*) FROM source_chunks GROUP BY source ORDER BY source"
+                    )
+                ]
+
+        return await asyncio.to_thread(list_sources)
+
+    async def remove_source(self, source: str) -> int:
+        def remove() -> int:
+            with self._lock:
+                removed = self._db.execute("DELETE FROM source_chunks WHERE source = ?", (source,)).rowcount
+                self._db.commit()
+                return removed
+
+        return await asyncio.to_thread(remove)
+
+    async def remove_ids(self, ids: List[str]) -> None:
+        def remove() -> None:
+            with self._lock:
+                self._db.executemany("DELETE FROM source_chunks WHERE chunk_id = ?", [(i,) for i in ids])
+                self._db.commit()
+
+        await asyncio.to_thread(remove)
+
+    async def clear(self) -> None:
+        def clear() -> None:
+            with self._lock:
+                self._db.execute("DELETE FROM source_chunks")
+                self._db.commit()
+
+        await asyncio.to_thread(clear)
+
+    def close(self) -> None:
+        self._db.close()
@@ -1,44 +1,198 @@
-from functools import lru_cache
+import os
 from fastapi import Depends
-from src.config import Settings, settings
+from src.config import Settings, get_settings
 from src.ports.llm import LLMPort
 from src.ports.storage import VectorStoragePort
-from src.adapters.chroma_adapter import ChromaAdapter
-from src.adapters.openai_adapter import OpenAIAdapter
+from src.adapters.cached_llm_adapter import CachedLLMAdapter
+from src.adapters.coalescing_llm_adapter import CoalescingLLMAdapter
+from src.adapters.batching_llm_adapter import BatchingLLMAdapter
+from src.adapters.hashing_embedding_adapter import HashingEmbeddingAdapter
+from src.adapters.sharded_storage_adapter import ShardedVectorStore
+from src.adapters.sqlite_manifest_adapter import SqliteManifestAdapter
 from src.ports.document_processor import DocumentProcessorPort
-from src.adapters.document_processor_adapter import LocalDocumentProcessor
+from src.ports.manifest import SourceManifestPort
 from src.core.rag_service import RAGService
+from src.core.domain import ChunkingOptions
+from src.core.answer_cache import SemanticAnswerCache
+from src.core.ingestion_jobs import IngestionJobManager
+from src.core.keyed_lock import KeyedLock
+from src.core.singleflight import SingleFlight
 
-@lru_cache()
-def get_settings() -> Settings:
-    return settings
+# The adapters for chromadb, openai and pypdf are imported in the factories
+# below rather than here: together they take most of the app's import time,
+# and only the configured ones are needed.
 
 # Singletons for adapters
 _llm_adapter: LLMPort = None
 _storage_adapter: VectorStoragePort = None
 _doc_processor: DocumentProcessorPort = None
+_answer_cache: SemanticAnswerCache = None
+_manifest: SourceManifestPort = None
+_query_flight: SingleFlight = None
+_source_locks: KeyedLock = None
+_job_manager: IngestionJobManager = None
 
-def get_doc_processor() -> DocumentProcessorPort:
+def get_doc_processor(settings: Settings = Depends(get_settings)) -> DocumentProcessorPort:
     global _doc_processor
     if _doc_processor is None:
-        _doc_processor = LocalDocumentProcessor()
+        from src.adapters.document_processor_adapter import LocalDocumentProcessor
+        _doc_processor = LocalDocumentProcessor(
+            pdf_workers=settings.PDF_EXTRACTION_WORKERS,
+            pages_per_task=settings.PDF_PAGES_PER_TASK,
+        )
     return _doc_processor
 
 def get_llm_port(settings: Settings = Depends(get_settings)) -> LLMPort:
     global _llm_adapter
     if _llm_adapter is None:
+        from src.adapters.openai_adapter import OpenAIAdapter
         _llm_adapter = OpenAIAdapter(settings)
+        if settings.EMBEDDING_BACKEND == "hashing":
+            # Local embeddings are cheaper to recompute than to cache, batch or coalesce
+            _llm_adapter = HashingEmbeddingAdapter(_llm_adapter, dim=settings.HASHING_EMBEDDING_DIM)
+            return _llm_adapter
+        if settings.EMBEDDING_CACHE_ENABLED:
+            _llm_adapter = CachedLLMAdapter(
+                _llm_adapter,
+                model=settings.OPENAI_EMBEDDING_MODEL,
+                path=settings.EMBEDDING_CACHE_PATH,
+                max_memory_bytes=settings.EMBEDDING_CACHE_MEMORY_MB * 1024 * 1024,
+                max_disk_bytes=settings.EMBEDDING_CACHE_MAX_DISK_MB * 1024 * 1024,
+            )
+        if settings.QUERY_BATCH_MAX_SIZE > 1:
+            _llm_adapter = BatchingLLMAdapter(
+                _llm_adapter,
+                max_batch_size=settings.QUERY_BATCH_MAX_SIZE,
+                max_wait_ms=settings.QUERY_BATCH_MAX_WAIT_MS,
+            )
+        if settings.REQUEST_COALESCING_ENABLED:
+            # Outermost, so identical concurrent texts share the cache lookup too
+            _llm_adapter = CoalescingLLMAdapter(_llm_adapter)
     return _llm_adapter
 
+def _create_store(settings: Settings, shard: int | None = None) -> VectorStoragePort:
+    if shard is not None:
+        settings = settings.model_copy(update={
+            "CHROMA_COLLECTION_NAME": f"{settings.CHROMA_COLLECTION_NAME}_shard{shard}",
+            "NUMPY_STORE_DIRECTORY": os.path.join(settings.NUMPY_STORE_DIRECTORY, f"shard{shard}"),
+        })
+    if settings.VECTOR_STORE_BACKEND == "numpy":
+        from src.adapters.numpy_adapter import NumpyAdapter
+        return NumpyAdapter(settings)
+    from src.adapters.chroma_adapter import ChromaAdapter
+    return ChromaAdapter(settings)
+
 def get_storage_port(settings: Settings = Depends(get_settings)) -> VectorStoragePort:
     global _storage_adapter
     if _storage_adapter is None:
-        _storage_adapter = ChromaAdapter(settings)
+        if settings.VECTOR_STORE_SHARDS > 1:
+            _storage_adapter = ShardedVectorStore(
+                [_create_store(settings, shard) for shard in range(settings.VECTOR_STORE_SHARDS)]
+            )
+        else:
+            _storage_adapter = _create_store(settings)
     return _storage_adapter
 
+def get_manifest_port(settings: Settings = Depends(get_settings)) -> SourceManifestPort:
+    global _manifest
+    if _manifest is None:
+        path = settings.SOURCE_MANIFEST_PATH
+        if path is None:
+            directory = (
+                settings.NUMPY_STORE_DIRECTORY
+                if settings.VECTOR_STORE_BACKEND == "numpy"
+                else settings.CHROMA_PERSIST_DIRECTORY
+            )
+            path = os.path.join(directory, "source_manifest.sqlite")
+        _manifest = SqliteManifestAdapter(path)
+    return _manifest
+
+def get_answer_cache(settings: Settings = Depends(get_settings)) -> SemanticAnswerCache | None:
+    global _answer_cache
+    if not settings.ANSWER_CACHE_ENABLED:
+        return None
+    if _answer_cache is None:
+        _answer_cache = SemanticAnswerCache(
+            threshold=settings.ANSWER_CACHE_SIMILARITY_THRESHOLD,
+            max_entries=settings.ANSWER_CACHE_MAX_ENTRIES,
+        )
+    return _answer_cache
+
+def get_query_flight(settings: Settings = Depends(get_settings)) -> SingleFlight | None:
+    global _query_flight
+    if not settings.REQUEST_COALESCING_ENABLED:
+        return None
+    if _query_flight is None:
+        _query_flight = SingleFlight("answer_query")
+    return _query_flight
+
+def get_source_locks() -> KeyedLock:
+    global _source_locks
+    if _source_locks is None:
+        _source_locks = KeyedLock()
+    return _source_locks
+
 def get_rag_service(
     llm: LLMPort = Depends(get_llm_port),
     storage: VectorStoragePort = Depends(get_storage_port),
-    doc_processor: DocumentProcessorPort = Depends(get_doc_processor)
+    doc_processor: DocumentProcessorPort = Depends(get_doc_processor),
+    answer_cache: SemanticAnswerCache | None = Depends(get_answer_cache),
+    manifest: SourceManifestPort = Depends(get_manifest_port),
+    query_flight: SingleFlight | None = Depends(get_query_flight),
+    source_locks: KeyedLock = Depends(get_source_locks),
+    settings: Settings = Depends(get_settings),
 ) -> RAGService:
-    return RAGService(storage=storage, llm=llm, doc_processor=doc_processor)
+    return RAGService(
+        storage=storage,
+        llm=llm,
+        doc_processor=doc_processor,
+        answer_cache=answer_cache,
+        ingest_batch_size=settings.INGEST_BATCH_SIZE,
+        default_chunking=ChunkingOptions(
+            strategy=settings.CHUNK_STRATEGY,
+            chunk_size=settings.CHUNK_SIZE,
+            overlap=settings.CHUNK_OVERLAP,
+        ),
+        manifest=manifest,
+        query_flight=query_flight,
+        context_token_budget=settings.CONTEXT_TOKEN_BUDGET,
+        source_locks=source_locks,
+    )
+
+def build_rag_service(settings: Settings) -> RAGService:
+    """Builds the service and all its adapters outside a request, e.g. at startup."""
+    return get_rag_service(
+        llm=get_llm_port(settings),
+        storage=get_storage_port(settings),
+        doc_processor=get_doc_processor(settings),
+        answer_cache=get_answer_cache(settings),
+        manifest=get_manifest_port(settings),
+        query_flight=get_query_flight(settings),
+        source_locks=get_source_locks(),
+        settings=settings,
+    )
+
+async def close_adapters() -> None:
+    """
+    Closes the adapters built so far (at shutdown) and forgets every singleton,
+    so the next use builds new ones rather than reusing closed or loop-bound state.
+    """
+    global _llm_adapter, _storage_adapter, _doc_processor, _manifest
+    global _answer_cache, _query_flight, _source_locks, _job_manager
+    if _llm_adapter is not None:
+        await _llm_adapter.close()
+    for adapter in (_storage_adapter, _doc_processor, _manifest):
+        if adapter is not None:
+            adapter.close()
+    _llm_adapter = _storage_adapter = _doc_processor = _manifest = None
+    _answer_cache = _query_flight = _source_locks = _job_manager = None
+
+def get_job_manager(settings: Settings = Depends(get_settings)) -> IngestionJobManager:
+    global _job_manager
+    if _job_manager is None:
+        _job_manager = IngestionJobManager(
+            max_queue_size=settings.INGEST_QUEUE_MAX_SIZE,
+            workers=settings.INGEST_WORKERS,
+            max_finished_jobs=settings.INGEST_JOB_RETENTION,
+        )
+    return _job_manager
@@ -1,14 +1,70 @@
-from fastapi import FastAPI, Depends, UploadFile, File
+import asyncio
+import io
+import json
+import time
+from contextlib import asynccontextmanager, suppress
+from typing import AsyncIterator, BinaryIO, List, Optional
+
+import structlog
+from fastapi import FastAPI, Depends, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
+from starlette.datastructures import FormData, UploadFile
+from starlette.formparsers import MultiPartException, MultiPartParser
+from starlette.requests import ClientDisconnect
 
-from src.api.dependencies import get_rag_service
+from src.api.dependencies import build_rag_service, close_adapters, get_job_manager, get_rag_service, get_settings
 from src.core.rag_service import RAGService
-from src.core.domain import LLMResponse, DocumentChunk
+from src.config import Settings, setup_logging
+from src.core.domain import (
+    AnswerStreamEvent, BatchAnswer, ChunkingOptions, DocumentSource, IngestionJob, LLMResponse, DocumentChunk
+)
+from src.core.ingestion_jobs import IngestionJobManager
+from src.core.metrics import INGEST_QUEUE_DEPTH, REGISTRY
+from src.core.exceptions import AppException, PayloadTooLargeError
 from src.api.middleware import LoggingMiddleware
 from src.api.errors import setup_exception_handlers
 
-app = FastAPI(title="Corporate Knowledge Base RAG API")
+logger = structlog.get_logger()
+
+async def _warm_up(service: RAGService, build_ms: float) -> Optional[str]:
+    """Runs the adapters' warm-up; returns the error that made it fail, if any."""
+    try:
+        timings = await service.warm_up()
+    except Exception as e:
+        logger.error("startup_warm_up_failed", error=str(e))
+        return str(e)
+    logger.info("startup_warm_up_completed", build_ms=build_ms, timings_ms=timings)
+    return None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    settings = get_settings()
+    setup_logging(settings)
+    REGISTRY.configure(latency_buckets=settings.METRICS_LATENCY_BUCKETS)
+    job_manager = get_job_manager(settings)
+    job_manager.start()
+    app.state.warm_up = None
+    if settings.STARTUP_WARMUP:
+        # The adapters are built before the server accepts requests, so no
+        # request builds them concurrently and a misconfigured store fails the
+        # startup. Warming them up runs in the background while /ready is 503.
+        # A service set as app.state.rag_service beforehand is warmed up instead.
+        started = time.perf_counter()
+        service = getattr(app.state, "rag_service", None) or build_rag_service(settings)
+        build_ms = round((time.perf_counter() - started) * 1000, 2)
+        app.state.warm_up = asyncio.create_task(_warm_up(service, build_ms))
+    yield
+    if app.state.warm_up is not None:
+        app.state.warm_up.cancel()
+        with suppress(asyncio.CancelledError):
+            await app.state.warm_up
+    await job_manager.stop()
+    await close_adapters()
+
+app = FastAPI(title="Corporate Knowledge Base RAG API", lifespan=lifespan)
 
 # Setup Middleware
 app.add_middleware(LoggingMiddleware)
@@ -19,38 +75,171 @@ setup_exception_handlers(app)
 # Mount Static Files (for UI)
 app.mount("/static", StaticFiles(directory="src/api/static"), name="static")
 
-@app.post("/upload")
+def _queue_file_ingestion(
+    job_manager: IngestionJobManager,
+    rag_service: RAGService,
+    file: BinaryIO,
+    filename: str,
+    chunking: ChunkingOptions | None = None,
+) -> IngestionJob:
+    """Queues ingestion of `file`, which is closed once the job has finished with it."""
+    async def work(job: IngestionJob) -> dict:
+        try:
+            result = await rag_service.process_file_upload(
+                file, filename, progress=job.progress, chunking=chunking
+            )
+        finally:
+            file.close()
+        return result.model_dump()
+
+    try:
+        return job_manager.submit(filename, work)
+    except Exception:
+        file.close()
+        raise
+
+class _UploadFields(BaseModel):
+    chunk_strategy: str | None = None
+    chunk_size: int | None = None
+    chunk_overlap: int | None = None
+
+class _BodyTooLarge(MultiPartException):
+    """
+    Raised by `_limited_body` inside the multipart parser. Every Starlette
+    release closes the files it spooled so far on MultiPartException (only
+    1.6+ does so on any error), so none are left open.
+    """
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"Upload exceeds the limit of {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+async def _limited_body(request: Request, max_bytes: int) -> AsyncIterator[bytes]:
+    received = 0
+    async for data in request.stream():
+        received += len(data)
+        if received > max_bytes:
+            raise _BodyTooLarge(max_bytes)
+        yield data
+
+async def _receive_upload(request: Request, max_bytes: int) -> tuple[UploadFile, _UploadFields]:
+    """
+    Parses the multipart /upload body as it arrives. The file part is written
+    to a temporary file (kept in memory up to 1 MB, then moved to disk), and
+    the upload is rejected with 413 as soon as the body exceeds `max_bytes`,
+    or before reading it if Content-Length already does.
+    """
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > max_bytes:
+        raise PayloadTooLargeError(
+            f"Upload exceeds the limit of {max_bytes} bytes", details={"max_bytes": max_bytes}
+        )
+    if not request.headers.get("content-type", "").startswith("multipart/form-data"):
+        form = FormData()
+    else:
+        parser = MultiPartParser(request.headers, _limited_body(request, max_bytes), max_files=1, max_fields=10)
+        try:
+            form = await parser.parse()
+        except _BodyTooLarge as e:
+            raise PayloadTooLargeError(e.message, details={"max_bytes": e.max_bytes})
+        except MultiPartException as e:
+            raise HTTPException(status_code=400, detail=e.message)
+
+    file = form.get("file")
+    try:
+        if not isinstance(file, UploadFile):
+            raise RequestValidationError([{"type": "missing", "loc": ("body", "file"), "msg": "Field required", "input": None}])
+        try:
+            fields = _UploadFields.model_validate({key: value for key, value in form.multi_items() if isinstance(value, str)})
+        except ValidationError as e:
+            raise RequestValidationError(
+                [dict(error, loc=("body", *error["loc"])) for error in e.errors(include_url=False, include_context=False)]
+            )
+    except RequestValidationError:
+        await form.close()
+        raise
+    return file, fields
+
+_UPLOAD_REQUEST_BODY = {
+    "required": True,
+    "content": {"multipart/form-data": {"schema": {
+        "type": "object",
+        "required": ["file"],
+        "properties": {
+            "file": {"type": "string", "format": "binary"},
+            "chunk_strategy": {"type": "string", "enum": ["character", "recursive", "sentence"]},
+            "chunk_size": {"type": "integer"},
+            "chunk_overlap": {"type": "integer"},
+        },
+    }}},
+}
+
+@app.post("/upload", status_code=202, openapi_extra={"requestBody": _UPLOAD_REQUEST_BODY})
 async def upload_file(
-    file: UploadFile = File(...),
-    rag_service: RAGService = Depends(get_rag_service)
+    request: Request,
+    rag_service: RAGService = Depends(get_rag_service),
+    job_manager: IngestionJobManager = Depends(get_job_manager),
+    settings: Settings = Depends(get_settings)
+):
+    """
+    Upload a file (PDF/TXT) and queue it for background processing and ingestion.
+    Chunking can be tuned per upload; omitted fields use the configured defaults.
+    Poll `/jobs/{job_id}` for progress.
+
+    The body is streamed to a temporary file that extraction reads from, so
+    memory per upload does not grow with the file size.
+    """
+    file, fields = await _receive_upload(request, settings.MAX_UPLOAD_BYTES)
+    try:
+        chunking = ChunkingOptions(
+            strategy=fields.chunk_strategy or settings.CHUNK_STRATEGY,
+            chunk_size=fields.chunk_size if fields.chunk_size is not None else settings.CHUNK_SIZE,
+            overlap=fields.chunk_overlap if fields.chunk_overlap is not None else settings.CHUNK_OVERLAP,
+        )
+    except ValidationError as e:
+        await file.close()
+        raise RequestValidationError(e.errors(include_url=False, include_context=False))
+
+    job = _queue_file_ingestion(job_manager, rag_service, file.file, file.filename, chunking)
+    return {"status": "queued", "filename": file.filename, "job_id": job.id}
+
+@app.get("/jobs/{job_id}", response_model=IngestionJob)
+async def get_job(
+    job_id: str,
+    job_manager: IngestionJobManager = Depends(get_job_manager)
 ):
     """
-    Upload a file (PDF/TXT), process it, and ingest into the vector store.
+    Report the status, stage-level progress and result of an ingestion job.
     """
-    content = await file.read()
-    num_chunks = await rag_service.process_file_upload(content, file.filename)
-    return {"status": "success", "filename": file.filename, "chunks_ingested": num_chunks}
+    return job_manager.get(job_id)
 
 class ChatRequest(BaseModel):
-    message: str = Field(..., example="What is the remote work policy?")
+    message: str = Field(..., examples=["What is the remote work policy?"])
+
+class BatchChatRequest(BaseModel):
+    questions: list[str] = Field(..., min_length=1, max_length=1000, examples=[["What is the remote work policy?"]])
 
 class IngestRequest(BaseModel):
     chunks: list[DocumentChunk]
 
 class IngestTextRequest(BaseModel):
-    text: str = Field(..., example="This is some raw text to index.")
-    filename: str = Field(..., example="manual_input.txt")
+    text: str = Field(..., examples=["This is some raw text to index."])
+    filename: str = Field(..., examples=["manual_input.txt"])
+    chunking: ChunkingOptions | None = None
 
-@app.post("/ingest-text")
+@app.post("/ingest-text", status_code=202)
 async def ingest_text(
     request: IngestTextRequest,
-    rag_service: RAGService = Depends(get_rag_service)
+    rag_service: RAGService = Depends(get_rag_service),
+    job_manager: IngestionJobManager = Depends(get_job_manager)
 ):
     """
-    Ingest raw text directly, chunking it and storing it.
+    Queue raw text for background chunking and ingestion.
     """
-    num_chunks = await rag_service.process_file_upload(request.text.encode("utf-8"), request.filename)
-    return {"status": "success", "filename": request.filename, "chunks_ingested": num_chunks}
+    job = _queue_file_ingestion(
+        job_manager, rag_service, io.BytesIO(request.text.encode("utf-8")), request.filename, request.chunking
+    )
+    return {"status": "queued", "filename": request.filename, "job_id": job.id}
 
 @app.post("/ingest")
 async def ingest(
@@ -63,8 +252,127 @@ async def ingest(
     await rag_service.ingest_documents(request.chunks)
     return {"status": "success", "message": f"Ingested {len(request.chunks)} chunks"}
 
+# Invalid lines beyond this many are counted but not described in the summary
+_MAX_REPORTED_LINE_ERRORS = 100
+
+class _LineErrors:
+    """Invalid NDJSON lines: every one is counted, the first few are described."""
+
+    def __init__(self):
+        self.count = 0
+        self.reported: List[dict] = []
+
+    def add(self, line_number: int, message: str) -> None:
+        self.count += 1
+        if len(self.reported) < _MAX_REPORTED_LINE_ERRORS:
+            self.reported.append({"line": line_number, "error": message})
+
+async def _ndjson_chunks(request: Request, errors: _LineErrors, max_line_bytes: int) -> AsyncIterator[DocumentChunk]:
+    """
+    Parses the request body as NDJSON, one DocumentChunk per line, as it
+    arrives. Lines that are not valid chunks, or longer than `max_line_bytes`,
+    are skipped and recorded in `errors` with their 1-based line number. An
+    over-long line is dropped as soon as it passes the limit, so memory stays
+    bounded even if the body has no newline at all.
+    """
+    too_long = f"Line exceeds {max_line_bytes} bytes"
+    partial: List[bytes] = []
+    partial_bytes = 0
+    # The current line passed max_line_bytes; its remaining bytes are dropped
+    overlong = False
+    line_number = 0
+
+    def parse(line: bytes) -> DocumentChunk | None:
+        if len(line) > max_line_bytes:
+            errors.add(line_number, too_long)
+            return None
+        try:
+            return DocumentChunk.model_validate_json(line)
+        except ValidationError as e:
+            errors.add(line_number, e.errors(include_url=False)[0]["msg"])
+            return None
+
+    async for data in request.stream():
+        *lines, rest = data.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if overlong:
+                errors.add(line_number, too_long)
+            else:
+                # Complete the line started in earlier network chunks
+                line = b"".join(partial) + line
+                if line.strip() and (chunk := parse(line)) is not None:
+                    yield chunk
+            partial, partial_bytes, overlong = [], 0, False
+        if not overlong:
+            partial.append(rest)
+            partial_bytes += len(rest)
+            if partial_bytes > max_line_bytes:
+                partial, partial_bytes, overlong = [], 0, True
+    last = b"".join(partial)
+    if overlong or last.strip():
+        line_number += 1
+        if overlong:
+            errors.add(line_number, too_long)
+        elif (chunk := parse(last)) is not None:
+            yield chunk
+
+class _DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse for endpoints that keep reading the request body while
+    the response is being sent. The stock implementation listens for a client
+    disconnect on `receive` in parallel, which would swallow the remaining
+    body messages; here the body reader sees the disconnect instead, and a
+    failed send is reported as a disconnect like the stock implementation does.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+        if self.background is not None:
+            await self.background()
+
+@app.post("/ingest/stream")
+async def ingest_stream(
+    request: Request,
+    rag_service: RAGService = Depends(get_rag_service),
+    settings: Settings = Depends(get_settings)
+):
+    """
+    Bulk-ingest document chunks sent as NDJSON (one `DocumentChunk` object per
+    line). The body is read and validated incrementally while earlier batches
+    are embedded and stored, and the response streams one NDJSON
+    acknowledgement per batch followed by a summary line.
+    """
+    errors = _LineErrors()
+    acks = rag_service.ingest_stream(
+        _ndjson_chunks(request, errors, settings.INGEST_STREAM_MAX_LINE_BYTES),
+        batch_size=settings.INGEST_BATCH_SIZE,
+        max_in_flight=settings.INGEST_STREAM_MAX_IN_FLIGHT,
+    )
+
+    async def ack_stream() -> AsyncIterator[str]:
+        ingested = failed = 0
+        async for ack in acks:
+            if ack.status == "ok":
+                ingested += len(ack.ids)
+            else:
+                failed += len(ack.ids)
+            yield ack.model_dump_json(exclude_none=True) + "\n"
+        yield json.dumps({
+            "status": "done",
+            "chunks_ingested": ingested,
+            "chunks_failed": failed,
+            "invalid_lines": errors.count,
+            "errors": errors.reported,
+        }) + "\n"
+
+    return _DuplexStreamingResponse(ack_stream(), media_type="application/x-ndjson")
+
 class DeleteRequest(BaseModel):
-    ids: list[str] = Field(..., example=["hr_policy_1"])
+    ids: list[str] = Field(..., examples=[["hr_policy_1"]])
 
 @app.delete("/documents")
 async def delete_documents(
@@ -77,6 +385,39 @@ async def delete_documents(
     await rag_service.delete_documents(request.ids)
     return {"status": "success", "message": f"Deleted {len(request.ids)} chunks"}
 
+@app.get("/documents", response_model=list[DocumentSource])
+async def list_documents(
+    rag_service: RAGService = Depends(get_rag_service)
+):
+    """
+    List the source documents, uploaded or ingested as chunks with `source`
+    metadata, and how many chunks each one has.
+    """
+    return await rag_service.list_sources()
+
+@app.delete("/documents/{source:path}")
+async def delete_source(
+    source: str,
+    rag_service: RAGService = Depends(get_rag_service)
+):
+    """
+    Delete every chunk of a source document.
+    """
+    removed = await rag_service.delete_source(source)
+    return {"status": "success", "message": f"Deleted source {source}", "chunks_removed": removed}
+
+@app.delete("/shards/{index}")
+async def clear_shard(
+    index: int,
+    rag_service: RAGService = Depends(get_rag_service)
+):
+    """
+    Drop one shard of a sharded vector store (VECTOR_STORE_SHARDS > 1). The
+    returned sources were stored in it; uploading them again rebuilds it.
+    """
+    sources = await rag_service.clear_shard(index)
+    return {"status": "success", "message": f"Cleared shard {index}", "sources": sources}
+
 @app.post("/documents/clear")
 async def clear_documents(
     rag_service: RAGService = Depends(get_rag_service)
@@ -84,11 +425,6 @@ async def clear_documents(
     """
     Clear all documents from the vector store.
     """
-    # For ChromaDB, we can delete by providing an empty filter or similar, 
-    # but a simple way is just to delete all IDs or reset the collection.
-    # In our implementation, we'll need to update the Port/Adapter.
-    # For now, let's just implement a placeholder or a simple loop if we had IDs.
-    # Actually, let's add reset support to the Port.
     await rag_service.clear_all_documents()
     return {"status": "success", "message": "All documents cleared"}
 
@@ -103,6 +439,83 @@ async def chat(
     response = await rag_service.answer_query(request.message)
     return response
 
+@app.post("/chat/batch", response_model=list[BatchAnswer])
+async def chat_batch(
+    request: BatchChatRequest,
+    rag_service: RAGService = Depends(get_rag_service),
+    settings: Settings = Depends(get_settings)
+):
+    """
+    Answer many questions in one request. Questions are embedded and searched
+    in bulk, and the answers are returned in the order of the questions.
+    """
+    return await rag_service.answer_queries(request.questions, max_concurrency=settings.CHAT_BATCH_MAX_CONCURRENCY)
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.post("/chat/stream")
+async def chat_stream(
+    request: ChatRequest,
+    rag_service: RAGService = Depends(get_rag_service)
+):
+    """
+    Streaming RAG endpoint (Server-Sent Events). Sends the retrieved sources
+    first, then answer tokens as they are generated.
+    """
+    events = rag_service.stream_answer_query(request.message)
+    # Pull the first event before responding so retrieval errors still map to a
+    # regular JSON error response instead of a broken stream.
+    first = await anext(events)
+
+    async def event_stream() -> AsyncIterator[str]:
+        event: AnswerStreamEvent = first
+        try:
+            while True:
+                if event.event == "sources":
+                    yield _sse("sources", {"sources": [chunk.model_dump() for chunk in event.sources]})
+                elif event.event == "token":
+                    yield _sse("token", {"delta": event.delta})
+                else:
+                    yield _sse("done", {})
+                event = await anext(events)
+        except StopAsyncIteration:
+            pass
+        except AppException as exc:
+            yield _sse("error", {"code": exc.err_code, "message": exc.message})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @app.get("/health")
 async def health():
     return {"status": "healthy"}
+
+@app.get("/ready")
+async def ready(request: Request):
+    """
+    Readiness: 503 while the startup warm-up runs or after it failed, 200 once
+    it has finished. /health only reports that the process is up.
+    """
+    warm_up: Optional[asyncio.Task] = getattr(request.app.state, "warm_up", None)
+    if warm_up is None:
+        return {"status": "ready"}
+    if not warm_up.done():
+        return JSONResponse(status_code=503, content={"status": "starting"})
+    error = warm_up.result()
+    if error is not None:
+        return JSONResponse(status_code=503, content={"status": "failed", "error": error})
+    return {"status": "ready"}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics(
+    job_manager: IngestionJobManager = Depends(get_job_manager)
+):
+    """
+    Prometheus metrics: per-stage latency histograms, operation counters and cache hit rates.
+    """
+    INGEST_QUEUE_DEPTH.set(job_manager.queue_depth)
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
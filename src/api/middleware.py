@@ -1,25 +1,61 @@
+import time
 import uuid
-from typing import Callable
 
 import structlog
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.metrics import HTTP_REQUEST_DURATION
 
 logger = structlog.get_logger()
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        request_id = request.headers.get("X-Request-ID", str(uuid.uuid4()))
+def _route_label(scope: Scope) -> str:
+    """Route template (e.g. /jobs/{job_id}) so metric labels stay low-cardinality."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+class LoggingMiddleware:
+    """
+    Pure ASGI middleware (rather than BaseHTTPMiddleware) so that streaming
+    responses such as /chat/stream are passed through chunk by chunk instead of
+    being wrapped and buffered.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = Headers(scope=scope).get("X-Request-ID", str(uuid.uuid4()))
         structlog.contextvars.clear_contextvars()
         structlog.contextvars.bind_contextvars(request_id=request_id)
 
-        logger.info("request_started", path=request.url.path, method=request.method)
-        
+        logger.info("request_started", path=scope["path"], method=scope["method"])
+        started = time.perf_counter()
+        status_code = None
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message)["X-Request-ID"] = request_id
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                duration = time.perf_counter() - started
+                HTTP_REQUEST_DURATION.observe(
+                    duration, method=scope["method"], route=_route_label(scope), status=str(status_code)
+                )
+                logger.info(
+                    "request_finished",
+                    status_code=status_code,
+                    duration_ms=round(duration * 1000, 1),
+                )
+            await send(message)
+
         try:
-            response = await call_next(request)
-            logger.info("request_finished", status_code=response.status_code)
-            response.headers["X-Request-ID"] = request_id
-            return response
+            await self.app(scope, receive, send_with_request_id)
         except Exception as e:
             logger.exception("request_failed", error=str(e))
             raise
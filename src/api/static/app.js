@@ -24,20 +24,52 @@ chatForm.addEventListener('submit', async (e) => {
     const loadingMsg = appendMessage('assistant', 'Thinking...', true);
 
     try {
-        const response = await fetch('/chat', {
+        const response = await fetch('/chat/stream', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ message })
         });
 
-        const data = await response.json();
-        chatMessages.removeChild(loadingMsg);
-
-        if (data.answer) {
-            appendMessage('assistant', data.answer, false, data.sources);
-        } else {
+        if (!response.ok || !response.body) {
+            chatMessages.removeChild(loadingMsg);
             appendMessage('assistant', 'Sorry, I encountered an error.');
+            return;
+        }
+
+        // Read Server-Sent Events: sources arrive first, then answer tokens
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        const contentDiv = loadingMsg.querySelector('.message-content');
+        let buffer = '';
+        let answer = '';
+        let sources = [];
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const block = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+                const event = block.match(/^event: (.*)$/m)?.[1];
+                const data = JSON.parse(block.match(/^data: (.*)$/m)?.[1] || '{}');
+
+                if (event === 'sources') {
+                    sources = data.sources;
+                } else if (event === 'token') {
+                    answer += data.delta;
+                    contentDiv.textContent = answer;
+                    chatMessages.scrollTop = chatMessages.scrollHeight;
+                } else if (event === 'error') {
+                    answer = answer || 'Sorry, I encountered an error.';
+                }
+            }
         }
+
+        chatMessages.removeChild(loadingMsg);
+        appendMessage('assistant', answer || 'Sorry, I encountered an error.', false, sources);
     } catch (error) {
         chatMessages.removeChild(loadingMsg);
         appendMessage('assistant', 'Error connecting to the server.');
@@ -95,7 +127,7 @@ async function handleFiles(files) {
                 body: formData
             });
             const data = await response.json();
-            updateFileStatus(file.name, 'success');
+            updateFileStatus(file.name, await waitForJob(data.job_id, file.name));
         } catch (error) {
             updateFileStatus(file.name, 'error');
         }
@@ -126,7 +158,7 @@ ingestTextBtn.addEventListener('click', async () => {
         });
 
         const data = await response.json();
-        updateFileStatus(virtualName, 'success');
+        updateFileStatus(virtualName, await waitForJob(data.job_id, virtualName));
         rawTextInput.value = '';
     } catch (error) {
         updateFileStatus(virtualName, 'error');
@@ -136,6 +168,19 @@ ingestTextBtn.addEventListener('click', async () => {
     }
 });
 
+// Uploads are processed in the background; poll the job until it finishes
+async function waitForJob(jobId, name) {
+    if (!jobId) return 'error';
+    while (true) {
+        const response = await fetch(`/jobs/${jobId}`);
+        const job = await response.json();
+        if (job.status === 'completed') return 'success';
+        if (job.status === 'failed' || !response.ok) return 'error';
+        updateFileStatus(name, job.progress.stage);
+        await new Promise(resolve => setTimeout(resolve, 500));
+    }
+}
+
 function addFileToList(name, status) {
     const item = document.createElement('div');
     item.className = 'file-item';
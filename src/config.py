@@ -1,6 +1,7 @@
 import logging
 import sys
-from typing import Literal, Optional
+from functools import lru_cache
+from typing import List, Literal, Optional
 
 import structlog
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -11,17 +12,142 @@ class Settings(BaseSettings):
     ENV: Literal["dev", "prod", "test"] = "dev"
     LOG_LEVEL: str = "INFO"
     
+    # Build the adapters and warm them up (load the vector index, open the
+    # OpenAI connection, start PDF workers) at startup; /ready reports 503
+    # until that is done. Off: adapters are built by the first request.
+    STARTUP_WARMUP: bool = True
+    
     # OpenAI Settings
     OPENAI_API_KEY: str
     OPENAI_MODEL: str = "gpt-4o"
+    OPENAI_EMBEDDING_MODEL: str = "text-embedding-3-small"
+    # e.g. a proxy or a local fake server; None uses the OpenAI API
+    OPENAI_BASE_URL: Optional[str] = None
+    OPENAI_MAX_ATTEMPTS: int = 5
+
+    # Client-side rate limits per minute, matching your OpenAI quota (unset: no
+    # limit). 429 responses pause all calls for the server's Retry-After either way.
+    OPENAI_CHAT_RPM: Optional[int] = None
+    OPENAI_CHAT_TPM: Optional[int] = None
+    OPENAI_EMBEDDING_RPM: Optional[int] = None
+    OPENAI_EMBEDDING_TPM: Optional[int] = None
+
+    # Embedding backend: "openai", or "hashing" for local CPU-only feature-hashing
+    # embeddings (no network, lexical quality). A vector store collection is
+    # tied to the backend it was built with, so give each backend its own
+    # CHROMA_COLLECTION_NAME / NUMPY_STORE_DIRECTORY.
+    EMBEDDING_BACKEND: Literal["openai", "hashing"] = "openai"
+    HASHING_EMBEDDING_DIM: int = 1024
+
+    # Embedding batching (token-aware request packing)
+    EMBEDDING_BATCH_MAX_TOKENS: int = 50_000
+    EMBEDDING_BATCH_MAX_INPUTS: int = 256
+    EMBEDDING_MAX_CONCURRENT_BATCHES: int = 4
+
+    # Embedding cache (in-memory LRU in front of an on-disk SQLite tier). Only
+    # interactive lookups (queries) enter the memory tier, not bulk ingestion.
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_PATH: str = "./embedding_cache/embeddings.sqlite"
+    EMBEDDING_CACHE_MEMORY_MB: int = 32
+    EMBEDDING_CACHE_MAX_DISK_MB: int = 512
+
+    # Default chunking; can be overridden per upload
+    CHUNK_STRATEGY: Literal["character", "recursive", "sentence"] = "recursive"
+    CHUNK_SIZE: int = 1000
+    CHUNK_OVERLAP: int = 200
+
+    # PDF extraction: pages are extracted in parallel worker processes, in
+    # ranges of PDF_PAGES_PER_TASK pages. 1 disables the process pool.
+    PDF_EXTRACTION_WORKERS: int = 2
+    PDF_PAGES_PER_TASK: int = 8
+
+    # /upload bodies are streamed into a temporary file (in memory up to 1 MB,
+    # then on disk) and rejected with 413 once they exceed this many bytes
+    MAX_UPLOAD_BYTES: int = 100 * 1024 * 1024
+
+    # Background ingestion jobs for /upload and /ingest-text
+    INGEST_QUEUE_MAX_SIZE: int = 32
+    INGEST_WORKERS: int = 2
+    INGEST_JOB_RETENTION: int = 1000
+    INGEST_BATCH_SIZE: int = 256
+
+    # /ingest/stream: batches of INGEST_BATCH_SIZE chunks being embedded at once
+    INGEST_STREAM_MAX_IN_FLIGHT: int = 4
+    # Longer NDJSON lines are dropped (and reported) instead of being buffered
+    INGEST_STREAM_MAX_LINE_BYTES: int = 4 * 1024 * 1024
+
+    # /chat/batch: answers generated concurrently per request
+    CHAT_BATCH_MAX_CONCURRENCY: int = 8
+
+    # Concurrent identical queries and query embeddings share one in-flight call
+    REQUEST_COALESCING_ENABLED: bool = True
+
+    # Query embeddings from concurrent requests are sent as one batch once
+    # QUERY_BATCH_MAX_SIZE texts are waiting or the first has waited
+    # QUERY_BATCH_MAX_WAIT_MS; a max size of 1 disables batching
+    QUERY_BATCH_MAX_SIZE: int = 64
+    QUERY_BATCH_MAX_WAIT_MS: float = 2.0
+
+    # Retrieved chunks are merged (adjacent chunks of a source, overlap kept once)
+    # and cut to this many estimated tokens before being put in the prompt
+    CONTEXT_TOKEN_BUDGET: Optional[int] = 3000
+
+    # Semantic answer cache for /chat
+    ANSWER_CACHE_ENABLED: bool = True
+    ANSWER_CACHE_SIMILARITY_THRESHOLD: float = 0.95
+    ANSWER_CACHE_MAX_ENTRIES: int = 1024
     
+    # Vector store backend: "chroma" (ChromaDB) or "numpy" (in-process, memory-mapped)
+    VECTOR_STORE_BACKEND: Literal["chroma", "numpy"] = "chroma"
+    # Split the store into this many shards (Chroma collections
+    # CHROMA_COLLECTION_NAME_shard<i>, or NUMPY_STORE_DIRECTORY/shard<i>), each
+    # holding whole sources. Searches scatter to all shards and merge the top_k.
+    # Changing it re-routes sources, so re-ingest after a change.
+    VECTOR_STORE_SHARDS: int = 1
+
     # Vector DB Settings (ChromaDB)
     CHROMA_PERSIST_DIRECTORY: str = "./chroma_data"
     CHROMA_COLLECTION_NAME: str = "knowledge_base"
+    # Chroma's client is synchronous; calls run on dedicated thread pools so they
+    # never block the event loop. Reads and writes use separate pools so a large
+    # ingestion cannot queue ahead of /chat searches.
+    CHROMA_READ_WORKERS: int = 4
+    CHROMA_WRITE_WORKERS: int = 1
+    CHROMA_UPSERT_BATCH_SIZE: int = 500
+    CHROMA_MAX_INFLIGHT_UPSERTS: int = 2
 
-settings = Settings()
+    # In-process NumPy vector store
+    NUMPY_STORE_DIRECTORY: str = "./numpy_store"
+    # Compact once this share of rows are tombstones (deleted or replaced)
+    NUMPY_STORE_COMPACTION_THRESHOLD: float = 0.2
+    # "int8" scans 1-byte scalar-quantized codes and re-ranks the best
+    # top_k * NUMPY_STORE_RERANK_FACTOR candidates against the float32 vectors
+    NUMPY_STORE_QUANTIZATION: Literal["none", "int8"] = "none"
+    NUMPY_STORE_RERANK_FACTOR: int = 4
 
-def setup_logging():
+    # Per-source record of stored chunk ids, used for incremental re-uploads.
+    # Defaults to a file in the vector store's directory so both go together.
+    SOURCE_MANIFEST_PATH: Optional[str] = None
+
+    # Prometheus /metrics: upper bounds (seconds) of the latency histogram buckets
+    METRICS_LATENCY_BUCKETS: List[float] = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+
+    @property
+    def embedding_model_id(self) -> str:
+        """Identifies the embedding space; vector store collections record it and refuse to mix spaces."""
+        if self.EMBEDDING_BACKEND == "hashing":
+            return f"hashing-v1:{self.HASHING_EMBEDDING_DIM}"
+        return f"openai:{self.OPENAI_EMBEDDING_MODEL}"
+
+@lru_cache()
+def get_settings() -> Settings:
+    """
+    The process-wide settings, read from the environment on first use rather
+    than at import, so importing the app (or an adapter) needs no environment.
+    """
+    return Settings()
+
+def setup_logging(settings: Settings) -> None:
     shared_processors = [
         structlog.contextvars.merge_contextvars,
         structlog.processors.add_log_level,
@@ -42,6 +168,3 @@ def setup_logging():
         logger_factory=structlog.PrintLoggerFactory(),
         cache_logger_on_first_use=True,
     )
-
-setup_logging()
-logger = structlog.get_logger()
@@ -0,0 +1,152 @@
+from collections import OrderedDict, deque
+from typing import Deque, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+import structlog
+
+from src.core.domain import LLMResponse
+
+logger = structlog.get_logger()
+
+# Invalidations remembered for answers still being produced; older ones are
+# assumed to affect them
+_MAX_RECENT_INVALIDATIONS = 256
+
+class _Entry:
+    __slots__ = ("vector", "response", "chunk_ids", "sources")
+
+    def __init__(self, vector: np.ndarray, response: LLMResponse):
+        self.vector = vector
+        self.response = response
+        self.chunk_ids, self.sources = _cited(response)
+
+def _cited(response: LLMResponse) -> Tuple[Set[str], Set[str]]:
+    """The chunk ids and sources a response was built from."""
+    chunk_ids = {chunk.id for chunk in response.sources}
+    sources = {chunk.metadata["source"] for chunk in response.sources if "source" in chunk.metadata}
+    return chunk_ids, sources
+
+class SemanticAnswerCache:
+    """
+    Caches answers by query embedding. A lookup returns the stored response of the
+    most similar previously answered query if its cosine similarity reaches
+    `threshold`. Entries remember which chunks and sources they were built from so
+    that changes to the knowledge base can invalidate them.
+
+    Every invalidation bumps `generation`. Callers read it before searching and
+    pass it to `store`, which drops the answer if an invalidation since then
+    would have dropped it from the cache, since its sources may already be stale.
+    Changes to unrelated sources do not keep the answer out of the cache.
+    """
+
+    def __init__(self, threshold: float = 0.95, max_entries: int = 1024):
+        self._threshold = threshold
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._next_key = 0
+        # Stacked, normalized vectors of all entries; rebuilt lazily after changes
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_keys: List[int] = []
+        self._generation = 0
+        # (generation, chunk_ids, sources) per invalidation, oldest first; None means everything
+        self._recent: Deque[Tuple[int, Optional[FrozenSet[str]], Optional[FrozenSet[str]]]] = deque(
+            maxlen=_MAX_RECENT_INVALIDATIONS
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> Optional[np.ndarray]:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return None
+        return vector / norm
+
+    def lookup(self, embedding: List[float]) -> Optional[LLMResponse]:
+        vector = self._normalize(embedding)
+        if vector is None or not self._entries:
+            self.misses += 1
+            return None
+
+        if self._matrix is None:
+            self._matrix_keys = list(self._entries)
+            self._matrix = np.stack([self._entries[k].vector for k in self._matrix_keys])
+
+        if self._matrix.shape[1] != vector.shape[0]:
+            # Embedding model changed; nothing in the cache is comparable
+            self.misses += 1
+            return None
+
+        similarities = self._matrix @ vector
+        best = int(np.argmax(similarities))
+        if similarities[best] < self._threshold:
+            self.misses += 1
+            return None
+
+        key = self._matrix_keys[best]
+        self._entries.move_to_end(key)
+        self.hits += 1
+        logger.info("answer_cache_hit", similarity=round(float(similarities[best]), 4))
+        return self._entries[key].response.model_copy(deep=True)
+
+    def store(self, embedding: List[float], response: LLMResponse, generation: Optional[int] = None) -> None:
+        """Caches `response`, unless an invalidation since `generation` was read affects it."""
+        if generation is not None and self._invalidated_since(generation, response):
+            logger.info("answer_cache_store_skipped", reason="invalidated_while_answering")
+            return
+        vector = self._normalize(embedding)
+        if vector is None:
+            return
+        self._entries[self._next_key] = _Entry(vector, response.model_copy(deep=True))
+        self._next_key += 1
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+        self._matrix = None
+
+    def _invalidated_since(self, generation: int, response: LLMResponse) -> bool:
+        if generation == self._generation:
+            return False
+        if not self._recent or self._recent[0][0] > generation + 1:
+            # Some of the invalidations since then are no longer remembered
+            return True
+        chunk_ids, sources = _cited(response)
+        for invalidated, stale_ids, stale_sources in self._recent:
+            if invalidated <= generation:
+                continue
+            if stale_ids is None or not chunk_ids or chunk_ids & stale_ids or sources & stale_sources:
+                return True
+        return False
+
+    def invalidate(self, chunk_ids: Iterable[str] = (), sources: Iterable[str] = ()) -> int:
+        """
+        Drops entries built from any of the given chunk ids or sources. Entries that
+        were answered without any context are dropped too, since new content may now
+        answer them.
+        """
+        self._generation += 1
+        chunk_ids, sources = frozenset(chunk_ids), frozenset(sources)
+        self._recent.append((self._generation, chunk_ids, sources))
+        stale = [
+            key for key, entry in self._entries.items()
+            if not entry.chunk_ids or entry.chunk_ids & chunk_ids or entry.sources & sources
+        ]
+        for key in stale:
+            del self._entries[key]
+        if stale:
+            self._matrix = None
+            logger.info("answer_cache_invalidated", count=len(stale))
+        return len(stale)
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._recent.append((self._generation, None, None))
+        self._entries.clear()
+        self._matrix = None
@@ -0,0 +1,195 @@
+import re
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import AsyncIterable, AsyncIterator, Deque, Iterable, Iterator, List, Sequence
+
+from src.core.domain import ChunkingOptions
+
+RECURSIVE_SEPARATORS = ("\n\n", "\n", ". ", " ", "")
+
+# End of a sentence (terminal punctuation, optional closing quote/bracket, then
+# whitespace) or a blank line.
+_SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*\s+|\n\s*\n")
+
+def _split_recursive(text: str, chunk_size: int, separators: Sequence[str]) -> List[str]:
+    """
+    Splits `text` into pieces no longer than `chunk_size`, preferring the earliest
+    separator in `separators` that occurs in the text. Separators stay attached
+    to the end of each piece, so joining the pieces gives back `text`.
+    """
+    if len(text) <= chunk_size:
+        return [text] if text else []
+
+    for i, separator in enumerate(separators):
+        if separator == "":
+            return [text[j:j + chunk_size] for j in range(0, len(text), chunk_size)]
+        if separator in text:
+            break
+    else:
+        return [text[j:j + chunk_size] for j in range(0, len(text), chunk_size)]
+
+    parts = text.split(separator)
+    pieces: List[str] = []
+    for k, part in enumerate(parts):
+        if k < len(parts) - 1:
+            part += separator
+        if not part:
+            continue
+        if len(part) <= chunk_size:
+            pieces.append(part)
+        else:
+            pieces.extend(_split_recursive(part, chunk_size, separators[i + 1:]))
+    return pieces
+
+class Chunker(ABC):
+    """
+    Incremental chunker. Text arrives as a stream of segments (e.g. pages) via
+    `feed`, which returns the chunks completed so far; `finish` flushes the rest.
+    Memory is bounded by a small multiple of `chunk_size` plus the current
+    segment, and total work is linear in the input length.
+
+    A chunker holds per-document state, so create a new one for every document.
+    """
+
+    def __init__(self, chunk_size: int = 1000, overlap: int = 200):
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        if not 0 <= overlap < chunk_size:
+            raise ValueError("overlap must be between 0 and chunk_size")
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+
+    @abstractmethod
+    def feed(self, segment: str) -> List[str]:
+        pass
+
+    @abstractmethod
+    def finish(self) -> List[str]:
+        pass
+
+    def chunks(self, segments: Iterable[str]) -> Iterator[str]:
+        for segment in segments:
+            yield from self.feed(segment)
+        yield from self.finish()
+
+    async def achunks(self, segments: AsyncIterable[str]) -> AsyncIterator[str]:
+        async for segment in segments:
+            for chunk in self.feed(segment):
+                yield chunk
+        for chunk in self.finish():
+            yield chunk
+
+    def split(self, text: str) -> List[str]:
+        """Chunks a complete text in one go."""
+        return list(self.chunks([text]))
+
+class CharacterChunker(Chunker):
+    """Fixed-size character windows that advance by `chunk_size - overlap`."""
+
+    def __init__(self, chunk_size: int = 1000, overlap: int = 200):
+        super().__init__(chunk_size, overlap)
+        self._step = chunk_size - overlap
+        self._buffer = ""
+
+    def feed(self, segment: str) -> List[str]:
+        buffer = self._buffer + segment
+        chunks = []
+        start = 0
+        while len(buffer) - start >= self.chunk_size:
+            chunks.append(buffer[start:start + self.chunk_size])
+            start += self._step
+        self._buffer = buffer[start:]
+        return chunks
+
+    def finish(self) -> List[str]:
+        buffer, self._buffer = self._buffer, ""
+        return [buffer[start:start + self.chunk_size] for start in range(0, len(buffer), self._step)]
+
+class _PackingChunker(Chunker):
+    """
+    Base for boundary-aware strategies: the text is cut into pieces at natural
+    boundaries, and consecutive pieces are greedily packed into chunks of at most
+    `chunk_size` characters. Each chunk starts with as many trailing pieces of the
+    previous chunk as fit in `overlap`.
+    """
+
+    def __init__(self, chunk_size: int = 1000, overlap: int = 200):
+        super().__init__(chunk_size, overlap)
+        # Text is split in windows of this size; only the last (possibly
+        # incomplete) piece of a window is carried over to the next one.
+        self._window = chunk_size * 4
+        self._buffer = ""
+        self._current: Deque[str] = deque()
+        self._current_len = 0
+        self._has_new_text = False
+
+    @abstractmethod
+    def _split(self, text: str) -> List[str]:
+        pass
+
+    def feed(self, segment: str) -> List[str]:
+        chunks: List[str] = []
+        for start in range(0, len(segment), self._window):
+            self._buffer += segment[start:start + self._window]
+            if len(self._buffer) >= self._window:
+                pieces = self._split(self._buffer)
+                self._buffer = pieces.pop() if pieces else ""
+                chunks.extend(self._pack(pieces))
+        return chunks
+
+    def finish(self) -> List[str]:
+        chunks = self._pack(self._split(self._buffer))
+        if self._has_new_text:
+            chunks.append("".join(self._current))
+        self._buffer = ""
+        self._current.clear()
+        self._current_len = 0
+        self._has_new_text = False
+        return [chunk for chunk in chunks if chunk.strip()]
+
+    def _pack(self, pieces: List[str]) -> List[str]:
+        chunks = []
+        for piece in pieces:
+            if self._current_len + len(piece) > self.chunk_size:
+                if self._has_new_text:
+                    chunks.append("".join(self._current))
+                    self._has_new_text = False
+                    while self._current and self._current_len > self.overlap:
+                        self._current_len -= len(self._current.popleft())
+                while self._current and self._current_len + len(piece) > self.chunk_size:
+                    self._current_len -= len(self._current.popleft())
+            self._current.append(piece)
+            self._current_len += len(piece)
+            self._has_new_text = True
+        return [chunk for chunk in chunks if chunk.strip()]
+
+class RecursiveChunker(_PackingChunker):
+    """Splits on paragraphs, then lines, sentences and words before cutting characters."""
+
+    def _split(self, text: str) -> List[str]:
+        return _split_recursive(text, self.chunk_size, RECURSIVE_SEPARATORS)
+
+class SentenceChunker(_PackingChunker):
+    """Packs whole sentences; only sentences longer than a chunk are split further."""
+
+    def _split(self, text: str) -> List[str]:
+        pieces = []
+        start = 0
+        for end in [match.end() for match in _SENTENCE_END.finditer(text)] + [len(text)]:
+            sentence = text[start:end]
+            if len(sentence) <= self.chunk_size:
+                if sentence:
+                    pieces.append(sentence)
+            else:
+                pieces.extend(_split_recursive(sentence, self.chunk_size, (" ", "")))
+            start = end
+        return pieces
+
+_STRATEGIES = {
+    "character": CharacterChunker,
+    "recursive": RecursiveChunker,
+    "sentence": SentenceChunker,
+}
+
+def create_chunker(options: ChunkingOptions) -> Chunker:
+    return _STRATEGIES[options.strategy](chunk_size=options.chunk_size, overlap=options.overlap)
@@ -0,0 +1,100 @@
+from typing import Dict, List, Optional, Tuple
+
+from src.core.domain import ContextStats, DocumentChunk
+from src.core.tokens import estimate_tokens, truncate_to_tokens
+
+# Suffix/prefix matches shorter than this between adjacent chunks are treated
+# as coincidence rather than chunk overlap (chunks may be cut with overlap=0)
+MIN_OVERLAP_CHARS = 20
+
+def overlap_length(previous: str, following: str) -> int:
+    """
+    Length of the longest suffix of `previous` that is also a prefix of
+    `following`, or 0 if it is shorter than MIN_OVERLAP_CHARS. All chunking
+    strategies start a chunk with an exact copy of the previous chunk's tail.
+    """
+    for length in range(min(len(previous), len(following)), MIN_OVERLAP_CHARS - 1, -1):
+        if previous.endswith(following[:length]):
+            return length
+    return 0
+
+def _runs(chunks: List[DocumentChunk]) -> List[List[DocumentChunk]]:
+    """
+    Groups chunks into runs of consecutive `chunk_index` values of the same
+    source, ordered by the best retrieval rank in each run.
+    """
+    by_source: Dict[str, List[Tuple[int, int, DocumentChunk]]] = {}
+    runs: List[Tuple[int, List[DocumentChunk]]] = []
+    for rank, chunk in enumerate(chunks):
+        source, index = chunk.metadata.get("source"), chunk.metadata.get("chunk_index")
+        if source is None or not isinstance(index, int):
+            runs.append((rank, [chunk]))
+        else:
+            by_source.setdefault(source, []).append((index, rank, chunk))
+
+    for items in by_source.values():
+        items.sort(key=lambda item: item[0])
+        run: List[DocumentChunk] = []
+        best_rank = previous_index = None
+        for index, rank, chunk in items:
+            if run and index == previous_index:
+                continue
+            if run and index != previous_index + 1:
+                runs.append((best_rank, run))
+                run = []
+            best_rank = rank if not run else min(best_rank, rank)
+            run.append(chunk)
+            previous_index = index
+        runs.append((best_rank, run))
+
+    return [run for _, run in sorted(runs, key=lambda item: item[0])]
+
+def _merge(run: List[DocumentChunk]) -> DocumentChunk:
+    if len(run) == 1:
+        return run[0]
+    content = run[0].content
+    for previous, chunk in zip(run, run[1:]):
+        content += chunk.content[overlap_length(previous.content, chunk.content):]
+    metadata = dict(run[0].metadata, chunk_index_end=run[-1].metadata["chunk_index"])
+    return DocumentChunk(id=run[0].id, content=content, metadata=metadata)
+
+def pack_context(
+    chunks: List[DocumentChunk], max_tokens: Optional[int] = None
+) -> Tuple[List[DocumentChunk], List[DocumentChunk], ContextStats]:
+    """
+    Assembles the context for the LLM from retrieved chunks:
+    1. Chunks of the same source with consecutive `chunk_index` are merged into
+       one passage, with the text they share through chunk overlap kept once.
+    2. Passages are kept in retrieval order (by their best-ranked chunk) until
+       `max_tokens` is reached; the passage that crosses it is truncated.
+
+    Returns the passages for the prompt, the retrieved chunks that contributed
+    to them (in retrieval order, for citing sources) and the packing stats.
+    """
+    stats = ContextStats(
+        retrieved_chunks=len(chunks),
+        retrieved_tokens=sum(estimate_tokens(chunk.content) for chunk in chunks),
+    )
+    context: List[DocumentChunk] = []
+    used = set()
+    remaining = max_tokens
+    for run in _runs(chunks):
+        if remaining is not None and remaining <= 0:
+            break
+        passage = _merge(run)
+        tokens = estimate_tokens(passage.content)
+        if remaining is not None and tokens > remaining:
+            passage = passage.model_copy(update={"content": truncate_to_tokens(passage.content, remaining)})
+            tokens = estimate_tokens(passage.content)
+            stats.truncated = True
+        context.append(passage)
+        used.update(id(chunk) for chunk in run)
+        stats.context_tokens += tokens
+        if remaining is not None:
+            remaining -= tokens
+
+    stats.passages = len(context)
+    stats.tokens_saved = stats.retrieved_tokens - stats.context_tokens
+    sources = [chunk for chunk in chunks if id(chunk) in used]
+    stats.dropped_chunks = len(chunks) - len(sources)
+    return context, sources, stats
@@ -1,17 +1,66 @@
-from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field
+import base64
+import binascii
+from datetime import datetime
+from typing import Annotated, List, Literal, Optional, Dict, Any
+
+import numpy as np
+from pydantic import BaseModel, Field, PlainSerializer, PlainValidator, WithJsonSchema, model_validator
+
+def to_embedding(value: Any) -> Optional[np.ndarray]:
+    """
+    Converts an embedding to a 1-D float32 array. Accepts arrays (not copied
+    if already float32), sequences of numbers, raw little-endian float32 bytes
+    and base64 strings of such bytes. An empty embedding is treated as missing
+    and becomes None, so e.g. an ingested chunk with `"embedding": []` is
+    embedded by the service.
+    """
+    if isinstance(value, str):
+        try:
+            value = base64.b64decode(value, validate=True)
+        except binascii.Error as e:
+            raise ValueError(f"invalid base64 embedding: {e}") from e
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        if len(value) % 4:
+            raise ValueError("binary embedding length must be a multiple of 4 bytes (float32)")
+        vector = np.frombuffer(value, dtype="<f4")
+    else:
+        try:
+            vector = np.asarray(value, dtype=np.float32)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"embedding must be a list of numbers: {e}") from e
+    if vector.ndim == 1 and vector.size == 0:
+        return None
+    if vector.ndim != 1:
+        raise ValueError("embedding must be a 1-D vector")
+    return vector
+
+# Embeddings are float32 arrays: 4 bytes per dimension instead of a boxed
+# Python float each, passed to the vector stores without conversion. JSON
+# input may be a number array or base64 of little-endian float32 bytes.
+Embedding = Annotated[
+    np.ndarray,
+    PlainValidator(to_embedding),
+    PlainSerializer(lambda vector: base64.b64encode(vector.astype("<f4").tobytes()).decode("ascii"), return_type=str),
+    WithJsonSchema({
+        "anyOf": [
+            {"type": "array", "items": {"type": "number"}},
+            {"type": "string", "contentEncoding": "base64", "description": "Little-endian float32 values"},
+        ]
+    }),
+]
 
 class DocumentChunk(BaseModel):
     id: str = Field(..., description="Unique identifier for the chunk")
     content: str = Field(..., description="The text content of the chunk")
     metadata: Dict[str, Any] = Field(default_factory=dict, description="Additional metadata for the document")
-    embedding: Optional[List[float]] = Field(None, description="Vector embedding of the content")
+    # Never serialized: responses citing chunks as sources have no use for their vectors
+    embedding: Optional[Embedding] = Field(None, exclude=True, description="Vector embedding of the content")
 
 class SearchQuery(BaseModel):
     query: str = Field(..., description="The user's natural language query")
     top_k: int = Field(default=5, description="Number of results to return")
     filters: Optional[Dict[str, Any]] = Field(None, description="Metadata filters for search")
-    embedding: Optional[List[float]] = Field(None, description="Vector embedding of the query")
+    embedding: Optional[Embedding] = Field(None, description="Vector embedding of the query")
 
 class SearchResult(BaseModel):
     chunk: DocumentChunk
@@ -20,3 +69,70 @@ class SearchResult(BaseModel):
 class LLMResponse(BaseModel):
     answer: str
     sources: List[DocumentChunk]
+
+class ContextStats(BaseModel):
+    retrieved_chunks: int = 0
+    retrieved_tokens: int = Field(0, description="Estimated tokens of the retrieved chunks as returned")
+    passages: int = Field(0, description="Passages in the prompt after merging adjacent chunks")
+    context_tokens: int = Field(0, description="Estimated tokens of the passages in the prompt")
+    tokens_saved: int = 0
+    dropped_chunks: int = Field(0, description="Retrieved chunks left out to stay within the token budget")
+    truncated: bool = False
+
+class BatchAnswer(BaseModel):
+    question: str
+    answer: Optional[str] = None
+    sources: List[DocumentChunk] = Field(default_factory=list)
+    error: Optional[str] = Field(None, description="Set when generating this answer failed")
+
+class AnswerStreamEvent(BaseModel):
+    event: Literal["sources", "token", "done"]
+    sources: Optional[List[DocumentChunk]] = None
+    delta: Optional[str] = None
+
+class IngestionProgress(BaseModel):
+    stage: Literal["queued", "extracting", "chunking", "embedding", "upserting", "done"] = "queued"
+    pages_extracted: int = 0
+    chunks_total: int = 0
+    chunks_embedded: int = 0
+    chunks_upserted: int = 0
+
+class IngestionJob(BaseModel):
+    id: str
+    filename: str
+    status: Literal["queued", "running", "completed", "failed"] = "queued"
+    progress: IngestionProgress = Field(default_factory=IngestionProgress)
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+class IngestionResult(BaseModel):
+    chunks_ingested: int = Field(0, description="Chunks the document was split into")
+    chunks_added: int = Field(0, description="New or changed chunks that were embedded and stored")
+    chunks_kept: int = Field(0, description="Chunks already stored from a previous upload of the source")
+    chunks_removed: int = Field(0, description="Chunks of a previous upload that no longer occur")
+
+class IngestBatchAck(BaseModel):
+    batch: int = Field(..., description="Zero-based index of the batch in the stream")
+    status: Literal["ok", "error"]
+    ids: List[str] = Field(..., description="Ids of the chunks in the batch, in input order")
+    error: Optional[str] = None
+
+class DocumentSource(BaseModel):
+    source: str = Field(..., description="Source file name, as stored in chunk metadata")
+    chunks: int = Field(..., description="Number of chunks stored for the source")
+
+class ChunkingOptions(BaseModel):
+    strategy: Literal["character", "recursive", "sentence"] = Field(
+        default="recursive", description="How text is split into chunks"
+    )
+    chunk_size: int = Field(default=1000, gt=0, description="Maximum chunk length in characters")
+    overlap: int = Field(default=200, ge=0, description="Characters shared between consecutive chunks")
+
+    @model_validator(mode="after")
+    def _overlap_smaller_than_chunk(self) -> "ChunkingOptions":
+        if self.overlap >= self.chunk_size:
+            raise ValueError("overlap must be smaller than chunk_size")
+        return self
@@ -21,3 +21,15 @@ class EntityNotFoundError(AppException):
 class ExternalServiceError(AppException):
     def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
         super().__init__(message, status_code=502, err_code="BAD_GATEWAY", details=details)
+
+class ServiceBusyError(AppException):
+    def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
+        super().__init__(message, status_code=429, err_code="TOO_MANY_REQUESTS", details=details)
+
+class PayloadTooLargeError(AppException):
+    def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
+        super().__init__(message, status_code=413, err_code="PAYLOAD_TOO_LARGE", details=details)
+
+class InvalidFilterError(AppException, ValueError):
+    def __init__(self, message: str, details: Optional[Dict[str, Any]] = None):
+        super().__init__(message, status_code=400, err_code="INVALID_FILTER", details=details)
@@ -0,0 +1,120 @@
+import asyncio
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+import structlog
+
+from src.core.domain import IngestionJob
+from src.core.exceptions import EntityNotFoundError, ServiceBusyError
+from src.core.metrics import OPERATIONS
+
+logger = structlog.get_logger()
+
+JobWork = Callable[[IngestionJob], Awaitable[Dict[str, Any]]]
+
+class IngestionJobManager:
+    """
+    In-process background ingestion. Jobs wait in a bounded queue and are
+    processed by a fixed pool of worker tasks; when the queue is full new
+    submissions are rejected so bursts of uploads cannot pile up in memory.
+    """
+
+    def __init__(self, max_queue_size: int = 32, workers: int = 2, max_finished_jobs: int = 1000):
+        self._max_queue_size = max_queue_size
+        self._worker_count = workers
+        self._max_finished_jobs = max_finished_jobs
+        self._jobs: Dict[str, IngestionJob] = {}
+        # Ids of finished jobs, oldest first, so the oldest are forgotten without a scan
+        self._finished: Deque[str] = deque()
+        self._queue: Optional[asyncio.Queue[Tuple[IngestionJob, JobWork]]] = None
+        self._workers: List[asyncio.Task] = []
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self) -> None:
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self._max_queue_size)
+        self._workers = [
+            asyncio.create_task(self._worker(i), name=f"ingestion-worker-{i}")
+            for i in range(self._worker_count)
+        ]
+        logger.info("ingestion_workers_started", workers=self._worker_count, max_queue_size=self._max_queue_size)
+
+    async def stop(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        # Jobs still waiting will never run
+        while self._queue is not None and not self._queue.empty():
+            job, _ = self._queue.get_nowait()
+            self._fail(job, "Cancelled at shutdown")
+        logger.info("ingestion_workers_stopped")
+
+    def submit(self, filename: str, work: JobWork) -> IngestionJob:
+        if self._queue is None:
+            raise RuntimeError("IngestionJobManager.start() must be called before submitting jobs")
+
+        job = IngestionJob(id=uuid.uuid4().hex, filename=filename, created_at=datetime.now(timezone.utc))
+        try:
+            self._queue.put_nowait((job, work))
+        except asyncio.QueueFull:
+            logger.warning("ingestion_queue_full", filename=filename, queue_depth=self.queue_depth)
+            raise ServiceBusyError(
+                message="Ingestion queue is full, please retry later",
+                details={"queue_depth": self.queue_depth},
+            )
+
+        self._jobs[job.id] = job
+        logger.info("ingestion_job_queued", job_id=job.id, filename=filename, queue_depth=self.queue_depth)
+        return job
+
+    def get(self, job_id: str) -> IngestionJob:
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise EntityNotFoundError(message="Ingestion job not found", details={"job_id": job_id})
+        return job
+
+    def _finish(self, job: IngestionJob) -> None:
+        job.finished_at = datetime.now(timezone.utc)
+        self._finished.append(job.id)
+        while len(self._finished) > self._max_finished_jobs:
+            del self._jobs[self._finished.popleft()]
+
+    def _fail(self, job: IngestionJob, error: str) -> None:
+        job.status = "failed"
+        job.error = error
+        OPERATIONS.inc(operation="ingest_job", status="failed")
+        self._finish(job)
+        logger.error("ingestion_job_failed", job_id=job.id, filename=job.filename, error=error)
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job, work = await self._queue.get()
+            try:
+                await self._run(job, work)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: IngestionJob, work: JobWork) -> None:
+        job.status = "running"
+        job.started_at = datetime.now(timezone.utc)
+        logger.info("ingestion_job_started", job_id=job.id, filename=job.filename)
+        try:
+            job.result = await work(job)
+        except asyncio.CancelledError:
+            self._fail(job, "Cancelled at shutdown")
+            raise
+        except Exception as e:
+            self._fail(job, getattr(e, "message", str(e)))
+            return
+        job.status = "completed"
+        job.progress.stage = "done"
+        OPERATIONS.inc(operation="ingest_job", status="completed")
+        self._finish(job)
+        logger.info("ingestion_job_completed", job_id=job.id, filename=job.filename)
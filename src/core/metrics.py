@@ -0,0 +1,242 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(map(labels.__getitem__, self.labelnames))
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type_name}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in items]
+
+class Gauge(Counter):
+    type_name = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+class Histogram(_Metric):
+    """
+    Prometheus-style histogram. `observe` is a bisect plus three additions under
+    a lock (a microsecond or two), so it is safe to call on every request.
+    Histograms created without explicit buckets follow the registry defaults.
+    """
+
+    type_name = "histogram"
+
+    def __init__(
+        self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Optional[Sequence[float]] = None
+    ):
+        super().__init__(name, help, labelnames)
+        self.fixed_buckets = buckets is not None
+        self._set_buckets(buckets or DEFAULT_LATENCY_BUCKETS)
+
+    def _set_buckets(self, buckets: Sequence[float]) -> None:
+        with self._lock:
+            self.buckets = tuple(sorted(float(b) for b in buckets))
+            # Per label set: [count per bucket..., +Inf count, sum]
+            self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels: str) -> int:
+        series = self._values.get(self._key(labels))
+        return int(sum(series[:-1])) if series else 0
+
+    def reset(self) -> None:
+        self._set_buckets(self.buckets)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._values.items())
+        lines = []
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                labels = _format_labels(self.labelnames, key, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help, labelnames))
+
+    def histogram(
+        self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Optional[Sequence[float]] = None
+    ) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def configure(self, latency_buckets: Sequence[float]) -> None:
+        """Sets the buckets of every histogram without explicit buckets; recorded data is reset."""
+        for metric in self._metrics.values():
+            if isinstance(metric, Histogram) and not metric.fixed_buckets:
+                metric._set_buckets(latency_buckets)
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines: List[str] = []
+        for name in sorted(self._metrics):
+            lines.extend(self._metrics[name].render())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = MetricsRegistry()
+
+# RAG pipeline stages: operation is "query" or "ingest"
+STAGE_DURATION = REGISTRY.histogram(
+    "rag_stage_duration_seconds", "Time spent per RAG pipeline stage", ("operation", "stage")
+)
+OPERATIONS = REGISTRY.counter("rag_operations_total", "RAG operations by outcome", ("operation", "status"))
+ANSWER_CACHE_LOOKUPS = REGISTRY.counter("rag_answer_cache_lookups_total", "Semantic answer cache lookups", ("result",))
+CHUNKS_INGESTED = REGISTRY.counter("rag_chunks_ingested_total", "Chunks embedded and stored")
+COALESCED_CALLS = REGISTRY.counter(
+    "coalesced_calls_total", "Calls served by an identical in-flight call instead of a new one", ("operation",)
+)
+CONTEXT_TOKENS = REGISTRY.histogram(
+    "rag_context_tokens", "Estimated context tokens per query as retrieved and as packed into the prompt", ("stage",),
+    buckets=(250, 500, 1000, 2000, 4000, 8000, 16000, 32000),
+)
+MICRO_BATCH_SIZE = REGISTRY.histogram(
+    "micro_batch_size", "Items per micro-batched upstream call", ("name",),
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+MICRO_BATCH_WAIT = REGISTRY.histogram(
+    "micro_batch_wait_seconds", "Time items waited for their micro-batch to be sent", ("name",),
+    buckets=(0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1),
+)
+
+# Adapters
+LLM_REQUEST_DURATION = REGISTRY.histogram(
+    "llm_request_duration_seconds", "Latency of LLM provider requests", ("operation",)
+)
+LLM_REQUEST_ERRORS = REGISTRY.counter("llm_request_errors_total", "Failed LLM provider requests", ("operation",))
+LLM_RATE_LIMITED = REGISTRY.counter("llm_rate_limited_total", "429 responses from the LLM provider", ("operation",))
+RATE_LIMIT_WAIT = REGISTRY.histogram(
+    "llm_rate_limit_wait_seconds", "Time calls waited for the client-side rate limiter", ("limiter", "priority")
+)
+EMBEDDING_CACHE_LOOKUPS = REGISTRY.counter(
+    "embedding_cache_lookups_total", "Embedding cache lookups per text", ("result",)
+)
+VECTOR_STORE_DURATION = REGISTRY.histogram(
+    "vector_store_operation_duration_seconds", "Latency of vector store calls", ("backend", "operation")
+)
+VECTOR_STORE_PENDING = REGISTRY.gauge(
+    "vector_store_pending_operations", "Vector store calls submitted but not yet finished", ("backend", "pool")
+)
+
+# API
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route", "status")
+)
+INGEST_QUEUE_DEPTH = REGISTRY.gauge("rag_ingest_queue_depth", "Ingestion jobs waiting in the queue")
+
+class StageTimer:
+    """
+    Times the consecutive stages of one operation into STAGE_DURATION and keeps
+    the per-stage totals, so they can also be logged with the request id.
+    """
+
+    def __init__(self, operation: str):
+        self.operation = operation
+        self.timings: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def record(self, name: str, seconds: float) -> None:
+        STAGE_DURATION.observe(seconds, operation=self.operation, stage=name)
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    def timings_ms(self) -> Dict[str, float]:
+        return {name: round(seconds * 1000, 2) for name, seconds in self.timings.items()}
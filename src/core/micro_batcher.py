@@ -0,0 +1,100 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, List, Set, Tuple, TypeVar
+
+import structlog
+
+from src.core.metrics import MICRO_BATCH_SIZE, MICRO_BATCH_WAIT
+
+logger = structlog.get_logger()
+
+In = TypeVar("In")
+Out = TypeVar("Out")
+
+class MicroBatcher(Generic[In, Out]):
+    """
+    Collects items submitted by concurrent callers and processes them with one
+    call to `fn`. A batch is sent when it reaches `max_size` items or
+    `max_wait_ms` after its first item arrived, whichever comes first, and the
+    results are fanned back to the callers in order.
+
+    `max_wait_ms` is the latency a lone caller pays for the chance of sharing a
+    request; the batch size and queue wait histograms show what it buys.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[List[In]], Awaitable[List[Out]]],
+        max_size: int = 64,
+        max_wait_ms: float = 2.0,
+        name: str = "batch",
+    ):
+        self._fn = fn
+        self._max_size = max_size
+        self._max_wait = max_wait_ms / 1000
+        self._name = name
+        self._pending: List[Tuple[In, "asyncio.Future[Out]", float]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._running: Set[asyncio.Task] = set()
+        self.batches = 0
+        self.items = 0
+        self._total_wait = 0.0
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "mean_wait_ms": round(self._total_wait / self.items * 1000, 3) if self.items else 0.0,
+        }
+
+    async def submit(self, item: In) -> Out:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[Out] = loop.create_future()
+        self._pending.append((item, future, loop.time()))
+        if len(self._pending) >= self._max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._max_wait, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        # Callers that were cancelled while waiting are dropped from the batch
+        batch = [entry for entry in self._pending if not entry[1].done()]
+        self._pending = []
+        if not batch:
+            return
+        task = asyncio.ensure_future(self._run(batch))
+        # Keep a reference so the task is not garbage collected mid-flight
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: List[Tuple[In, "asyncio.Future[Out]", float]]) -> None:
+        now = asyncio.get_running_loop().time()
+        self.batches += 1
+        self.items += len(batch)
+        MICRO_BATCH_SIZE.observe(len(batch), name=self._name)
+        for _, _, enqueued in batch:
+            self._total_wait += now - enqueued
+            MICRO_BATCH_WAIT.observe(now - enqueued, name=self._name)
+
+        try:
+            results = await self._fn([item for item, _, _ in batch])
+            # Results can only be matched to callers by position
+            if len(results) != len(batch):
+                raise RuntimeError(f"{self._name} returned {len(results)} results for {len(batch)} items")
+        except asyncio.CancelledError:
+            for _, future, _ in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            logger.warning("micro_batch_failed", name=self._name, size=len(batch), error=str(e))
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,20 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Literal
+
+Priority = Literal["interactive", "background"]
+
+_priority: ContextVar[Priority] = ContextVar("request_priority", default="interactive")
+
+def current_priority() -> Priority:
+    """Priority of the work running in the current context; adapters use it to order upstream calls."""
+    return _priority.get()
+
+@contextmanager
+def background_priority() -> Iterator[None]:
+    """Marks upstream calls made inside the block (and tasks created in it) as background work."""
+    token = _priority.set("background")
+    try:
+        yield
+    finally:
+        _priority.reset(token)
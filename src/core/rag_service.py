@@ -1,54 +1,198 @@
+import asyncio
+import hashlib
+import io
+import time
+import numpy as np
 import structlog
-from typing import List
-from src.core.domain import DocumentChunk, SearchQuery, LLMResponse, SearchResult
-from src.ports.storage import VectorStoragePort
+from collections import deque
+from typing import AsyncIterable, AsyncIterator, BinaryIO, Deque, Dict, List, Optional, Tuple, Union
+from src.core.domain import (
+    AnswerStreamEvent, BatchAnswer, ChunkingOptions, ContextStats, DocumentChunk, DocumentSource, IngestBatchAck, IngestionProgress,
+    IngestionResult, SearchQuery, LLMResponse, SearchResult
+)
+from src.ports.storage import ShardedVectorStoragePort, VectorStoragePort
 from src.ports.llm import LLMPort
 from src.ports.document_processor import DocumentProcessorPort
-from src.core.exceptions import ExternalServiceError
-import uuid
+from src.ports.manifest import SourceManifestPort
+from src.core.exceptions import EntityNotFoundError, ExternalServiceError, InvalidFilterError
+from src.core.answer_cache import SemanticAnswerCache
+from src.core.chunking import create_chunker
+from src.core.context import pack_context
+from src.core.keyed_lock import KeyedLock
+from src.core.metrics import ANSWER_CACHE_LOOKUPS, CHUNKS_INGESTED, CONTEXT_TOKENS, OPERATIONS, StageTimer
+from src.core.priority import background_priority
+from src.core.singleflight import SingleFlight
 
 logger = structlog.get_logger()
 
+def chunk_id_for(source: str, content: str, occurrence: int = 0) -> str:
+    """
+    Deterministic chunk id from the source name and a hash of the chunk content.
+    `occurrence` numbers repeated identical chunks within one source.
+    """
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+    return f"{source}_{digest}" if occurrence == 0 else f"{source}_{digest}_{occurrence}"
+
 class RAGService:
-    def __init__(self, storage: VectorStoragePort, llm: LLMPort, doc_processor: DocumentProcessorPort):
+    def __init__(
+        self,
+        storage: VectorStoragePort,
+        llm: LLMPort,
+        doc_processor: DocumentProcessorPort,
+        answer_cache: Optional[SemanticAnswerCache] = None,
+        ingest_batch_size: int = 256,
+        default_chunking: Optional[ChunkingOptions] = None,
+        manifest: Optional[SourceManifestPort] = None,
+        query_flight: Optional[SingleFlight[LLMResponse]] = None,
+        context_token_budget: Optional[int] = None,
+        source_locks: Optional[KeyedLock] = None,
+    ):
         self._storage = storage
         self._llm = llm
         self._doc_processor = doc_processor
+        self._answer_cache = answer_cache
+        self._ingest_batch_size = ingest_batch_size
+        self._default_chunking = default_chunking or ChunkingOptions()
+        self._manifest = manifest
+        # Shared across service instances so concurrent requests can coalesce
+        self._query_flight = query_flight
+        self._context_token_budget = context_token_budget
+        # Shared across service instances so uploads of the same source run one at a time
+        self._source_locks = source_locks if source_locks is not None else KeyedLock()
+
+    async def warm_up(self) -> Dict[str, float]:
+        """
+        Prepares the adapters for the first request (loads the vector index,
+        opens connections, starts worker processes), concurrently, and returns
+        how long each took in milliseconds. Raises if an adapter cannot be
+        prepared.
+        """
+        timer = StageTimer("startup")
+
+        async def warm(name: str, port: Union[VectorStoragePort, LLMPort, DocumentProcessorPort]) -> None:
+            started = time.perf_counter()
+            try:
+                await port.warm_up()
+            finally:
+                timer.record(name, time.perf_counter() - started)
+
+        await asyncio.gather(
+            warm("storage", self._storage),
+            warm("llm", self._llm),
+            warm("doc_processor", self._doc_processor),
+        )
+        return timer.timings_ms()
+
+    async def process_file_upload(
+        self,
+        file: Union[bytes, BinaryIO],
+        filename: str,
+        progress: Optional[IngestionProgress] = None,
+        chunking: Optional[ChunkingOptions] = None,
+    ) -> IngestionResult:
+        """
+        Processes a file, chunks it, and ingests it. Extraction, chunking and
+        ingestion are pipelined: chunks are embedded and stored in batches while
+        later pages are still being extracted. `file` is read as extraction
+        proceeds, so an upload spooled to disk is never loaded whole.
+
+        Chunk ids are content hashes, so re-uploading a source is incremental:
+        only new or changed chunks are embedded and stored, chunks that moved
+        get their metadata updated, and chunks that no longer occur are deleted.
+        Uploads of the same source run one at a time, and stored batches are
+        recorded in the manifest as they land, so chunks of a failed upload are
+        reconciled by the next one.
+        """
+        async with self._source_locks.hold(filename):
+            return await self._process_file_upload(file, filename, progress, chunking)
 
-    def _chunk_text(self, text: str, chunk_size: int = 1000, overlap: int = 200) -> List[str]:
-        """Simple character-based chunking with overlap."""
-        chunks = []
-        start = 0
-        while start < len(text):
-            end = start + chunk_size
-            chunks.append(text[start:end])
-            start += chunk_size - overlap
-        return chunks
-
-    async def process_file_upload(self, file_content: bytes, filename: str) -> int:
-        """Processes a file, chunks it, and ingests it."""
+    async def _process_file_upload(
+        self,
+        file: Union[bytes, BinaryIO],
+        filename: str,
+        progress: Optional[IngestionProgress],
+        chunking: Optional[ChunkingOptions],
+    ) -> IngestionResult:
         logger.info("processing_file_upload", filename=filename)
+        timer = StageTimer("ingest")
+        extract_seconds = chunk_seconds = 0.0
+        progress = progress or IngestionProgress()
+        chunker = create_chunker(chunking or self._default_chunking)
+        previous = await self._manifest.get(filename) if self._manifest is not None else {}
+        result = IngestionResult()
+        current: Dict[str, int] = {}
+        occurrences: Dict[str, int] = {}
+        moved: List[DocumentChunk] = []
+        batch: List[DocumentChunk] = []
+
+        async def flush(final: bool = False) -> None:
+            nonlocal batch
+            while len(batch) >= self._ingest_batch_size or (final and batch):
+                stored = batch[:self._ingest_batch_size]
+                await self.ingest_documents(stored, progress)
+                batch = batch[self._ingest_batch_size:]
+
+        def add(text_chunks: List[str]) -> None:
+            for content in text_chunks:
+                index = result.chunks_ingested
+                key = hashlib.sha256(content.encode("utf-8")).digest()
+                occurrence = occurrences.get(key, 0)
+                occurrences[key] = occurrence + 1
+                chunk = DocumentChunk(
+                    id=chunk_id_for(filename, content, occurrence),
+                    content=content,
+                    metadata={"source": filename, "chunk_index": index}
+                )
+                current[chunk.id] = index
+                result.chunks_ingested += 1
+                if chunk.id not in previous:
+                    result.chunks_added += 1
+                    batch.append(chunk)
+                else:
+                    result.chunks_kept += 1
+                    if previous[chunk.id] != index:
+                        moved.append(chunk)
+            progress.chunks_total = result.chunks_ingested
         
-        # 1. Extract text
-        import io
-        text = self._doc_processor.extract_text(io.BytesIO(file_content), filename)
-        
-        # 2. Chunk text
-        text_chunks = self._chunk_text(text)
-        
-        # 3. Create DocumentChunk objects
-        doc_chunks = [
-            DocumentChunk(
-                id=f"{filename}_{uuid.uuid4().hex[:8]}_{i}",
-                content=chunk,
-                metadata={"source": filename, "chunk_index": i}
-            )
-            for i, chunk in enumerate(text_chunks)
-        ]
+        # 1. Extract text page by page and chunk it as it arrives
+        progress.stage = "extracting"
+        waiting_since = time.perf_counter()
+        if isinstance(file, bytes):
+            file = io.BytesIO(file)
+        async for page in self._doc_processor.extract_pages(file, filename):
+            chunk_started = time.perf_counter()
+            extract_seconds += chunk_started - waiting_since
+            progress.pages_extracted += 1
+            add(chunker.feed(page))
+            chunk_seconds += time.perf_counter() - chunk_started
+            # 2. Ingest full batches of new chunks while extraction continues
+            if len(batch) >= self._ingest_batch_size:
+                await flush()
+                progress.stage = "extracting"
+            waiting_since = time.perf_counter()
         
-        # 4. Ingest
-        await self.ingest_documents(doc_chunks)
-        return len(doc_chunks)
+        progress.stage = "chunking"
+        chunk_started = time.perf_counter()
+        extract_seconds += chunk_started - waiting_since
+        add(chunker.finish())
+        timer.record("extract", extract_seconds)
+        timer.record("chunk", chunk_seconds + time.perf_counter() - chunk_started)
+        await flush(final=True)
+
+        # 3. Reconcile with the previous upload of this source
+        if moved:
+            await self._update_metadata(moved)
+        removed = [chunk_id for chunk_id in previous if chunk_id not in current]
+        if removed:
+            await self.delete_documents(removed)
+        result.chunks_removed = len(removed)
+        if self._manifest is not None:
+            await self._manifest.replace(filename, current)
+
+        logger.info(
+            "file_upload_processed", filename=filename, timings_ms=timer.timings_ms(), **result.model_dump()
+        )
+        return result
 
     async def answer_query(self, query_text: str) -> LLMResponse:
         """
@@ -56,64 +200,413 @@ class RAGService:
         1. Embed the query.
         2. Search the storage for relevant context.
         3. Generate an answer based on the context.
+
+        Concurrent calls with the identical query share one execution.
         """
+        if self._query_flight is None:
+            return await self._answer_query(query_text)
+        return await self._query_flight.do(query_text, lambda: self._answer_query(query_text))
+
+    async def _answer_query(self, query_text: str) -> LLMResponse:
         logger.info("answering_query_started", query=query_text)
+        timer = StageTimer("query")
         
         try:
             # 1. Embed query
             logger.debug("generating_query_embedding")
-            query_embedding = await self._llm.generate_embeddings(query_text)
-            
-            # 2. Search storage
-            logger.debug("searching_vector_storage")
-            search_query = SearchQuery(
-                query=query_text, 
-                embedding=query_embedding,
-                top_k=5
-            )
-            search_results: List[SearchResult] = await self._storage.search(search_query)
+            with timer.stage("embed"):
+                query_embedding = await self._llm.generate_embeddings(query_text)
             
-            if not search_results:
-                logger.warning("no_relevant_context_found", query=query_text)
+            generation = self._cache_generation()
+            cached = self._lookup_cached_answer(query_embedding)
+            if cached is not None:
+                OPERATIONS.inc(operation="query", status="cache_hit")
+                logger.info("answering_query_completed", status="cache_hit", timings_ms=timer.timings_ms())
+                return cached
             
-            context_chunks = [res.chunk for res in search_results]
+            # 2. Search storage
+            with timer.stage("search"):
+                context_chunks = await self._search_context(query_text, query_embedding)
+            context, sources, context_stats = self._pack_context(context_chunks)
             
             # 3. Generate answer
             logger.debug("generating_final_answer")
-            answer = await self._llm.generate_answer(query_text, context_chunks)
+            with timer.stage("generate"):
+                answer = await self._llm.generate_answer(query_text, context)
             
-            logger.info("answering_query_completed", status="success")
-            return LLMResponse(
+            response = LLMResponse(
                 answer=answer,
-                sources=context_chunks
+                sources=sources
             )
+            if self._answer_cache is not None:
+                self._answer_cache.store(query_embedding, response, generation)
+            
+            OPERATIONS.inc(operation="query", status="success")
+            logger.info(
+                "answering_query_completed",
+                status="success",
+                timings_ms=timer.timings_ms(),
+                context=context_stats.model_dump(),
+            )
+            return response
+            
+        except InvalidFilterError:
+            OPERATIONS.inc(operation="query", status="error")
+            raise
+        except Exception as e:
+            OPERATIONS.inc(operation="query", status="error")
+            logger.error("rag_flow_failed", error=str(e), timings_ms=timer.timings_ms())
+            raise ExternalServiceError(
+                message="Failed to process RAG query",
+                details={"original_error": str(e)}
+            ) from e
+
+    async def answer_queries(self, queries: List[str], max_concurrency: int = 8) -> List[BatchAnswer]:
+        """
+        Answers many questions at once, in input order:
+        1. Embed all questions with one batched embedding call.
+        2. Retrieve context for all of them with one multi-query search.
+        3. Generate the answers, at most `max_concurrency` at a time.
+
+        Embedding or search failures fail the whole batch; a failed generation
+        only marks its own answer with an error.
+        """
+        logger.info("answering_queries_started", count=len(queries))
+        timer = StageTimer("batch_query")
+        
+        try:
+            with timer.stage("embed"):
+                embeddings = await self._llm.generate_embeddings_batch(queries)
+            
+            generation = self._cache_generation()
+            cached = [self._lookup_cached_answer(embedding) for embedding in embeddings]
+            pending = [i for i, response in enumerate(cached) if response is None]
             
+            with timer.stage("search"):
+                found = await self._storage.search_many([
+                    SearchQuery(query=queries[i], embedding=embeddings[i], top_k=5) for i in pending
+                ])
+        except InvalidFilterError:
+            OPERATIONS.inc(operation="batch_query", status="error")
+            raise
+        except Exception as e:
+            OPERATIONS.inc(operation="batch_query", status="error")
+            logger.error("rag_batch_flow_failed", error=str(e), timings_ms=timer.timings_ms())
+            raise ExternalServiceError(
+                message="Failed to process RAG queries",
+                details={"original_error": str(e)}
+            ) from e
+        
+        slots = asyncio.Semaphore(max_concurrency)
+        
+        async def generate(i: int, context_chunks: List[DocumentChunk]) -> BatchAnswer:
+            context, sources, _ = self._pack_context(context_chunks)
+            async with slots:
+                try:
+                    answer = await self._llm.generate_answer(queries[i], context)
+                except Exception as e:
+                    logger.warning("batch_answer_failed", index=i, error=str(e))
+                    return BatchAnswer(question=queries[i], sources=sources, error=str(e))
+            response = LLMResponse(answer=answer, sources=sources)
+            if self._answer_cache is not None:
+                self._answer_cache.store(embeddings[i], response, generation)
+            return BatchAnswer(question=queries[i], answer=answer, sources=sources)
+        
+        with timer.stage("generate"):
+            generated = await asyncio.gather(*(
+                generate(i, [result.chunk for result in results]) for i, results in zip(pending, found)
+            ))
+        
+        results: List[Optional[BatchAnswer]] = [
+            BatchAnswer(question=query, answer=response.answer, sources=response.sources) if response else None
+            for query, response in zip(queries, cached)
+        ]
+        for i, answer in zip(pending, generated):
+            results[i] = answer
+        failed = sum(answer.error is not None for answer in generated)
+        OPERATIONS.inc(operation="batch_query", status="success" if not failed else "partial")
+        logger.info(
+            "answering_queries_completed",
+            count=len(queries),
+            cache_hits=len(queries) - len(pending),
+            failed=failed,
+            timings_ms=timer.timings_ms(),
+        )
+        return results
+
+    async def stream_answer_query(self, query_text: str) -> AsyncIterator[AnswerStreamEvent]:
+        """
+        Streaming variant of answer_query. Yields a `sources` event as soon as
+        retrieval finishes, then `token` events as the answer is generated and a
+        final `done` event.
+        """
+        logger.info("streaming_query_started", query=query_text)
+        timer = StageTimer("query")
+        
+        try:
+            with timer.stage("embed"):
+                query_embedding = await self._llm.generate_embeddings(query_text)
+            generation = self._cache_generation()
+            cached = self._lookup_cached_answer(query_embedding)
+            if cached:
+                sources = cached.sources
+            else:
+                with timer.stage("search"):
+                    context_chunks = await self._search_context(query_text, query_embedding)
+                context, sources, context_stats = self._pack_context(context_chunks)
+        except InvalidFilterError:
+            OPERATIONS.inc(operation="query", status="error")
+            raise
         except Exception as e:
+            OPERATIONS.inc(operation="query", status="error")
             logger.error("rag_flow_failed", error=str(e))
             raise ExternalServiceError(
                 message="Failed to process RAG query",
                 details={"original_error": str(e)}
             ) from e
+        
+        yield AnswerStreamEvent(event="sources", sources=sources)
+        
+        if cached:
+            yield AnswerStreamEvent(event="token", delta=cached.answer)
+            OPERATIONS.inc(operation="query", status="cache_hit")
+            logger.info("streaming_query_completed", status="cache_hit", timings_ms=timer.timings_ms())
+            yield AnswerStreamEvent(event="done")
+            return
+        
+        parts: List[str] = []
+        generate_started = time.perf_counter()
+        try:
+            async for delta in self._llm.stream_answer(query_text, context):
+                if not parts:
+                    timer.record("first_token", time.perf_counter() - generate_started)
+                parts.append(delta)
+                yield AnswerStreamEvent(event="token", delta=delta)
+        except Exception as e:
+            OPERATIONS.inc(operation="query", status="error")
+            logger.error("rag_stream_failed", error=str(e), tokens_sent=len(parts))
+            raise ExternalServiceError(
+                message="Failed to stream RAG answer",
+                details={"original_error": str(e)}
+            ) from e
+        
+        if self._answer_cache is not None:
+            self._answer_cache.store(query_embedding, LLMResponse(answer="".join(parts), sources=sources), generation)
+        
+        # Includes the time the client took to consume the tokens
+        timer.record("generate", time.perf_counter() - generate_started)
+        OPERATIONS.inc(operation="query", status="success")
+        logger.info(
+            "streaming_query_completed",
+            status="success",
+            timings_ms=timer.timings_ms(),
+            context=context_stats.model_dump(),
+        )
+        yield AnswerStreamEvent(event="done")
 
-    async def ingest_documents(self, chunks: List[DocumentChunk]) -> None:
+    def _pack_context(
+        self, context_chunks: List[DocumentChunk]
+    ) -> Tuple[List[DocumentChunk], List[DocumentChunk], ContextStats]:
+        context, sources, stats = pack_context(context_chunks, self._context_token_budget)
+        CONTEXT_TOKENS.observe(stats.retrieved_tokens, stage="retrieved")
+        CONTEXT_TOKENS.observe(stats.context_tokens, stage="packed")
+        return context, sources, stats
+
+    def _cache_generation(self) -> Optional[int]:
+        """Read before searching, so answers built on since-invalidated sources are not cached."""
+        return self._answer_cache.generation if self._answer_cache is not None else None
+
+    def _lookup_cached_answer(self, query_embedding: List[float]) -> Optional[LLMResponse]:
+        if self._answer_cache is None:
+            return None
+        cached = self._answer_cache.lookup(query_embedding)
+        ANSWER_CACHE_LOOKUPS.inc(result="hit" if cached is not None else "miss")
+        return cached
+
+    async def _search_context(self, query_text: str, query_embedding: List[float]) -> List[DocumentChunk]:
+        logger.debug("searching_vector_storage")
+        search_query = SearchQuery(
+            query=query_text, 
+            embedding=query_embedding,
+            top_k=5
+        )
+        search_results: List[SearchResult] = await self._storage.search(search_query)
+        
+        if not search_results:
+            logger.warning("no_relevant_context_found", query=query_text)
+        
+        return [res.chunk for res in search_results]
+
+    async def ingest_documents(
+        self, chunks: List[DocumentChunk], progress: Optional[IngestionProgress] = None
+    ) -> None:
         """
         Ingest documents by generating embeddings and storing them.
         """
+        progress = progress or IngestionProgress()
         logger.info("ingesting_documents_started", count=len(chunks))
+        timer = StageTimer("ingest")
+        started = time.perf_counter()
         try:
-            for chunk in chunks:
-                if not chunk.embedding:
-                    chunk.embedding = await self._llm.generate_embeddings(chunk.content)
+            progress.stage = "embedding"
+            # Ingestion yields to interactive queries at the LLM rate limiter
+            with background_priority():
+                embedded = await self._embed_chunks(chunks, timer)
+            progress.chunks_embedded += len(chunks)
             
-            await self._storage.upsert(chunks)
-            logger.info("ingesting_documents_completed", count=len(chunks))
+            progress.stage = "upserting"
+            await self._store_chunks(chunks, timer)
+            progress.chunks_upserted += len(chunks)
+            elapsed = time.perf_counter() - started
+            logger.info(
+                "ingesting_documents_completed",
+                count=len(chunks),
+                embedded=embedded,
+                duration_s=round(elapsed, 3),
+                chunks_per_sec=round(len(chunks) / elapsed, 1) if elapsed > 0 else None,
+                timings_ms=timer.timings_ms(),
+            )
         except Exception as e:
+            OPERATIONS.inc(operation="ingest", status="error")
             logger.error("ingestion_failed", error=str(e))
             raise ExternalServiceError(
                 message="Failed to ingest documents",
                 details={"original_error": str(e)}
             ) from e
 
+    async def ingest_stream(
+        self,
+        chunks: AsyncIterable[DocumentChunk],
+        batch_size: Optional[int] = None,
+        max_in_flight: int = 4,
+    ) -> AsyncIterator[IngestBatchAck]:
+        """
+        Ingest an unbounded stream of chunks in batches, yielding one
+        acknowledgement per batch in input order.
+
+        Embedding and upserting run as overlapping stages: up to `max_in_flight`
+        batches are embedded concurrently while earlier batches are upserted.
+        Once that many are pending, no further input is read until the oldest
+        batch is acknowledged, so memory use is bounded regardless of the
+        stream's length. Upserts happen in input order. A failed batch is acknowledged with its error and the
+        stream carries on with the next one.
+        """
+        batch_size = batch_size or self._ingest_batch_size
+        logger.info("ingest_stream_started", batch_size=batch_size, max_in_flight=max_in_flight)
+        in_flight: Deque["asyncio.Task[IngestBatchAck]"] = deque()
+        counts = {"batches": 0, "chunks_ingested": 0, "batches_failed": 0}
+
+        def start(batch: List[DocumentChunk]) -> None:
+            previous = in_flight[-1] if in_flight else None
+            in_flight.append(asyncio.ensure_future(self._ingest_stream_batch(counts["batches"], batch, previous)))
+            counts["batches"] += 1
+
+        async def finish_oldest() -> IngestBatchAck:
+            ack = await in_flight.popleft()
+            if ack.status == "ok":
+                counts["chunks_ingested"] += len(ack.ids)
+            else:
+                counts["batches_failed"] += 1
+            return ack
+
+        try:
+            batch: List[DocumentChunk] = []
+            async for chunk in chunks:
+                batch.append(chunk)
+                if len(batch) == batch_size:
+                    start(batch)
+                    batch = []
+                    if len(in_flight) >= max_in_flight:
+                        yield await finish_oldest()
+            if batch:
+                start(batch)
+            while in_flight:
+                yield await finish_oldest()
+        finally:
+            # The consumer went away (e.g. the client disconnected): stop the pipeline
+            for task in in_flight:
+                task.cancel()
+            # Wait for the cancellations so no batch is still writing once the stream has ended
+            await asyncio.gather(*in_flight, return_exceptions=True)
+            logger.info("ingest_stream_finished", cancelled=len(in_flight), **counts)
+
+    async def _ingest_stream_batch(
+        self,
+        index: int,
+        batch: List[DocumentChunk],
+        previous: Optional["asyncio.Task[IngestBatchAck]"],
+    ) -> IngestBatchAck:
+        timer = StageTimer("ingest")
+        ids = [chunk.id for chunk in batch]
+        try:
+            with background_priority():
+                await self._embed_chunks(batch, timer)
+            # Upserts keep the input order, so a later duplicate id wins as it would serially
+            if previous is not None:
+                await asyncio.wait([previous])
+            await self._store_chunks(batch, timer)
+        except Exception as e:
+            OPERATIONS.inc(operation="ingest", status="error")
+            logger.error("ingest_stream_batch_failed", batch=index, count=len(batch), error=str(e))
+            return IngestBatchAck(batch=index, status="error", ids=ids, error=str(e))
+        logger.debug("ingest_stream_batch_completed", batch=index, count=len(batch), timings_ms=timer.timings_ms())
+        return IngestBatchAck(batch=index, status="ok", ids=ids)
+
+    async def _embed_chunks(self, chunks: List[DocumentChunk], timer: StageTimer) -> int:
+        """Embeds the chunks that have no embedding yet and returns how many that were."""
+        pending = [chunk for chunk in chunks if chunk.embedding is None]
+        if pending:
+            with timer.stage("embed"):
+                embeddings = await self._llm.generate_embeddings_batch([chunk.content for chunk in pending])
+            # Rows of one float32 matrix: compact, and the stores take them without copying
+            for chunk, embedding in zip(pending, np.asarray(embeddings, dtype=np.float32)):
+                chunk.embedding = embedding
+        return len(pending)
+
+    async def _store_chunks(self, chunks: List[DocumentChunk], timer: StageTimer) -> None:
+        with timer.stage("upsert"):
+            await self._storage.upsert(chunks)
+        CHUNKS_INGESTED.inc(len(chunks))
+        if self._manifest is not None:
+            await self._record_sources(chunks)
+        if self._answer_cache is not None:
+            self._answer_cache.invalidate(
+                chunk_ids=[chunk.id for chunk in chunks],
+                sources=[chunk.metadata["source"] for chunk in chunks if "source" in chunk.metadata],
+            )
+
+    async def _record_sources(self, chunks: List[DocumentChunk]) -> None:
+        # Every ingest path records its chunks, so sources can be listed and deleted
+        # whichever way they were ingested; a chunk without a chunk_index is recorded as -1
+        by_source: Dict[str, Dict[str, int]] = {}
+        unsourced: List[str] = []
+        for chunk in chunks:
+            source = chunk.metadata.get("source")
+            if source is None:
+                unsourced.append(chunk.id)
+            else:
+                index = chunk.metadata.get("chunk_index")
+                by_source.setdefault(str(source), {})[chunk.id] = index if isinstance(index, int) else -1
+        for source, recorded in by_source.items():
+            await self._manifest.add(source, recorded)
+        if unsourced:
+            # The chunk may have been re-ingested without the source it had before
+            await self._manifest.remove_ids(unsourced)
+
+    async def _update_metadata(self, chunks: List[DocumentChunk]) -> None:
+        try:
+            for start in range(0, len(chunks), self._ingest_batch_size):
+                await self._storage.update_metadata(chunks[start:start + self._ingest_batch_size])
+            if self._answer_cache is not None:
+                # Cached answers cite the chunks with their old metadata, e.g. chunk_index
+                self._answer_cache.invalidate(chunk_ids=[chunk.id for chunk in chunks])
+        except Exception as e:
+            logger.error("metadata_update_failed", error=str(e))
+            raise ExternalServiceError(
+                message="Failed to update document metadata",
+                details={"original_error": str(e)}
+            ) from e
+
     async def delete_documents(self, ids: List[str]) -> None:
         """
         Delete specific document chunks from the vector store.
@@ -121,6 +614,10 @@ class RAGService:
         logger.info("deleting_documents_started", count=len(ids))
         try:
             await self._storage.delete(ids)
+            if self._manifest is not None:
+                await self._manifest.remove_ids(ids)
+            if self._answer_cache is not None:
+                self._answer_cache.invalidate(chunk_ids=ids)
             logger.info("deleting_documents_completed", count=len(ids))
         except Exception as e:
             logger.error("deletion_failed", error=str(e))
@@ -129,6 +626,63 @@ class RAGService:
                 details={"original_error": str(e)}
             ) from e
 
+    async def delete_source(self, source: str) -> int:
+        """
+        Delete every chunk of a source document with a single metadata-filtered
+        delete, so memory use does not depend on the size of the document.
+        Returns the number of chunks the manifest had recorded for the source.
+        """
+        logger.info("deleting_source_started", source=source)
+        try:
+            await self._storage.delete_where({"source": source})
+            removed = await self._manifest.remove_source(source) if self._manifest is not None else 0
+            if self._answer_cache is not None:
+                self._answer_cache.invalidate(sources=[source])
+            logger.info("deleting_source_completed", source=source, count=removed)
+            return removed
+        except Exception as e:
+            logger.error("source_deletion_failed", source=source, error=str(e))
+            raise ExternalServiceError(
+                message="Failed to delete source",
+                details={"original_error": str(e)}
+            ) from e
+
+    async def clear_shard(self, index: int) -> List[str]:
+        """
+        Drop one shard of a sharded vector store and forget its sources, so
+        uploading them again rebuilds the shard while the others keep serving.
+        Returns the sources that were stored in the shard.
+        """
+        storage = self._storage
+        if not isinstance(storage, ShardedVectorStoragePort) or not 0 <= index < storage.shard_count:
+            raise EntityNotFoundError(f"Shard {index} not found", details={"shard": index})
+        sources = [item.source for item in await self.list_sources() if storage.shard_for_source(item.source) == index]
+        logger.info("clearing_shard_started", shard=index, sources=len(sources))
+        try:
+            await storage.clear_shard(index)
+            if self._manifest is not None:
+                for source in sources:
+                    await self._manifest.remove_source(source)
+            if self._answer_cache is not None:
+                # The shard may also hold chunks without a source, so drop every answer
+                self._answer_cache.clear()
+            logger.info("clearing_shard_completed", shard=index)
+            return sources
+        except Exception as e:
+            logger.error("clearing_shard_failed", shard=index, error=str(e))
+            raise ExternalServiceError(
+                message="Failed to clear shard",
+                details={"original_error": str(e)}
+            ) from e
+
+    async def list_sources(self) -> List[DocumentSource]:
+        """
+        List the ingested source documents with their chunk counts.
+        """
+        if self._manifest is None:
+            return []
+        return await self._manifest.list_sources()
+
     async def clear_all_documents(self) -> None:
         """
         Clear all documents from the vector store.
@@ -136,6 +690,10 @@ class RAGService:
         logger.info("clearing_all_documents_started")
         try:
             await self._storage.clear_all()
+            if self._manifest is not None:
+                await self._manifest.clear()
+            if self._answer_cache is not None:
+                self._answer_cache.clear()
             logger.info("clearing_all_documents_completed")
         except Exception as e:
             logger.error("clearing_all_failed", error=str(e))
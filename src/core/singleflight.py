@@ -0,0 +1,66 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+
+import structlog
+
+from src.core.metrics import COALESCED_CALLS
+
+logger = structlog.get_logger()
+
+T = TypeVar("T")
+
+class _Call(Generic[T]):
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: "asyncio.Task[T]"):
+        self.task = task
+        self.waiters = 0
+
+class SingleFlight(Generic[T]):
+    """
+    Coalesces concurrent calls with the same key into one execution: the first
+    caller starts the work as a task and later callers await the same task.
+
+    - Results and exceptions are delivered to every waiter.
+    - Cancelling one waiter does not affect the others; the shared task is
+      only cancelled once every waiter has gone.
+    - Keys are forgotten as soon as the task finishes, so this never serves
+      stale results (caching is a separate concern).
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._calls: Dict[Hashable, _Call[T]] = {}
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+        else:
+            COALESCED_CALLS.inc(operation=self._name)
+            logger.debug("call_coalesced", operation=self._name, waiters=call.waiters + 1)
+
+        call.waiters += 1
+        try:
+            # shield: a waiter being cancelled must not cancel the shared task
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.task.done():
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _forget(self, key: Hashable, call: _Call[T]) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        # Retrieve the exception so a task nobody awaited any more is not
+        # reported as "exception was never retrieved"
+        if not call.task.cancelled():
+            call.task.exception()
@@ -0,0 +1,9 @@
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token for English text)."""
+    return len(text) // 4 + 1
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cuts `text` so that `estimate_tokens` of the result is at most `max_tokens`."""
+    if max_tokens <= 0:
+        return ""
+    return text[:(max_tokens - 1) * 4 + 3]
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import BinaryIO
+from typing import AsyncIterator, BinaryIO
 
 class DocumentProcessorPort(ABC):
     @abstractmethod
@@ -9,3 +9,20 @@ class DocumentProcessorPort(ABC):
         Supports .txt and .pdf (via child implementations).
         """
         pass
+
+    @abstractmethod
+    def extract_pages(self, file: BinaryIO, filename: str) -> AsyncIterator[str]:
+        """
+        Streaming form of extract_text: yields the text of each page, in order, as
+        soon as it is available. Joining the pages gives the same text as
+        extract_text.
+        """
+        pass
+
+    async def warm_up(self) -> None:
+        """Prepare for the first document at startup, e.g. start worker processes. The default does nothing."""
+        pass
+
+    def close(self) -> None:
+        """Release worker processes at shutdown. The default does nothing."""
+        pass
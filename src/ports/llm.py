@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import AsyncIterator, List
 from src.core.domain import DocumentChunk
 
 class LLMPort(ABC):
@@ -8,7 +8,29 @@ class LLMPort(ABC):
         """Generate an answer based on the provided query and context."""
         pass
 
+    @abstractmethod
+    def stream_answer(self, query: str, context_chunks: List[DocumentChunk]) -> AsyncIterator[str]:
+        """Generate an answer as an async iterator of text deltas."""
+        pass
+
     @abstractmethod
     async def generate_embeddings(self, text: str) -> List[float]:
         """Generate vector embeddings for the given text."""
         pass
+
+    @abstractmethod
+    async def generate_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
+        """Generate vector embeddings for many texts, returned in input order."""
+        pass
+
+    async def warm_up(self) -> None:
+        """Prepare for the first request at startup, e.g. open connections. The default does nothing."""
+        pass
+
+    async def close(self) -> None:
+        """
+        Release connections and files at shutdown. Async, unlike the other
+        ports' hook, since HTTP clients close their connections asynchronously.
+        The default does nothing.
+        """
+        pass
@@ -0,0 +1,49 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List
+from src.core.domain import DocumentSource
+
+class SourceManifestPort(ABC):
+    """
+    Records which chunks are stored for each source document, so re-ingesting a
+    source can tell new, unchanged and vanished chunks apart. Chunk ids are
+    derived from a hash of the chunk content.
+    """
+
+    @abstractmethod
+    async def get(self, source: str) -> Dict[str, int]:
+        """Return the stored chunks of a source as {chunk_id: chunk_index}."""
+        pass
+
+    @abstractmethod
+    async def add(self, source: str, chunks: Dict[str, int]) -> None:
+        """Record chunks of a source in addition to those already recorded."""
+        pass
+
+    @abstractmethod
+    async def replace(self, source: str, chunks: Dict[str, int]) -> None:
+        """Replace the recorded chunks of a source."""
+        pass
+
+    @abstractmethod
+    async def list_sources(self) -> List[DocumentSource]:
+        """Return every recorded source with its chunk count, ordered by name."""
+        pass
+
+    @abstractmethod
+    async def remove_source(self, source: str) -> int:
+        """Forget a source; returns the number of chunks that were recorded for it."""
+        pass
+
+    @abstractmethod
+    async def remove_ids(self, ids: List[str]) -> None:
+        """Forget individual chunks, e.g. after they were deleted directly."""
+        pass
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """Forget all sources."""
+        pass
+
+    def close(self) -> None:
+        """Release the connection at shutdown. The default does nothing."""
+        pass
@@ -1,5 +1,6 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Any, Dict, List
 from src.core.domain import DocumentChunk, SearchQuery, SearchResult
 
 class VectorStoragePort(ABC):
@@ -10,7 +11,20 @@ class VectorStoragePort(ABC):
 
     @abstractmethod
     async def search(self, query: SearchQuery) -> List[SearchResult]:
-        """Search for chunks similar to the query."""
+        """Search for chunks similar to the query, closest first; scores are distances (lower is closer)."""
+        pass
+
+    async def search_many(self, queries: List[SearchQuery]) -> List[List[SearchResult]]:
+        """
+        Search for several queries at once, returning one result list per query
+        in input order. Adapters whose backend can answer many queries in one
+        call should override this; the default runs the searches concurrently.
+        """
+        return list(await asyncio.gather(*(self.search(query) for query in queries)))
+
+    @abstractmethod
+    async def update_metadata(self, chunks: List[DocumentChunk]) -> None:
+        """Replace the metadata of stored chunks, keeping their content and embeddings."""
         pass
 
     @abstractmethod
@@ -18,7 +32,45 @@ class VectorStoragePort(ABC):
         """Delete specific document chunks from the vector store."""
         pass
 
+    @abstractmethod
+    async def delete_where(self, filters: Dict[str, Any]) -> None:
+        """Delete all chunks whose metadata matches `filters` (same syntax as search filters)."""
+        pass
+
     @abstractmethod
     async def clear_all(self) -> None:
         """Removes all document chunks from the vector store."""
         pass
+
+    async def warm_up(self) -> None:
+        """
+        Prepare for the first request at startup, e.g. open the collection and
+        load its index. The default does nothing.
+        """
+        pass
+
+    def close(self) -> None:
+        """Release connections, files and threads at shutdown. The default does nothing."""
+        pass
+
+class ShardedVectorStoragePort(VectorStoragePort):
+    """
+    A vector store split into independent shards, with every chunk of a source
+    stored in the same shard, so one shard can be dropped and its sources
+    re-ingested without touching the others.
+    """
+
+    @property
+    @abstractmethod
+    def shard_count(self) -> int:
+        pass
+
+    @abstractmethod
+    def shard_for_source(self, source: str) -> int:
+        """Index of the shard that stores the chunks of `source`."""
+        pass
+
+    @abstractmethod
+    async def clear_shard(self, index: int) -> None:
+        """Removes all document chunks from one shard."""
+        pass
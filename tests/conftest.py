@@ -11,8 +11,12 @@ def mock_storage():
     storage = MagicMock(spec=VectorStoragePort)
     storage.upsert = AsyncMock()
     storage.search = AsyncMock()
+    storage.search_many = AsyncMock()
+    storage.update_metadata = AsyncMock()
     storage.delete = AsyncMock()
+    storage.delete_where = AsyncMock()
     storage.clear_all = AsyncMock()
+    storage.warm_up = AsyncMock()
     return storage
 
 @pytest.fixture
@@ -20,11 +24,23 @@ def mock_llm():
     llm = MagicMock(spec=LLMPort)
     llm.generate_answer = AsyncMock()
     llm.generate_embeddings = AsyncMock()
+    llm.generate_embeddings_batch = AsyncMock(
+        side_effect=lambda texts: [llm.generate_embeddings.return_value for _ in texts]
+    )
+    llm.warm_up = AsyncMock()
     return llm
 
 @pytest.fixture
 def mock_doc_processor():
-    return MagicMock(spec=DocumentProcessorPort)
+    processor = MagicMock(spec=DocumentProcessorPort)
+
+    # Stream whatever extract_text is configured to return as a single page
+    async def extract_pages(file, filename):
+        yield processor.extract_text(file, filename)
+
+    processor.extract_pages = extract_pages
+    processor.warm_up = AsyncMock()
+    return processor
 
 @pytest.fixture
 def rag_service(mock_storage, mock_llm, mock_doc_processor):
@@ -1,13 +1,25 @@
+import base64
+import json
+import time
+import numpy as np
 import pytest
+from tempfile import SpooledTemporaryFile
+from unittest.mock import MagicMock, patch
 from fastapi.testclient import TestClient
-from src.api.main import app
-from src.api.dependencies import get_rag_service
-from src.core.domain import LLMResponse, DocumentChunk
+from starlette.formparsers import MultiPartException
+from starlette.requests import ClientDisconnect, Request
+from src.api.main import _DuplexStreamingResponse, _limited_body, _receive_upload, app
+from src.api import dependencies
+from src.api.dependencies import get_rag_service, get_settings
+from src.config import Settings
+from src.core.exceptions import InvalidFilterError, PayloadTooLargeError
+from src.core.domain import LLMResponse, DocumentChunk, SearchResult
 
 @pytest.fixture
-def client(rag_service):
-    # Override the dependency to use the mocked rag_service
+def client(rag_service, monkeypatch):
+    # Override the dependency to use the mocked rag_service, and warm it up at startup
     app.dependency_overrides[get_rag_service] = lambda: rag_service
+    monkeypatch.setattr(app.state, "rag_service", rag_service, raising=False)
     with TestClient(app) as c:
         yield c
     app.dependency_overrides.clear()
@@ -17,6 +29,47 @@ def test_health_check(client):
     assert response.status_code == 200
     assert response.json() == {"status": "healthy"}
 
+def _wait_for_warm_up(client, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        response = client.get("/ready")
+        if response.json()["status"] != "starting":
+            return response
+        time.sleep(0.01)
+    raise AssertionError("startup warm-up did not finish")
+
+def test_ready_once_adapters_are_warmed_up(client, mock_storage, mock_llm, mock_doc_processor):
+    response = _wait_for_warm_up(client)
+    
+    assert response.status_code == 200
+    assert response.json() == {"status": "ready"}
+    mock_storage.warm_up.assert_awaited_once()
+    mock_llm.warm_up.assert_awaited_once()
+    mock_doc_processor.warm_up.assert_awaited_once()
+
+def test_ready_reports_a_failed_warm_up(rag_service, mock_storage, monkeypatch):
+    mock_storage.warm_up.side_effect = Exception("Collection unavailable")
+    monkeypatch.setattr(app.state, "rag_service", rag_service, raising=False)
+    with TestClient(app) as client:
+        response = _wait_for_warm_up(client)
+        
+        assert response.status_code == 503
+        assert response.json() == {"status": "failed", "error": "Collection unavailable"}
+        # Liveness is unaffected
+        assert client.get("/health").status_code == 200
+
+def test_shutdown_closes_the_adapters(rag_service, monkeypatch):
+    processor = MagicMock()
+    monkeypatch.setattr(dependencies, "_doc_processor", processor)
+    monkeypatch.setattr(app.state, "rag_service", rag_service, raising=False)
+    with TestClient(app):
+        pass
+    
+    processor.close.assert_called_once()
+    assert dependencies._doc_processor is None
+    assert dependencies._answer_cache is dependencies._query_flight is None
+    assert dependencies._source_locks is dependencies._job_manager is None
+
 def test_chat_endpoint(client, rag_service, mock_llm):
     mock_llm.generate_answer.return_value = "Mocked response"
     mock_llm.generate_embeddings.return_value = [0.1, 0.2]
@@ -26,6 +79,35 @@ def test_chat_endpoint(client, rag_service, mock_llm):
     assert response.status_code == 200
     assert response.json()["answer"] == "Mocked response"
 
+def test_chat_with_an_unsupported_filter_is_a_bad_request(client, mock_llm, mock_storage):
+    mock_llm.generate_embeddings.return_value = [0.1, 0.2]
+    mock_storage.search.side_effect = InvalidFilterError("Unsupported filter operator for NumpyAdapter: $or")
+    
+    response = client.post("/chat", json={"message": "hello"})
+    
+    assert response.status_code == 400
+    assert response.json()["error"]["code"] == "INVALID_FILTER"
+
+def test_chat_batch_endpoint(client, mock_llm, mock_storage):
+    mock_llm.generate_answer.side_effect = lambda query, chunks: f"answer {query}"
+    mock_llm.generate_embeddings.return_value = [0.1, 0.2]
+    mock_storage.search_many.side_effect = lambda queries: [[] for _ in queries]
+    
+    response = client.post("/chat/batch", json={"questions": ["one", "two"]})
+    
+    assert response.status_code == 200
+    assert [item["answer"] for item in response.json()] == ["answer one", "answer two"]
+    assert client.post("/chat/batch", json={"questions": []}).status_code == 422
+
+def _wait_for_job(client, job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] in ("completed", "failed"):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
 def test_upload_endpoint(client, rag_service, mock_doc_processor):
     mock_doc_processor.extract_text.return_value = "Extracted text"
     
@@ -33,9 +115,29 @@ def test_upload_endpoint(client, rag_service, mock_doc_processor):
     files = {"file": ("test.txt", b"file content", "text/plain")}
     response = client.post("/upload", files=files)
     
-    assert response.status_code == 200
-    assert response.json()["status"] == "success"
-    assert response.json()["chunks_ingested"] > 0
+    assert response.status_code == 202
+    assert response.json()["status"] == "queued"
+    
+    job = _wait_for_job(client, response.json()["job_id"])
+    assert job["status"] == "completed"
+    assert job["result"]["chunks_ingested"] > 0
+    assert job["progress"]["stage"] == "done"
+    assert job["progress"]["chunks_upserted"] == job["progress"]["chunks_total"]
+
+def test_ingest_text_job_reports_failure(client, rag_service, mock_doc_processor):
+    mock_doc_processor.extract_text.side_effect = ValueError("Unsupported file type: notes.md")
+    
+    response = client.post("/ingest-text", json={"text": "hello", "filename": "notes.md"})
+    job = _wait_for_job(client, response.json()["job_id"])
+    
+    assert job["status"] == "failed"
+    assert "Unsupported file type" in job["error"]
+
+def test_unknown_job_returns_404(client):
+    response = client.get("/jobs/does-not-exist")
+    
+    assert response.status_code == 404
+    assert response.json()["error"]["code"] == "NOT_FOUND"
 
 def test_ingest_endpoint(client, rag_service):
     data = {
@@ -52,6 +154,84 @@ def test_ingest_endpoint(client, rag_service):
     assert response.status_code == 200
     assert response.json()["status"] == "success"
 
+def test_ingest_accepts_float_and_base64_embeddings(client, mock_llm, mock_storage):
+    encoded = base64.b64encode(np.array([0.5, -1.5], dtype="<f4").tobytes()).decode()
+    data = {"chunks": [
+        {"id": "a", "content": "x", "embedding": [0.25, 1.0]},
+        {"id": "b", "content": "y", "embedding": encoded},
+    ]}
+    
+    response = client.post("/ingest", json=data)
+    
+    assert response.status_code == 200
+    mock_llm.generate_embeddings_batch.assert_not_called()
+    stored = mock_storage.upsert.call_args.args[0]
+    assert all(chunk.embedding.dtype == np.float32 for chunk in stored)
+    assert [chunk.embedding.tolist() for chunk in stored] == [[0.25, 1.0], [0.5, -1.5]]
+    
+    data["chunks"][1]["embedding"] = encoded[:-2]
+    assert client.post("/ingest", json=data).status_code == 422
+
+def test_ingest_embeds_chunks_with_an_empty_embedding(client, mock_llm, mock_storage):
+    mock_llm.generate_embeddings.return_value = [0.5, 0.5]
+    
+    response = client.post("/ingest", json={"chunks": [{"id": "a", "content": "x", "embedding": []}]})
+    
+    assert response.status_code == 200
+    mock_llm.generate_embeddings_batch.assert_called_once_with(["x"])
+    assert mock_storage.upsert.call_args.args[0][0].embedding.tolist() == [0.5, 0.5]
+
+def test_chat_sources_omit_embeddings(client, mock_llm, mock_storage):
+    mock_llm.generate_answer.return_value = "answer"
+    mock_llm.generate_embeddings.return_value = [0.1, 0.2]
+    chunk = DocumentChunk(id="a", content="x", metadata={"source": "doc.txt"}, embedding=[0.1, 0.2])
+    mock_storage.search.return_value = [SearchResult(chunk=chunk, score=0.9)]
+    
+    response = client.post("/chat", json={"message": "hello"})
+    
+    assert response.status_code == 200
+    assert response.json()["sources"] == [{"id": "a", "content": "x", "metadata": {"source": "doc.txt"}}]
+
+def test_ingest_stream_endpoint(client, mock_storage):
+    lines = [json.dumps({"id": f"s{i}", "content": f"chunk {i}"}) for i in range(3)]
+    lines.insert(1, '{"id": "broken"}')
+    
+    response = client.post("/ingest/stream", content="\n".join(lines) + "\n")
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    *acks, summary = [json.loads(line) for line in response.text.splitlines()]
+    assert acks == [{"batch": 0, "status": "ok", "ids": ["s0", "s1", "s2"]}]
+    assert summary["chunks_ingested"] == 3
+    assert summary["invalid_lines"] == 1
+    assert summary["errors"][0]["line"] == 2
+    mock_storage.upsert.assert_called_once()
+
+def test_ingest_stream_bounds_lines_and_reported_errors(client, mock_storage):
+    app.dependency_overrides[get_settings] = lambda: Settings(OPENAI_API_KEY="test", INGEST_STREAM_MAX_LINE_BYTES=100)
+    body = [b"x" * 60] * 3 + [b"\n", json.dumps({"id": "ok", "content": "fits"}).encode(), b"\n"]
+    body += [b"{}\n"] * 150 + [b"y" * 500]
+    
+    response = client.post("/ingest/stream", content=iter(body))
+    
+    summary = json.loads(response.text.splitlines()[-1])
+    assert summary["chunks_ingested"] == 1
+    assert summary["invalid_lines"] == 152
+    assert summary["errors"][0] == {"line": 1, "error": "Line exceeds 100 bytes"}
+    assert len(summary["errors"]) == 100
+
+async def test_duplex_stream_reports_a_failed_send_as_disconnect():
+    async def body():
+        yield "ack\n"
+
+    async def send(message):
+        raise OSError("connection reset")
+    
+    response = _DuplexStreamingResponse(body(), media_type="application/x-ndjson")
+    
+    with pytest.raises(ClientDisconnect):
+        await response({"type": "http"}, None, send)
+
 def test_delete_endpoint(client, rag_service):
     response = client.request("DELETE", "/documents", json={"ids": ["test_1"]})
     
@@ -63,3 +243,129 @@ def test_clear_endpoint(client, rag_service):
     
     assert response.status_code == 200
     assert response.json()["status"] == "success"
+
+def test_chat_stream_endpoint(client, rag_service, mock_llm, mock_storage):
+    from src.core.domain import SearchResult
+    mock_llm.generate_embeddings.return_value = [0.1, 0.2]
+    chunk = DocumentChunk(id="hr_1", content="Remote on Tuesdays", metadata={"source": "hr.pdf"})
+    mock_storage.search.return_value = [SearchResult(chunk=chunk, score=0.1)]
+
+    async def tokens(query, context_chunks):
+        for delta in ["Tues", "days."]:
+            yield delta
+    mock_llm.stream_answer = tokens
+    
+    response = client.post("/chat/stream", json={"message": "hello"})
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert "X-Request-ID" in response.headers
+    events = [block.split("\n") for block in response.text.strip().split("\n\n")]
+    assert [e[0] for e in events] == ["event: sources", "event: token", "event: token", "event: done"]
+    assert '"hr_1"' in events[0][1]
+    assert events[1][1] == 'data: {"delta": "Tues"}'
+
+def test_upload_with_custom_chunking(client, rag_service, mock_doc_processor, mock_storage):
+    mock_doc_processor.extract_text.return_value = "B" * 1000
+    
+    files = {"file": ("test.txt", b"file content", "text/plain")}
+    response = client.post("/upload", files=files, data={"chunk_size": "100", "chunk_overlap": "0"})
+    job = _wait_for_job(client, response.json()["job_id"])
+    
+    assert job["result"]["chunks_ingested"] == 10
+
+def test_upload_rejects_invalid_chunking(client):
+    files = {"file": ("test.txt", b"file content", "text/plain")}
+    response = client.post("/upload", files=files, data={"chunk_size": "100", "chunk_overlap": "100"})
+    
+    assert response.status_code == 422
+
+def test_upload_over_size_limit_is_rejected(client, mock_storage):
+    app.dependency_overrides[get_settings] = lambda: Settings(OPENAI_API_KEY="test", MAX_UPLOAD_BYTES=1000)
+    
+    response = client.post("/upload", files={"file": ("big.txt", b"x" * 2000, "text/plain")})
+    
+    assert response.status_code == 413
+    assert response.json()["error"]["code"] == "PAYLOAD_TOO_LARGE"
+    
+    # Without Content-Length the limit applies while the body streams in
+    body = b"--b\r\nContent-Disposition: form-data; name=\"file\"; filename=\"big.txt\"\r\n\r\n" + b"x" * 2000 + b"\r\n--b--\r\n"
+    response = client.post(
+        "/upload",
+        content=(body[i:i + 256] for i in range(0, len(body), 256)),
+        headers={"Content-Type": "multipart/form-data; boundary=b"},
+    )
+    
+    assert response.status_code == 413
+    mock_storage.upsert.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_upload_over_size_limit_closes_spooled_files():
+    spooled = []
+    
+    class RecordingFile(SpooledTemporaryFile):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            spooled.append(self)
+    
+    # The file part is complete when a later field pushes the body over the limit
+    body = (
+        b"--b\r\nContent-Disposition: form-data; name=\"file\"; filename=\"small.txt\"\r\n\r\n" + b"x" * 100
+        + b"\r\n--b\r\nContent-Disposition: form-data; name=\"chunk_strategy\"\r\n\r\n" + b"y" * 2000 + b"\r\n--b--\r\n"
+    )
+    
+    def request():
+        messages = [
+            {"type": "http.request", "body": body[i:i + 256], "more_body": i + 256 < len(body)}
+            for i in range(0, len(body), 256)
+        ]
+        
+        async def receive():
+            return messages.pop(0)
+        
+        return Request(
+            {"type": "http", "method": "POST", "headers": [(b"content-type", b"multipart/form-data; boundary=b")]},
+            receive,
+        )
+    
+    # Starlette before 1.6 closes the files it spooled only when the body
+    # stream raises MultiPartException, so the limit must raise one
+    with pytest.raises(MultiPartException):
+        async for _ in _limited_body(request(), 1000):
+            pass
+    with patch("starlette.formparsers.SpooledTemporaryFile", RecordingFile):
+        with pytest.raises(PayloadTooLargeError) as raised:
+            await _receive_upload(request(), max_bytes=1000)
+    
+    assert raised.value.details == {"max_bytes": 1000}
+    assert len(spooled) == 1 and spooled[0].closed
+
+def test_delete_source_and_list_documents(client, mock_storage):
+    response = client.delete("/documents/policies/hr.pdf")
+    
+    assert response.status_code == 200
+    assert response.json()["chunks_removed"] == 0
+    mock_storage.delete_where.assert_called_once_with({"source": "policies/hr.pdf"})
+    assert client.get("/documents").json() == []
+
+def test_clear_shard_of_unsharded_store_returns_404(client):
+    response = client.delete("/shards/0")
+    
+    assert response.status_code == 404
+    assert response.json()["error"]["code"] == "NOT_FOUND"
+
+def test_metrics_endpoint_reports_stage_timings(client, mock_llm, mock_storage):
+    mock_llm.generate_embeddings.return_value = [0.1, 0.2]
+    mock_llm.generate_answer.return_value = "Answer"
+    mock_storage.search.return_value = []
+    client.post("/chat", json={"message": "hello"})
+    
+    response = client.get("/metrics")
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    for stage in ("embed", "search", "generate"):
+        assert f'rag_stage_duration_seconds_count{{operation="query",stage="{stage}"}}' in body
+    assert 'http_request_duration_seconds_count{method="POST",route="/chat",status="200"} 1' in body
+    assert "rag_ingest_queue_depth 0" in body
@@ -0,0 +1,70 @@
+import pytest
+from src.core.priority import background_priority
+from src.adapters.cached_llm_adapter import CachedLLMAdapter
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "cache" / "embeddings.sqlite")
+
+@pytest.mark.asyncio
+async def test_cache_serves_repeats_from_memory(mock_llm, cache_path):
+    mock_llm.generate_embeddings_batch.side_effect = lambda texts: [[float(len(t))] for t in texts]
+    cache = CachedLLMAdapter(mock_llm, model="m", path=cache_path)
+    
+    first = await cache.generate_embeddings_batch(["a", "bb", "a"])
+    second = await cache.generate_embeddings("bb")
+    
+    assert first == [[1.0], [2.0], [1.0]]
+    assert second == [2.0]
+    # Duplicate texts within a batch are only sent upstream once
+    mock_llm.generate_embeddings_batch.assert_called_once_with(["a", "bb"])
+    assert cache.stats()["memory_hits"] == 1
+    assert cache.stats()["misses"] == 3
+
+@pytest.mark.asyncio
+async def test_cache_survives_restart_and_keys_on_model(mock_llm, cache_path):
+    mock_llm.generate_embeddings_batch.side_effect = lambda texts: [[0.5, 0.25] for _ in texts]
+    await CachedLLMAdapter(mock_llm, model="m", path=cache_path).close()
+    cache = CachedLLMAdapter(mock_llm, model="m", path=cache_path)
+    await cache.generate_embeddings("hello")
+    await cache.close()
+
+    restarted = CachedLLMAdapter(mock_llm, model="m", path=cache_path)
+    assert await restarted.generate_embeddings("hello") == [0.5, 0.25]
+    assert restarted.stats()["disk_hits"] == 1
+
+    other_model = CachedLLMAdapter(mock_llm, model="other", path=cache_path)
+    await other_model.generate_embeddings("hello")
+    assert other_model.stats()["misses"] == 1
+
+@pytest.mark.asyncio
+async def test_disk_tier_evicts_least_recently_used(mock_llm, cache_path):
+    mock_llm.generate_embeddings_batch.side_effect = lambda texts: [[1.0] * 4 for _ in texts]
+    # Each vector is 16 bytes; allow roughly three of them
+    cache = CachedLLMAdapter(mock_llm, model="m", path=cache_path, max_memory_bytes=16, max_disk_bytes=50)
+    
+    for text in ["a", "b", "c", "d"]:
+        await cache.generate_embeddings(text)
+    
+    assert cache.stats()["evictions"] >= 1
+    assert cache.stats()["disk_bytes"] <= 50
+
+@pytest.mark.asyncio
+async def test_memory_tier_is_bounded_by_bytes_and_skips_background_lookups(mock_llm, cache_path):
+    mock_llm.generate_embeddings_batch.side_effect = lambda texts: [[0.5] * 4 for _ in texts]
+    # Each vector is 16 bytes as float32; room for two of them
+    cache = CachedLLMAdapter(mock_llm, model="m", path=cache_path, max_memory_bytes=32)
+    
+    await cache.generate_embeddings_batch(["a", "b", "c"])
+    
+    assert cache.stats()["memory_items"] == 2
+    assert cache.stats()["memory_bytes"] == 32
+    
+    # Bulk ingestion runs under background priority and only fills the disk tier
+    with background_priority():
+        assert await cache.generate_embeddings_batch(["d", "a"]) == [[0.5] * 4, [0.5] * 4]
+    
+    assert cache.stats()["disk_hits"] == 1
+    assert cache.stats()["memory_items"] == 2
+    assert await cache.generate_embeddings("c") == [0.5] * 4
+    assert cache.stats()["memory_hits"] == 1
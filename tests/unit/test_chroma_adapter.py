@@ -0,0 +1,114 @@
+import asyncio
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from src.adapters.chroma_adapter import ChromaAdapter
+from src.config import Settings
+from src.core.domain import DocumentChunk, SearchQuery
+from src.core.metrics import VECTOR_STORE_PENDING
+
+@pytest.fixture
+def chroma(tmp_path):
+    return ChromaAdapter(Settings(
+        OPENAI_API_KEY="test",
+        CHROMA_PERSIST_DIRECTORY=str(tmp_path / "chroma"),
+        CHROMA_COLLECTION_NAME="test",
+        CHROMA_UPSERT_BATCH_SIZE=2,
+    ))
+
+def _chunk(i: int) -> DocumentChunk:
+    return DocumentChunk(id=f"c{i}", content=f"chunk {i}", metadata={"source": "doc.txt"}, embedding=[float(i), 1.0])
+
+@pytest.mark.asyncio
+async def test_upsert_is_split_into_batches_off_the_event_loop(chroma):
+    with patch.object(chroma._collection, "upsert", wraps=chroma._collection.upsert) as upsert:
+        await chroma.upsert([_chunk(i) for i in range(5)])
+    
+    assert [len(call.kwargs["ids"]) for call in upsert.call_args_list] == [2, 2, 1]
+    assert chroma._collection.count() == 5
+    assert chroma.pending_operations == {"read": 0, "write": 0}
+
+@pytest.mark.asyncio
+async def test_update_metadata_keeps_embeddings(chroma):
+    await chroma.upsert([_chunk(1)])
+    
+    await chroma.update_metadata([DocumentChunk(id="c1", content="chunk 1", metadata={"source": "doc.txt", "chunk_index": 7})])
+    results = await chroma.search(SearchQuery(query="q", embedding=[1.0, 1.0], top_k=1))
+    
+    assert results[0].chunk.metadata["chunk_index"] == 7
+    assert results[0].score == pytest.approx(0.0, abs=1e-6)
+
+@pytest.mark.asyncio
+async def test_search_and_clear_all(chroma):
+    await chroma.upsert([_chunk(i) for i in range(3)])
+    
+    results = await chroma.search(SearchQuery(query="q", embedding=[2.0, 1.0], top_k=1))
+    assert results[0].chunk.id == "c2"
+    
+    with patch.object(chroma._collection, "get", side_effect=AssertionError("clear_all must not load ids")):
+        await chroma.clear_all()
+    assert chroma._collection.count() == 0
+    
+    await chroma.upsert([_chunk(4)])
+    assert chroma._collection.count() == 1
+
+@pytest.mark.asyncio
+async def test_clear_all_waits_for_running_searches(chroma):
+    await chroma.upsert([_chunk(i) for i in range(3)])
+    started = threading.Event()
+    query = chroma._collection.query
+    
+    def slow_query(**kwargs):
+        started.set()
+        time.sleep(0.2)
+        return query(**kwargs)
+    
+    with patch.object(chroma._collection, "query", side_effect=slow_query):
+        search = asyncio.create_task(chroma.search(SearchQuery(query="q", embedding=[2.0, 1.0], top_k=1)))
+        await asyncio.to_thread(started.wait)
+        assert VECTOR_STORE_PENDING.value(backend="chroma", pool="read") == 1
+        await chroma.clear_all()
+    
+    assert (await search)[0].chunk.id == "c2"
+    assert await chroma.search(SearchQuery(query="q", embedding=[2.0, 1.0], top_k=1)) == []
+    assert VECTOR_STORE_PENDING.value(backend="chroma", pool="read") == 0
+
+@pytest.mark.asyncio
+async def test_delete_where_removes_matching_chunks(chroma):
+    await chroma.upsert([_chunk(1), DocumentChunk(id="other", content="x", metadata={"source": "other.txt"}, embedding=[0.0, 1.0])])
+    
+    await chroma.delete_where({"source": "doc.txt"})
+    
+    assert chroma._collection.get()["ids"] == ["other"]
+
+@pytest.mark.asyncio
+async def test_search_many_sends_one_query_per_filter(chroma):
+    await chroma.upsert([_chunk(i) for i in range(4)] + [
+        DocumentChunk(id="other", content="x", metadata={"source": "other.txt"}, embedding=[3.0, 1.5])
+    ])
+    queries = [
+        SearchQuery(query="a", embedding=[3.0, 1.5], top_k=1),
+        SearchQuery(query="b", embedding=[0.0, 1.0], top_k=2),
+        SearchQuery(query="c", embedding=[3.0, 1.5], top_k=1, filters={"source": "doc.txt"}),
+    ]
+    
+    with patch.object(chroma._collection, "query", wraps=chroma._collection.query) as query:
+        results = await chroma.search_many(queries)
+    
+    assert query.call_count == 2
+    assert [[r.chunk.id for r in found] for found in results] == [
+        [r.chunk.id for r in await chroma.search(q)] for q in queries
+    ]
+    assert [[r.chunk.id for r in found] for found in results] == [["other"], ["c0", "c1"], ["c3"]]
+
+@pytest.mark.asyncio
+async def test_warm_up_queries_a_stored_vector(chroma):
+    await chroma.warm_up()
+    await chroma.upsert([_chunk(1), _chunk(2)])
+    
+    with patch.object(chroma._collection, "query", wraps=chroma._collection.query) as query:
+        await chroma.warm_up()
+    
+    assert query.call_args.kwargs["n_results"] == 1
+    assert chroma.pending_operations == {"read": 0, "write": 0}
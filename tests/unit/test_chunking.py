@@ -0,0 +1,46 @@
+import pytest
+from src.core.chunking import CharacterChunker, RecursiveChunker, SentenceChunker, create_chunker
+from src.core.domain import ChunkingOptions
+
+def test_character_chunker():
+    text = "A" * 2500
+    chunks = CharacterChunker(chunk_size=1000, overlap=200).split(text)
+    
+    # Expected chunks:
+    # 1: 0-1000
+    # 2: 800-1800
+    # 3: 1600-2600 (stops at 2500)
+    # 4: 2400-3400 (stops at 2500)
+    assert len(chunks) == 4
+    assert len(chunks[0]) == 1000
+    assert len(chunks[3]) == 100
+
+def test_character_chunker_is_independent_of_segmentation():
+    text = "".join(chr(ord("a") + i % 26) for i in range(5000))
+    expected = CharacterChunker(chunk_size=300, overlap=50).split(text)
+    segments = [text[i:i + 7] for i in range(0, len(text), 7)]
+    
+    assert list(CharacterChunker(chunk_size=300, overlap=50).chunks(segments)) == expected
+
+@pytest.mark.parametrize("chunker_cls", [RecursiveChunker, SentenceChunker])
+def test_boundary_chunkers_cover_text_within_size(chunker_cls):
+    paragraph = "The policy applies to all staff. Remote work is allowed on Tuesdays! Ask HR? " * 20
+    text = "\n\n".join([paragraph] * 10)
+    segments = [text[i:i + 333] for i in range(0, len(text), 333)]
+    
+    chunks = list(chunker_cls(chunk_size=200, overlap=0).chunks(segments))
+    
+    assert all(len(chunk) <= 200 for chunk in chunks)
+    assert "".join(chunks).split() == text.split()
+
+def test_sentence_chunker_keeps_sentences_whole_and_overlaps():
+    text = "Hello there. How are you? I am fine! Thanks for asking. Bye now."
+    
+    chunks = SentenceChunker(chunk_size=60, overlap=20).split(text)
+    
+    assert chunks == ["Hello there. How are you? I am fine! Thanks for asking. ", "Thanks for asking. Bye now."]
+
+def test_create_chunker_and_options_validation():
+    assert isinstance(create_chunker(ChunkingOptions(strategy="recursive")), RecursiveChunker)
+    with pytest.raises(ValueError):
+        ChunkingOptions(chunk_size=100, overlap=100)
@@ -0,0 +1,50 @@
+from src.core.chunking import CharacterChunker, SentenceChunker
+from src.core.context import overlap_length, pack_context
+from src.core.domain import DocumentChunk
+from src.core.tokens import estimate_tokens
+
+TEXT = " ".join(f"Sentence number {i} of the handbook says something useful." for i in range(40))
+
+def _chunks(texts, source="doc.txt"):
+    return [
+        DocumentChunk(id=f"{source}_{i}", content=text, metadata={"source": source, "chunk_index": i})
+        for i, text in enumerate(texts)
+    ]
+
+def test_adjacent_chunks_are_merged_without_overlap():
+    for chunker in (CharacterChunker(chunk_size=300, overlap=80), SentenceChunker(chunk_size=300, overlap=80)):
+        chunks = _chunks(chunker.split(TEXT))
+        retrieved = [chunks[3], chunks[1], chunks[2]]
+        
+        context, sources, stats = pack_context(retrieved)
+        
+        assert len(context) == 1
+        # The merged passage is the original contiguous text, with no repeats
+        assert context[0].content in TEXT
+        assert context[0].content.startswith(chunks[1].content)
+        assert context[0].content.endswith(chunks[3].content)
+        assert context[0].metadata["chunk_index_end"] == 3
+        assert sources == retrieved
+        assert stats.tokens_saved > 0
+
+def test_passages_keep_retrieval_order_and_budget():
+    a = _chunks(["alpha " * 50, "beta " * 50], source="a.txt")
+    b = _chunks(["gamma " * 50], source="b.txt")
+    unindexed = DocumentChunk(id="raw", content="delta " * 50)
+    retrieved = [b[0], a[1], unindexed, a[0]]
+    
+    context, sources, stats = pack_context(retrieved)
+    assert [c.id for c in context] == ["b.txt_0", "a.txt_0", "raw"]
+    assert context[1].content == a[0].content + a[1].content
+    
+    budget = estimate_tokens(b[0].content) + 20
+    context, sources, stats = pack_context(retrieved, max_tokens=budget)
+    assert [c.id for c in context] == ["b.txt_0", "a.txt_0"]
+    assert stats.context_tokens <= budget
+    assert stats.truncated
+    assert [c.id for c in sources] == ["b.txt_0", "a.txt_1", "a.txt_0"]
+    assert stats.dropped_chunks == 1
+
+def test_short_coincidental_overlap_is_not_removed():
+    assert overlap_length("ends with the", "the start") == 0
+    assert overlap_length("x" * 10 + "shared tail of twenty chars", "shared tail of twenty chars and more") == 27
@@ -0,0 +1,69 @@
+import io
+import pytest
+from src.adapters import document_processor_adapter
+from src.adapters.document_processor_adapter import LocalDocumentProcessor
+
+def _make_pdf(pages: list[str]) -> bytes:
+    """Builds a minimal PDF with one line of Helvetica text per page."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream.decode()}\nendstream")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(pages)} >>"
+
+    out = io.BytesIO(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n{body}\nendobj\n".encode())
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return out.getvalue()
+
+async def _collect(processor, data: bytes, filename: str) -> list[str]:
+    return [page async for page in processor.extract_pages(io.BytesIO(data), filename)]
+
+@pytest.mark.asyncio
+async def test_parallel_pdf_pages_are_yielded_in_order():
+    texts = [f"Page number {i}" for i in range(7)]
+    data = _make_pdf(texts)
+    processor = LocalDocumentProcessor(pdf_workers=2, pages_per_task=2)
+    try:
+        pages = await _collect(processor, data, "doc.pdf")
+    finally:
+        processor.close()
+    
+    assert [page.strip() for page in pages] == texts
+    # Streaming and whole-document extraction agree
+    assert "".join(pages) == processor.extract_text(io.BytesIO(data), "doc.pdf")
+
+@pytest.mark.asyncio
+async def test_sequential_mode_and_txt():
+    processor = LocalDocumentProcessor(pdf_workers=1)
+    
+    pages = await _collect(processor, _make_pdf(["One", "Two"]), "doc.PDF")
+    assert [page.strip() for page in pages] == ["One", "Two"]
+    assert await _collect(processor, "héllo".encode("utf-8"), "notes.txt") == ["héllo"]
+    
+    with pytest.raises(ValueError):
+        await _collect(processor, b"", "image.png")
+
+@pytest.mark.asyncio
+async def test_text_is_read_in_blocks(monkeypatch):
+    monkeypatch.setattr(document_processor_adapter, "TEXT_BLOCK_BYTES", 4)
+    text = "héllo wörld ünïcode"
+    
+    blocks = await _collect(LocalDocumentProcessor(), text.encode("utf-8"), "notes.txt")
+    
+    # Multi-byte characters split across blocks are decoded intact
+    assert len(blocks) > 1
+    assert "".join(blocks) == text
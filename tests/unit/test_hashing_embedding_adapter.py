@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from src.adapters.hashing_embedding_adapter import HashingEmbeddingAdapter
+from src.ports.llm import LLMPort
+
+@pytest.fixture
+def adapter():
+    inner = MagicMock(spec=LLMPort)
+    inner.generate_answer = AsyncMock(return_value="answer")
+    return HashingEmbeddingAdapter(inner, dim=256)
+
+@pytest.mark.asyncio
+async def test_embeddings_are_normalized_and_deterministic(adapter):
+    texts = ["Remote work is allowed two days a week.", "", "Expense reports are due monthly."] * 30
+    
+    batch = await adapter.generate_embeddings_batch(texts)
+    single = await HashingEmbeddingAdapter(adapter._inner, dim=256).generate_embeddings(texts[0])
+    
+    assert batch.shape == (90, 256) and batch.dtype == single.dtype == np.float32
+    assert np.allclose(batch[0], single)
+    assert np.linalg.norm(batch[0]) == pytest.approx(1.0, abs=1e-5)
+    assert not any(batch[1])
+
+@pytest.mark.asyncio
+async def test_similarity_follows_shared_words(adapter):
+    query, related, unrelated = await adapter.generate_embeddings_batch([
+        "How many days can I work remotely?",
+        "Employees can work remotely up to two days per week.",
+        "The cafeteria serves lunch from noon.",
+    ])
+    
+    assert np.dot(query, related) > np.dot(query, unrelated)
+
+@pytest.mark.asyncio
+async def test_answers_are_generated_by_the_inner_port(adapter):
+    assert await adapter.generate_answer("q", []) == "answer"
+    adapter._inner.generate_answer.assert_awaited_once_with("q", [])
@@ -0,0 +1,63 @@
+import asyncio
+import pytest
+from src.core.ingestion_jobs import IngestionJobManager
+from src.core.exceptions import EntityNotFoundError, ServiceBusyError
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_new_jobs():
+    manager = IngestionJobManager(max_queue_size=1, workers=1)
+    manager.start()
+    release = asyncio.Event()
+
+    async def blocked(job):
+        await release.wait()
+        return {}
+
+    running = manager.submit("a.txt", blocked)
+    await asyncio.sleep(0)  # let the worker pick up the first job
+    queued = manager.submit("b.txt", blocked)
+    
+    with pytest.raises(ServiceBusyError):
+        manager.submit("c.txt", blocked)
+    
+    release.set()
+    await asyncio.sleep(0.01)
+    assert manager.get(running.id).status == "completed"
+    assert manager.get(queued.id).status == "completed"
+    await manager.stop()
+
+@pytest.mark.asyncio
+async def test_stop_fails_running_and_queued_jobs():
+    manager = IngestionJobManager(max_queue_size=2, workers=1)
+    manager.start()
+
+    async def blocked(job):
+        await asyncio.Event().wait()
+
+    running = manager.submit("a.txt", blocked)
+    await asyncio.sleep(0)
+    queued = manager.submit("b.txt", blocked)
+    
+    await manager.stop()
+    
+    for job in (running, queued):
+        assert job.status == "failed"
+        assert job.error == "Cancelled at shutdown"
+        assert job.finished_at is not None
+
+@pytest.mark.asyncio
+async def test_only_the_newest_finished_jobs_are_kept():
+    manager = IngestionJobManager(workers=1, max_finished_jobs=2)
+    manager.start()
+
+    async def done(job):
+        return {}
+
+    jobs = [manager.submit(f"{i}.txt", done) for i in range(4)]
+    await asyncio.sleep(0.01)
+    
+    for job in jobs[:2]:
+        with pytest.raises(EntityNotFoundError):
+            manager.get(job.id)
+    assert [manager.get(job.id).status for job in jobs[2:]] == ["completed", "completed"]
+    await manager.stop()
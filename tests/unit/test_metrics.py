@@ -0,0 +1,45 @@
+from src.core.metrics import Counter, Histogram, MetricsRegistry, StageTimer, STAGE_DURATION
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, stage="embed")
+    
+    lines = registry.render().splitlines()
+    
+    assert lines[:2] == ["# HELP latency_seconds Latency", "# TYPE latency_seconds histogram"]
+    assert 'latency_seconds_bucket{stage="embed",le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{stage="embed",le="1"} 3' in lines
+    assert 'latency_seconds_bucket{stage="embed",le="+Inf"} 4' in lines
+    assert 'latency_seconds_sum{stage="embed"} 3.65' in lines
+    assert 'latency_seconds_count{stage="embed"} 4' in lines
+
+def test_counter_escapes_label_values():
+    counter = Counter("errors_total", "Errors", ("reason",))
+    counter.inc(reason='bad "quote"\n')
+    counter.inc(2, reason='bad "quote"\n')
+    
+    assert counter.render()[-1] == 'errors_total{reason="bad \\"quote\\"\\n"} 3'
+
+def test_configure_replaces_default_buckets_only():
+    registry = MetricsRegistry()
+    default = registry.histogram("a_seconds", "A")
+    fixed = registry.histogram("b_seconds", "B", buckets=(1.0,))
+    default.observe(0.2)
+    
+    registry.configure(latency_buckets=[0.5, 0.1])
+    
+    assert default.buckets == (0.1, 0.5)
+    assert default.count() == 0
+    assert fixed.buckets == (1.0,)
+
+def test_stage_timer_records_and_accumulates():
+    before = STAGE_DURATION.count(operation="test", stage="search")
+    timer = StageTimer("test")
+    with timer.stage("search"):
+        pass
+    timer.record("search", 0.25)
+    
+    assert STAGE_DURATION.count(operation="test", stage="search") == before + 2
+    assert timer.timings_ms()["search"] >= 250.0
@@ -0,0 +1,88 @@
+import asyncio
+import pytest
+from src.adapters.batching_llm_adapter import BatchingLLMAdapter
+from src.core.micro_batcher import MicroBatcher
+
+@pytest.mark.asyncio
+async def test_concurrent_items_are_sent_as_one_batch():
+    calls = []
+    
+    async def square(items):
+        calls.append(list(items))
+        return [i * i for i in items]
+    
+    batcher = MicroBatcher(square, max_size=10, max_wait_ms=5)
+    
+    results = await asyncio.gather(*(batcher.submit(i) for i in range(4)))
+    
+    assert results == [0, 1, 4, 9]
+    assert calls == [[0, 1, 2, 3]]
+    assert batcher.stats()["mean_batch_size"] == 4
+
+@pytest.mark.asyncio
+async def test_full_batches_are_sent_without_waiting():
+    calls = []
+    
+    async def echo(items):
+        calls.append(list(items))
+        return items
+    
+    batcher = MicroBatcher(echo, max_size=2, max_wait_ms=10_000)
+    
+    results = await asyncio.wait_for(asyncio.gather(*(batcher.submit(i) for i in range(4))), 1)
+    
+    assert results == [0, 1, 2, 3]
+    assert calls == [[0, 1], [2, 3]]
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_caller_in_the_batch():
+    async def fail(items):
+        raise RuntimeError("rate limited")
+    
+    batcher = MicroBatcher(fail, max_size=10, max_wait_ms=1)
+    
+    results = await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+    
+    assert [type(r) for r in results] == [RuntimeError, RuntimeError]
+
+@pytest.mark.asyncio
+async def test_missing_results_fail_the_batch_instead_of_hanging():
+    async def drop_last(items):
+        return items[:-1]
+    
+    batcher = MicroBatcher(drop_last, max_size=10, max_wait_ms=1)
+    
+    results = await asyncio.wait_for(
+        asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True), 1
+    )
+    
+    assert [type(r) for r in results] == [RuntimeError, RuntimeError]
+    assert "1 results for 2 items" in str(results[1])
+
+@pytest.mark.asyncio
+async def test_cancelled_callers_are_dropped_from_the_batch():
+    calls = []
+    
+    async def echo(items):
+        calls.append(list(items))
+        return items
+    
+    batcher = MicroBatcher(echo, max_size=10, max_wait_ms=5)
+    cancelled = asyncio.create_task(batcher.submit("gone"))
+    kept = asyncio.create_task(batcher.submit("kept"))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    
+    assert await kept == "kept"
+    assert calls == [["kept"]]
+
+@pytest.mark.asyncio
+async def test_batching_adapter_batches_query_embeddings(mock_llm):
+    mock_llm.generate_embeddings_batch.side_effect = lambda texts: [[float(len(t))] for t in texts]
+    adapter = BatchingLLMAdapter(mock_llm, max_batch_size=8, max_wait_ms=5)
+    
+    results = await asyncio.gather(adapter.generate_embeddings("a"), adapter.generate_embeddings("bb"))
+    
+    assert results == [[1.0], [2.0]]
+    mock_llm.generate_embeddings_batch.assert_awaited_once_with(["a", "bb"])
+    mock_llm.generate_embeddings.assert_not_called()
@@ -0,0 +1,207 @@
+import numpy as np
+import pytest
+from structlog.testing import capture_logs
+from src.adapters.numpy_adapter import NumpyAdapter
+from src.adapters.quantization import int8_scores, quantize_int8
+from src.config import Settings
+from src.core.domain import DocumentChunk, SearchQuery
+from src.core.exceptions import InvalidFilterError
+
+def _settings(path, threshold=0.9, quantization="none"):
+    return Settings(
+        OPENAI_API_KEY="test",
+        NUMPY_STORE_DIRECTORY=str(path),
+        NUMPY_STORE_COMPACTION_THRESHOLD=threshold,
+        NUMPY_STORE_QUANTIZATION=quantization,
+    )
+
+def _chunk(chunk_id, embedding, source="doc.txt"):
+    return DocumentChunk(id=chunk_id, content=f"content {chunk_id}", metadata={"source": source}, embedding=embedding)
+
+async def _ids(store, embedding, top_k=3, filters=None):
+    results = await store.search(SearchQuery(query="q", embedding=embedding, top_k=top_k, filters=filters))
+    return [r.chunk.id for r in results]
+
+@pytest.mark.asyncio
+async def test_search_ranks_by_cosine_and_filters(tmp_path):
+    store = NumpyAdapter(_settings(tmp_path))
+    await store.upsert([
+        _chunk("a", [1.0, 0.0]),
+        _chunk("b", [0.7, 0.7], source="other.txt"),
+        _chunk("c", [0.0, 1.0]),
+    ])
+    
+    results = await store.search(SearchQuery(query="q", embedding=[2.0, 0.1], top_k=2))
+    assert [r.chunk.id for r in results] == ["a", "b"]
+    assert results[0].score < results[1].score
+    assert results[0].chunk.metadata == {"source": "doc.txt"}
+    assert await _ids(store, [1.0, 0.0], filters={"source": "other.txt"}) == ["b"]
+    assert await _ids(store, [1.0, 0.0], filters={"$and": [{"source": {"$eq": "doc.txt"}}]}) == ["a", "c"]
+    
+    await store.delete_where({"source": "doc.txt"})
+    assert await _ids(store, [1.0, 0.0]) == ["b"]
+
+@pytest.mark.asyncio
+async def test_empty_operator_lists_are_rejected(tmp_path):
+    store = NumpyAdapter(_settings(tmp_path))
+    await store.upsert([_chunk("a", [1.0, 0.0]), _chunk("b", [0.0, 1.0])])
+    
+    with pytest.raises(ValueError, match=r"\$and"):
+        await _ids(store, [1.0, 0.0], filters={"$and": []})
+    with pytest.raises(ValueError, match=r"\$and"):
+        await store.delete_where({"$and": []})
+    # Filters that only nest empty filters match everything, like {}
+    assert await _ids(store, [1.0, 0.0], filters={"$and": [{}]}) == ["a", "b"]
+    with pytest.raises(ValueError, match="at least one filter"):
+        await store.delete_where({"$and": [{}]})
+
+@pytest.mark.asyncio
+async def test_unsupported_operators_are_rejected(tmp_path):
+    store = NumpyAdapter(_settings(tmp_path))
+    await store.upsert([_chunk("a", [1.0, 0.0])])
+    
+    for filters in ({"$or": [{"source": "doc.txt"}]}, {"$and": [{"source": {"$ne": "doc.txt"}}]}):
+        with pytest.raises(InvalidFilterError, match="Unsupported filter operator"):
+            await _ids(store, [1.0, 0.0], filters=filters)
+        with pytest.raises(InvalidFilterError, match="Unsupported filter operator"):
+            await store.delete_where(filters)
+    assert await _ids(store, [1.0, 0.0]) == ["a"]
+
+@pytest.mark.asyncio
+async def test_search_many_matches_single_searches(tmp_path):
+    store = NumpyAdapter(_settings(tmp_path))
+    await store.upsert([
+        _chunk("a", [1.0, 0.0]),
+        _chunk("b", [0.7, 0.7], source="other.txt"),
+        _chunk("c", [0.0, 1.0]),
+    ])
+    await store.delete(["c"])
+    queries = [
+        SearchQuery(query="q", embedding=[0.1, 1.0], top_k=3),
+        SearchQuery(query="q", embedding=[1.0, 0.0], top_k=1),
+        SearchQuery(query="q", embedding=[1.0, 0.0], top_k=3, filters={"source": "other.txt"}),
+    ]
+    
+    results = await store.search_many(queries)
+    
+    assert [[r.chunk.id for r in found] for found in results] == [["b", "a"], ["a"], ["b"]]
+    assert results[0][0].score == pytest.approx((await store.search(queries[0]))[0].score)
+
+@pytest.mark.asyncio
+async def test_replace_delete_and_reopen(tmp_path):
+    store = NumpyAdapter(_settings(tmp_path))
+    await store.upsert([_chunk("a", [1.0, 0.0]), _chunk("b", [0.0, 1.0])])
+    # Re-upserting an id replaces it
+    await store.upsert([_chunk("a", [0.0, 1.0])])
+    await store.delete(["b"])
+    
+    assert await _ids(store, [0.0, 1.0]) == ["a"]
+    
+    await store.update_metadata([DocumentChunk(id="a", content="", metadata={"source": "moved.txt"})])
+    assert await _ids(store, [0.0, 1.0], filters={"source": "moved.txt"}) == ["a"]
+    
+    reopened = NumpyAdapter(_settings(tmp_path))
+    assert await _ids(reopened, [0.0, 1.0]) == ["a"]
+    assert reopened.tombstone_ratio == pytest.approx(2 / 3)
+
+@pytest.mark.asyncio
+async def test_compaction_drops_tombstones(tmp_path):
+    store = NumpyAdapter(_settings(tmp_path, threshold=0.5))
+    await store.upsert([_chunk(str(i), [1.0, float(i)]) for i in range(10)])
+    await store.delete([str(i) for i in range(6)])
+    await store._compaction
+    
+    assert store.tombstone_ratio == 0.0
+    assert await _ids(store, [1.0, 9.0], top_k=10) == ["9", "8", "7", "6"]
+    assert await _ids(NumpyAdapter(_settings(tmp_path)), [1.0, 9.0], top_k=1) == ["9"]
+    
+    await store.clear_all()
+    assert await _ids(store, [1.0, 0.0]) == []
+
+@pytest.mark.asyncio
+async def test_searches_run_while_a_write_is_in_progress(tmp_path):
+    store = NumpyAdapter(_settings(tmp_path))
+    await store.upsert([_chunk("a", [1.0, 0.0]), _chunk("b", [0.0, 1.0])])
+    
+    # A writer or compaction preparing its changes does not block searches
+    with store._lock.reserve():
+        assert await _ids(store, [1.0, 0.0]) == ["a", "b"]
+
+@pytest.mark.asyncio
+async def test_failed_upsert_leaves_the_store_unchanged(tmp_path):
+    store = NumpyAdapter(_settings(tmp_path))
+    await store.upsert([_chunk("a", [1.0, 0.0])])
+    unserializable = DocumentChunk(id="a", content="", metadata={"source": object()}, embedding=[0.0, 1.0])
+    
+    with pytest.raises(TypeError):
+        await store.upsert([unserializable])
+    await store.upsert([_chunk("b", [0.0, 1.0])])
+    
+    # The replaced row was not tombstoned, in memory or by the next commit
+    assert await _ids(store, [1.0, 0.0]) == ["a", "b"]
+    assert await _ids(NumpyAdapter(_settings(tmp_path)), [1.0, 0.0]) == ["a", "b"]
+
+@pytest.mark.asyncio
+async def test_failed_background_compaction_is_logged(tmp_path):
+    store = NumpyAdapter(_settings(tmp_path, threshold=0.5))
+    await store.upsert([_chunk("a", [1.0, 0.0]), _chunk("b", [0.0, 1.0])])
+    
+    def fail() -> None:
+        raise OSError("disk full")
+    
+    store.compact = fail
+    with capture_logs() as logs:
+        await store.delete(["a"])
+        with pytest.raises(OSError):
+            await store._compaction
+    
+    assert {"event": "numpy_store_compaction_failed", "error": "disk full", "log_level": "error"} in logs
+    assert await _ids(store, [1.0, 0.0]) == ["b"]
+
+def test_store_refuses_a_different_embedding_model(tmp_path):
+    NumpyAdapter(_settings(tmp_path))
+    
+    with pytest.raises(ValueError, match="openai:text-embedding-3-small"):
+        NumpyAdapter(_settings(tmp_path).model_copy(update={"EMBEDDING_BACKEND": "hashing"}))
+
+def test_int8_scores_approximate_inner_products():
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((100, 64)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    query = vectors[0]
+    
+    codes, scales = quantize_int8(vectors)
+    
+    assert codes.dtype == np.int8
+    np.testing.assert_allclose(int8_scores(codes, scales, query), vectors @ query, atol=0.01)
+
+@pytest.mark.asyncio
+async def test_int8_search_matches_exact_search(tmp_path):
+    rng = np.random.default_rng(1)
+    vectors = rng.standard_normal((200, 32)).tolist()
+    chunks = [_chunk(str(i), vector) for i, vector in enumerate(vectors)]
+    exact = NumpyAdapter(_settings(tmp_path / "exact"))
+    quantized = NumpyAdapter(_settings(tmp_path / "int8", quantization="int8"))
+    await exact.upsert(chunks)
+    await quantized.upsert(chunks)
+    
+    for query in rng.standard_normal((5, 32)).tolist():
+        expected = await exact.search(SearchQuery(query="q", embedding=query, top_k=5))
+        results = await quantized.search(SearchQuery(query="q", embedding=query, top_k=5))
+        assert [r.chunk.id for r in results] == [r.chunk.id for r in expected]
+        # Re-ranked scores come from the float32 vectors
+        assert [r.score for r in results] == pytest.approx([r.score for r in expected])
+
+@pytest.mark.asyncio
+async def test_enabling_int8_on_existing_store_builds_codes(tmp_path):
+    store = NumpyAdapter(_settings(tmp_path))
+    await store.upsert([_chunk("a", [1.0, 0.0]), _chunk("b", [0.0, 1.0])])
+    
+    quantized = NumpyAdapter(_settings(tmp_path, quantization="int8"))
+    await quantized.upsert([_chunk("c", [0.6, 0.8])])
+    
+    assert (tmp_path / "codes.0.i8").exists()
+    assert await _ids(quantized, [0.0, 1.0]) == ["b", "c", "a"]
+    # Switching it off again drops the codes, which would otherwise go stale
+    NumpyAdapter(_settings(tmp_path))
+    assert not (tmp_path / "codes.0.i8").exists()
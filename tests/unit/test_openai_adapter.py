@@ -0,0 +1,104 @@
+import asyncio
+import httpx
+import openai
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+from src.adapters.openai_adapter import OpenAIAdapter, _pack_batches
+from src.config import Settings
+from src.core.metrics import LLM_RATE_LIMITED
+
+def test_pack_batches_respects_token_and_input_limits():
+    texts = ["a" * 400] * 5  # ~101 tokens each
+    
+    assert _pack_batches(texts, max_tokens=250, max_inputs=10) == [[0, 1], [2, 3], [4]]
+    assert _pack_batches(texts, max_tokens=10_000, max_inputs=3) == [[0, 1, 2], [3, 4]]
+    # A single oversized text still gets its own batch
+    assert _pack_batches(["a" * 4000], max_tokens=10, max_inputs=10) == [[0]]
+
+@pytest.mark.asyncio
+async def test_generate_embeddings_batch_preserves_input_order():
+    adapter = OpenAIAdapter(Settings(
+        OPENAI_API_KEY="test",
+        EMBEDDING_BATCH_MAX_INPUTS=2,
+        EMBEDDING_MAX_CONCURRENT_BATCHES=2,
+    ))
+
+    async def fake_create(input, model):
+        # Return items out of order to make sure the adapter re-sorts them
+        data = [SimpleNamespace(index=i, embedding=[float(len(t))]) for i, t in enumerate(input)]
+        return SimpleNamespace(data=list(reversed(data)))
+
+    adapter._client = SimpleNamespace(embeddings=SimpleNamespace(create=AsyncMock(side_effect=fake_create)))
+    
+    texts = ["a", "bb", "ccc", "dddd", "eeeee"]
+    embeddings = await adapter.generate_embeddings_batch(texts)
+    
+    assert embeddings == [[1.0], [2.0], [3.0], [4.0], [5.0]]
+    assert adapter._client.embeddings.create.call_count == 3
+
+def _fake_openai(responses):
+    """In-process fake of the OpenAI HTTP API that replays `responses` in order."""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return responses[min(len(requests), len(responses)) - 1]
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler)), requests
+
+def _embedding_response(*vectors):
+    return httpx.Response(200, json={
+        "object": "list",
+        "model": "text-embedding-3-small",
+        "data": [{"object": "embedding", "index": i, "embedding": v} for i, v in enumerate(vectors)],
+        "usage": {"prompt_tokens": 1, "total_tokens": 1},
+    })
+
+@pytest.mark.asyncio
+async def test_rate_limited_request_waits_for_retry_after():
+    http_client, requests = _fake_openai([
+        httpx.Response(429, headers={"retry-after-ms": "50"}, json={"error": {"message": "Rate limit reached"}}),
+        _embedding_response([0.5, 0.5]),
+    ])
+    adapter = OpenAIAdapter(Settings(OPENAI_API_KEY="test", OPENAI_BASE_URL="http://fake/v1"), http_client=http_client)
+    rate_limited = LLM_RATE_LIMITED.value(operation="embeddings")
+    
+    started = asyncio.get_running_loop().time()
+    embedding = await adapter.generate_embeddings("hello")
+    
+    assert embedding == [0.5, 0.5]
+    assert len(requests) == 2
+    assert asyncio.get_running_loop().time() - started >= 0.045
+    assert LLM_RATE_LIMITED.value(operation="embeddings") == rate_limited + 1
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried():
+    http_client, requests = _fake_openai([httpx.Response(400, json={"error": {"message": "Bad input"}})])
+    adapter = OpenAIAdapter(Settings(OPENAI_API_KEY="test", OPENAI_BASE_URL="http://fake/v1"), http_client=http_client)
+    
+    with pytest.raises(openai.BadRequestError):
+        await adapter.generate_embeddings("hello")
+    assert len(requests) == 1
+
+@pytest.mark.asyncio
+async def test_warm_up_failures_are_only_logged():
+    http_client, requests = _fake_openai([
+        httpx.Response(200, json={"id": "gpt-4o", "object": "model", "created": 0, "owned_by": "openai"}),
+        httpx.Response(401, json={"error": {"message": "Invalid key"}}),
+    ])
+    adapter = OpenAIAdapter(Settings(OPENAI_API_KEY="test", OPENAI_BASE_URL="http://fake/v1"), http_client=http_client)
+    
+    await adapter.warm_up()
+    await adapter.warm_up()
+    
+    assert [request.url.path for request in requests] == ["/v1/models/gpt-4o"] * 2
+
+@pytest.mark.asyncio
+async def test_close_closes_the_http_client():
+    http_client, _ = _fake_openai([])
+    adapter = OpenAIAdapter(Settings(OPENAI_API_KEY="test", OPENAI_BASE_URL="http://fake/v1"), http_client=http_client)
+    
+    await adapter.close()
+    
+    assert http_client.is_closed
@@ -1,21 +1,27 @@
+import asyncio
 import pytest
 from unittest.mock import MagicMock, patch
-from src.core.domain import DocumentChunk, SearchResult, LLMResponse
+from src.adapters.sqlite_manifest_adapter import SqliteManifestAdapter
+from src.core.answer_cache import SemanticAnswerCache
+from src.core.domain import ChunkingOptions, DocumentChunk, IngestionProgress, SearchResult, LLMResponse
 from src.core.exceptions import ExternalServiceError
+from src.core.keyed_lock import KeyedLock
+from src.core.rag_service import RAGService, chunk_id_for
+from src.core.singleflight import SingleFlight
 
-@pytest.mark.asyncio
-async def test_chunk_text(rag_service):
-    text = "A" * 2500
-    chunks = rag_service._chunk_text(text, chunk_size=1000, overlap=200)
-    
-    # Expected chunks:
-    # 1: 0-1000
-    # 2: 800-1800
-    # 3: 1600-2600 (stops at 2500)
-    # 4: 2400-3400 (stops at 2500)
-    assert len(chunks) == 4
-    assert len(chunks[0]) == 1000
-    assert len(chunks[3]) == 100
+# Fixed ten-character chunks, so tests can spell out chunk contents
+TEN_CHARS = ChunkingOptions(chunk_size=10, overlap=0)
+
+@pytest.fixture
+def make_service(mock_storage, mock_llm, mock_doc_processor):
+    """Builds services on the shared mocks with extra options, e.g. a manifest or answer cache."""
+    def make(**options) -> RAGService:
+        return RAGService(storage=mock_storage, llm=mock_llm, doc_processor=mock_doc_processor, **options)
+    return make
+
+@pytest.fixture
+def manifest(tmp_path):
+    return SqliteManifestAdapter(str(tmp_path / "manifest.sqlite"))
 
 @pytest.mark.asyncio
 async def test_process_file_upload(rag_service, mock_doc_processor, mock_llm, mock_storage):
@@ -25,11 +31,11 @@ async def test_process_file_upload(rag_service, mock_doc_processor, mock_llm, mo
     filename = "test.txt"
     file_content = b"fake content"
     
-    count = await rag_service.process_file_upload(file_content, filename)
+    result = await rag_service.process_file_upload(file_content, filename)
     
-    assert count == 1
+    assert result.chunks_ingested == 1
     mock_doc_processor.extract_text.assert_called_once()
-    mock_llm.generate_embeddings.assert_called_once()
+    mock_llm.generate_embeddings_batch.assert_called_once()
     mock_storage.upsert.assert_called_once()
 
 @pytest.mark.asyncio
@@ -48,6 +54,21 @@ async def test_answer_query_success(rag_service, mock_llm, mock_storage):
     assert len(response.sources) == 1
     assert response.sources[0].content == "Policy details"
 
+@pytest.mark.asyncio
+async def test_answer_query_merges_adjacent_chunks_in_prompt(rag_service, mock_llm, mock_storage):
+    mock_llm.generate_embeddings.return_value = [0.1, 0.2]
+    overlap = "shared sentence between the two chunks. "
+    first = DocumentChunk(id="a", content="Opening text. " + overlap, metadata={"source": "doc", "chunk_index": 0})
+    second = DocumentChunk(id="b", content=overlap + "Closing text.", metadata={"source": "doc", "chunk_index": 1})
+    mock_storage.search.return_value = [SearchResult(chunk=second, score=0.1), SearchResult(chunk=first, score=0.2)]
+    mock_llm.generate_answer.return_value = "Answer"
+    
+    response = await rag_service.answer_query("question")
+    
+    context = mock_llm.generate_answer.call_args.args[1]
+    assert [c.content for c in context] == ["Opening text. " + overlap + "Closing text."]
+    assert [c.id for c in response.sources] == ["b", "a"]
+
 @pytest.mark.asyncio
 async def test_answer_query_no_results(rag_service, mock_llm, mock_storage):
     mock_llm.generate_embeddings.return_value = [0.1]
@@ -68,3 +89,344 @@ async def test_answer_query_error(rag_service, mock_llm):
     
     assert "Failed to process RAG query" in str(exc_info.value)
     assert "API Down" in str(exc_info.value.details["original_error"])
+
+@pytest.mark.asyncio
+async def test_ingest_documents_embeds_in_one_batch(rag_service, mock_llm, mock_storage):
+    mock_llm.generate_embeddings_batch.side_effect = lambda texts: [[float(len(t))] for t in texts]
+    chunks = [
+        DocumentChunk(id="a", content="x"),
+        DocumentChunk(id="b", content="yy", embedding=[9.0]),
+        DocumentChunk(id="c", content="zzz"),
+    ]
+    
+    await rag_service.ingest_documents(chunks)
+    
+    mock_llm.generate_embeddings_batch.assert_called_once_with(["x", "zzz"])
+    assert [c.embedding.tolist() for c in chunks] == [[1.0], [9.0], [3.0]]
+    mock_storage.upsert.assert_called_once_with(chunks)
+
+@pytest.mark.asyncio
+async def test_answer_queries_embeds_and_searches_once(rag_service, mock_llm, mock_storage):
+    mock_llm.generate_embeddings_batch.side_effect = lambda texts: [[float(len(t))] for t in texts]
+    mock_storage.search_many.side_effect = lambda queries: [
+        [SearchResult(chunk=DocumentChunk(id=q.query, content=q.query), score=0.1)] for q in queries
+    ]
+    
+    async def generate_answer(query, chunks):
+        if query == "b":
+            raise Exception("API Down")
+        return f"answer {query}"
+    
+    mock_llm.generate_answer.side_effect = generate_answer
+    
+    answers = await rag_service.answer_queries(["a", "b", "c"], max_concurrency=2)
+    
+    mock_llm.generate_embeddings_batch.assert_called_once_with(["a", "b", "c"])
+    mock_storage.search_many.assert_called_once()
+    mock_storage.search.assert_not_called()
+    assert [(a.question, a.answer, a.error) for a in answers] == [
+        ("a", "answer a", None), ("b", None, "API Down"), ("c", "answer c", None)
+    ]
+    assert answers[2].sources[0].id == "c"
+
+@pytest.mark.asyncio
+async def test_answer_cache_serves_similar_queries_until_sources_change(make_service, mock_storage, mock_llm):
+    service = make_service(answer_cache=SemanticAnswerCache(threshold=0.9))
+    chunk = DocumentChunk(id="hr_1", content="Remote on Tuesdays", metadata={"source": "hr.pdf"})
+    mock_storage.search.return_value = [SearchResult(chunk=chunk, score=0.1)]
+    mock_llm.generate_answer.return_value = "Tuesdays."
+    
+    mock_llm.generate_embeddings.return_value = [1.0, 0.0]
+    await service.answer_query("When can I work from home?")
+    # A paraphrase with a nearly identical embedding is served from the cache
+    mock_llm.generate_embeddings.return_value = [0.99, 0.05]
+    cached = await service.answer_query("When may I work remotely?")
+    
+    assert cached.answer == "Tuesdays."
+    assert mock_llm.generate_answer.call_count == 1
+    
+    # Re-ingesting the source the answer was built from invalidates the entry
+    mock_llm.generate_embeddings_batch.side_effect = lambda texts: [[0.0, 1.0] for _ in texts]
+    await service.ingest_documents([DocumentChunk(id="hr_2", content="x", metadata={"source": "hr.pdf"})])
+    await service.answer_query("When may I work remotely?")
+    
+    assert mock_llm.generate_answer.call_count == 2
+
+@pytest.mark.asyncio
+async def test_answer_is_not_cached_if_sources_change_while_answering(make_service, mock_storage, mock_llm):
+    service = make_service(answer_cache=SemanticAnswerCache(threshold=0.9))
+    chunk = DocumentChunk(id="hr_1", content="Remote on Tuesdays", metadata={"source": "hr.pdf"})
+    mock_storage.search.return_value = [SearchResult(chunk=chunk, score=0.1)]
+    mock_llm.generate_embeddings.return_value = [1.0, 0.0]
+    mock_llm.generate_embeddings_batch.side_effect = lambda texts: [[0.0, 1.0] for _ in texts]
+    
+    async def generate_during_ingest(query, context):
+        # The source is re-ingested after the search, before the answer is stored
+        await service.ingest_documents([DocumentChunk(id="hr_2", content="x", metadata={"source": "hr.pdf"})])
+        return "Tuesdays."
+    
+    mock_llm.generate_answer.side_effect = generate_during_ingest
+    await service.answer_query("When can I work from home?")
+    mock_llm.generate_answer.side_effect = None
+    mock_llm.generate_answer.return_value = "Tuesdays and Fridays."
+    
+    assert (await service.answer_query("When can I work from home?")).answer == "Tuesdays and Fridays."
+
+@pytest.mark.asyncio
+async def test_answer_is_cached_if_unrelated_sources_change_while_answering(make_service, mock_storage, mock_llm):
+    cache = SemanticAnswerCache(threshold=0.9)
+    service = make_service(answer_cache=cache)
+    chunk = DocumentChunk(id="hr_1", content="Remote on Tuesdays", metadata={"source": "hr.pdf"})
+    mock_storage.search.return_value = [SearchResult(chunk=chunk, score=0.1)]
+    mock_llm.generate_embeddings.return_value = [1.0, 0.0]
+    mock_llm.generate_embeddings_batch.side_effect = lambda texts: [[0.0, 1.0] for _ in texts]
+    
+    async def generate_during_ingest(query, context):
+        await service.ingest_documents([DocumentChunk(id="it_1", content="x", metadata={"source": "it.pdf"})])
+        return "Tuesdays."
+    
+    mock_llm.generate_answer.side_effect = generate_during_ingest
+    await service.answer_query("When can I work from home?")
+    
+    assert len(cache) == 1
+    # A token older than every remembered invalidation, or one before a clear, is never trusted
+    stale = cache.generation
+    cache.clear()
+    cache.store([1.0, 0.0], LLMResponse(answer="Tuesdays.", sources=[chunk]), stale)
+    assert len(cache) == 0
+
+@pytest.mark.asyncio
+async def test_process_file_upload_pipelines_batches(rag_service, mock_doc_processor, mock_llm, mock_storage):
+    mock_doc_processor.extract_text.return_value = "A" * 2500
+    mock_llm.generate_embeddings.return_value = [0.1]
+    rag_service._ingest_batch_size = 3
+    progress = IngestionProgress()
+    
+    result = await rag_service.process_file_upload(
+        b"ignored", "big.txt", progress=progress, chunking=ChunkingOptions(chunk_size=500, overlap=0)
+    )
+    
+    assert result.chunks_ingested == 5
+    assert [len(call.args[0]) for call in mock_storage.upsert.call_args_list] == [3, 2]
+    assert progress.chunks_upserted == 5
+    indices = [c.metadata["chunk_index"] for call in mock_storage.upsert.call_args_list for c in call.args[0]]
+    assert indices == [0, 1, 2, 3, 4]
+
+@pytest.mark.asyncio
+async def test_reupload_only_embeds_changed_chunks(make_service, manifest, mock_storage, mock_llm, mock_doc_processor):
+    service = make_service(default_chunking=TEN_CHARS, manifest=manifest)
+    mock_llm.generate_embeddings.return_value = [0.1]
+    mock_doc_processor.extract_text.return_value = "aaaaaaaaaabbbbbbbbbbccccccccccaaaaaaaaaa"
+    
+    first = await service.process_file_upload(b"v1", "policy.txt")
+    ids = [c.id for c in mock_storage.upsert.call_args.args[0]]
+    
+    assert (first.chunks_added, first.chunks_kept, first.chunks_removed) == (4, 0, 0)
+    # Identical chunks get distinct, stable ids
+    assert ids == [
+        chunk_id_for("policy.txt", "aaaaaaaaaa"),
+        chunk_id_for("policy.txt", "bbbbbbbbbb"),
+        chunk_id_for("policy.txt", "cccccccccc"),
+        chunk_id_for("policy.txt", "aaaaaaaaaa", 1),
+    ]
+    
+    # Drop the "b" chunk and add a new one at the end
+    mock_storage.upsert.reset_mock()
+    mock_llm.generate_embeddings_batch.reset_mock()
+    mock_doc_processor.extract_text.return_value = "aaaaaaaaaaccccccccccaaaaaaaaaadddddddddd"
+    second = await service.process_file_upload(b"v2", "policy.txt")
+    
+    assert (second.chunks_ingested, second.chunks_added, second.chunks_kept, second.chunks_removed) == (4, 1, 3, 1)
+    mock_llm.generate_embeddings_batch.assert_called_once_with(["dddddddddd"])
+    mock_storage.delete.assert_called_once_with([chunk_id_for("policy.txt", "bbbbbbbbbb")])
+    moved = mock_storage.update_metadata.call_args.args[0]
+    assert [(c.content, c.metadata["chunk_index"]) for c in moved] == [("cccccccccc", 1), ("aaaaaaaaaa", 2)]
+    
+    # An unchanged re-upload does no work at all
+    mock_storage.reset_mock()
+    third = await service.process_file_upload(b"v2", "policy.txt")
+    
+    assert (third.chunks_added, third.chunks_kept, third.chunks_removed) == (0, 4, 0)
+    mock_storage.upsert.assert_not_called()
+    mock_storage.update_metadata.assert_not_called()
+    
+    # Deleting the source removes it with one filtered delete
+    assert [(s.source, s.chunks) for s in await service.list_sources()] == [("policy.txt", 4)]
+    assert await service.delete_source("policy.txt") == 4
+    mock_storage.delete_where.assert_called_once_with({"source": "policy.txt"})
+    assert await service.list_sources() == []
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("strategy, added, kept", [("recursive", 1, 18), ("character", 13, 4)])
+async def test_reupload_after_a_paragraph_edit(make_service, manifest, mock_llm, mock_doc_processor, strategy, added, kept):
+    service = make_service(default_chunking=ChunkingOptions(strategy=strategy), manifest=manifest)
+    mock_llm.generate_embeddings.return_value = [0.1]
+    paragraphs = [" ".join(f"Sentence {j} of paragraph {i}." for j in range(12)) for i in range(40)]
+    mock_doc_processor.extract_text.return_value = "\n\n".join(paragraphs)
+    await service.process_file_upload(b"v1", "handbook.txt")
+    
+    paragraphs[10] += " One added sentence."
+    mock_doc_processor.extract_text.return_value = "\n\n".join(paragraphs)
+    second = await service.process_file_upload(b"v2", "handbook.txt")
+    
+    # Recursive boundaries follow the text, so only the edited chunk is new;
+    # fixed character windows all shift after the edit
+    assert (second.chunks_added, second.chunks_kept) == (added, kept)
+
+@pytest.mark.asyncio
+async def test_moved_chunks_invalidate_cached_answers(make_service, manifest, mock_storage, mock_llm, mock_doc_processor):
+    cache = SemanticAnswerCache(threshold=0.9)
+    service = make_service(answer_cache=cache, default_chunking=TEN_CHARS, manifest=manifest)
+    mock_llm.generate_embeddings.return_value = [0.1]
+    mock_doc_processor.extract_text.return_value = "aaaaaaaaaabbbbbbbbbb"
+    await service.process_file_upload(b"v1", "policy.txt")
+    cited = DocumentChunk(
+        id=chunk_id_for("policy.txt", "bbbbbbbbbb"), content="bbbbbbbbbb", metadata={"source": "policy.txt", "chunk_index": 1}
+    )
+    cache.store([1.0, 0.0], LLMResponse(answer="b", sources=[cited]))
+    
+    # "b" moves to chunk_index 0 without new chunks being stored
+    mock_doc_processor.extract_text.return_value = "bbbbbbbbbb"
+    await service.process_file_upload(b"v2", "policy.txt")
+    
+    assert mock_storage.update_metadata.call_args.args[0][0].id == cited.id
+    assert len(cache) == 0
+
+@pytest.mark.asyncio
+async def test_concurrent_uploads_of_a_source_run_one_at_a_time(make_service, manifest, mock_storage, mock_llm, mock_doc_processor):
+    locks = KeyedLock()
+    services = [make_service(default_chunking=TEN_CHARS, manifest=manifest, source_locks=locks) for _ in range(2)]
+    mock_llm.generate_embeddings.return_value = [0.1]
+    mock_doc_processor.extract_text.side_effect = lambda file, filename: file.read().decode()
+    
+    await asyncio.gather(
+        services[0].process_file_upload(b"aaaaaaaaaabbbbbbbbbb", "policy.txt"),
+        services[1].process_file_upload(b"aaaaaaaaaacccccccccc", "policy.txt"),
+    )
+    
+    # The second upload saw the first one's chunks and removed the one it no longer has
+    mock_storage.delete.assert_called_once_with([chunk_id_for("policy.txt", "bbbbbbbbbb")])
+    assert set(await manifest.get("policy.txt")) == {
+        chunk_id_for("policy.txt", "aaaaaaaaaa"), chunk_id_for("policy.txt", "cccccccccc")
+    }
+    assert len(locks) == 0
+
+@pytest.mark.asyncio
+async def test_chunks_of_a_failed_upload_are_removed_by_the_next(make_service, manifest, mock_storage, mock_llm, mock_doc_processor):
+    service = make_service(ingest_batch_size=1, default_chunking=TEN_CHARS, manifest=manifest)
+    mock_llm.generate_embeddings.return_value = [0.1]
+    mock_doc_processor.extract_text.return_value = "aaaaaaaaaabbbbbbbbbb"
+    mock_storage.upsert.side_effect = [None, RuntimeError("store unavailable")]
+    
+    with pytest.raises(ExternalServiceError):
+        await service.process_file_upload(b"v1", "policy.txt")
+    # The batch that was stored is recorded
+    assert list(await manifest.get("policy.txt")) == [chunk_id_for("policy.txt", "aaaaaaaaaa")]
+    
+    mock_storage.upsert.side_effect = None
+    mock_doc_processor.extract_text.return_value = "cccccccccc"
+    await service.process_file_upload(b"v2", "policy.txt")
+    
+    mock_storage.delete.assert_called_once_with([chunk_id_for("policy.txt", "aaaaaaaaaa")])
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_queries_are_coalesced(make_service, mock_storage, mock_llm):
+    flight = SingleFlight("answer_query")
+    services = [make_service(query_flight=flight) for _ in range(3)]
+    mock_llm.generate_embeddings.return_value = [0.1]
+    mock_storage.search.return_value = []
+    
+    async def slow_answer(query, chunks):
+        await asyncio.sleep(0.01)
+        return "Tuesdays"
+    
+    mock_llm.generate_answer.side_effect = slow_answer
+    
+    responses = await asyncio.gather(*(service.answer_query("When is payday?") for service in services))
+    
+    assert [r.answer for r in responses] == ["Tuesdays"] * 3
+    assert mock_llm.generate_answer.await_count == 1
+    assert mock_llm.generate_embeddings.await_count == 1
+
+@pytest.mark.asyncio
+async def test_ingest_stream_overlaps_stages_and_acks_in_order(rag_service, mock_llm, mock_storage):
+    events = []
+
+    async def embed(texts):
+        events.append(("embed", texts[0]))
+        await asyncio.sleep(0.01)
+        if texts[0] == "c2":
+            raise Exception("API Down")
+        return [[1.0] for _ in texts]
+
+    async def upsert(chunks):
+        events.append(("upsert", chunks[0].content))
+        await asyncio.sleep(0.01)
+
+    mock_llm.generate_embeddings_batch.side_effect = embed
+    mock_storage.upsert.side_effect = upsert
+
+    async def chunks():
+        for i in range(7):
+            yield DocumentChunk(id=f"id{i}", content=f"c{i}")
+
+    acks = [ack async for ack in rag_service.ingest_stream(chunks(), batch_size=2, max_in_flight=2)]
+
+    assert [(ack.batch, ack.status, ack.ids) for ack in acks] == [
+        (0, "ok", ["id0", "id1"]),
+        (1, "error", ["id2", "id3"]),
+        (2, "ok", ["id4", "id5"]),
+        (3, "ok", ["id6"]),
+    ]
+    assert "API Down" in acks[1].error
+    # Batch 1 was being embedded before batch 0 was stored, and upserts kept the input order
+    assert events.index(("embed", "c2")) < events.index(("upsert", "c0"))
+    assert [content for stage, content in events if stage == "upsert"] == ["c0", "c4", "c6"]
+
+@pytest.mark.asyncio
+async def test_closing_ingest_stream_waits_for_cancelled_batches(rag_service, mock_llm):
+    cancelled = []
+
+    async def embed(texts):
+        if texts[0] == "c0":
+            return [[1.0] for _ in texts]
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(texts[0])
+            raise
+
+    mock_llm.generate_embeddings_batch.side_effect = embed
+
+    async def chunks():
+        for i in range(4):
+            yield DocumentChunk(id=f"id{i}", content=f"c{i}")
+
+    acks = rag_service.ingest_stream(chunks(), batch_size=1, max_in_flight=2)
+    assert (await anext(acks)).status == "ok"
+    await acks.aclose()
+
+    assert cancelled == ["c1"]
+
+@pytest.mark.asyncio
+async def test_ingested_chunks_are_listed_by_source(make_service, manifest, mock_llm):
+    service = make_service(manifest=manifest)
+    mock_llm.generate_embeddings.return_value = [0.1]
+
+    async def chunks():
+        yield DocumentChunk(id="s1", content="streamed", metadata={"source": "feed.json"})
+
+    await service.ingest_documents([
+        DocumentChunk(id="d1", content="one", metadata={"source": "notes.md", "chunk_index": 0}),
+        DocumentChunk(id="d2", content="two", metadata={"source": "notes.md"}),
+        DocumentChunk(id="d3", content="no source"),
+    ])
+    [ack] = [ack async for ack in service.ingest_stream(chunks())]
+    
+    assert ack.status == "ok"
+    assert [(s.source, s.chunks) for s in await service.list_sources()] == [("feed.json", 1), ("notes.md", 2)]
+    assert await manifest.get("notes.md") == {"d1": 0, "d2": -1}
+    
+    await service.delete_source("notes.md")
+    
+    assert [s.source for s in await service.list_sources()] == ["feed.json"]
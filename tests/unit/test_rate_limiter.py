@@ -0,0 +1,61 @@
+import asyncio
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.adapters.rate_limiter import RateLimiter, retry_after_seconds
+from src.core.priority import background_priority
+
+@pytest.mark.asyncio
+async def test_interactive_calls_overtake_queued_background_calls():
+    # 1200 RPM: a burst of 100 requests, then one every 50 ms
+    limiter = RateLimiter("test", requests_per_minute=1200)
+    for _ in range(100):
+        await limiter.acquire()
+    admitted = []
+
+    async def call(name):
+        await limiter.acquire()
+        admitted.append(name)
+
+    with background_priority():
+        background = [asyncio.ensure_future(call(f"background {i}")) for i in range(2)]
+    await asyncio.sleep(0)
+    interactive = asyncio.ensure_future(call("interactive"))
+    await asyncio.gather(*background, interactive)
+    
+    assert admitted == ["interactive", "background 0", "background 1"]
+
+@pytest.mark.asyncio
+async def test_rate_limit_pauses_all_callers_and_lowers_the_rate():
+    limiter = RateLimiter("test", requests_per_minute=6000, tokens_per_minute=60_000)
+    
+    limiter.on_rate_limited(retry_after=0.05)
+    started = asyncio.get_running_loop().time()
+    await asyncio.gather(limiter.acquire(tokens=10), limiter.acquire(tokens=10))
+    
+    assert asyncio.get_running_loop().time() - started >= 0.045
+    assert limiter.scale == 0.5
+    limiter.on_success()
+    assert limiter.scale == pytest.approx(0.52)
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_block_the_queue():
+    limiter = RateLimiter("test", requests_per_minute=1200)
+    for _ in range(100):
+        await limiter.acquire()
+    
+    waiter = asyncio.ensure_future(limiter.acquire())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    await asyncio.wait_for(limiter.acquire(), timeout=1)
+    assert limiter.waiting == 0
+
+def test_retry_after_parsing():
+    assert retry_after_seconds({"retry-after-ms": "250"}) == 0.25
+    assert retry_after_seconds({"retry-after": "3"}) == 3.0
+    date = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert 25 < retry_after_seconds({"retry-after": date}) <= 30
+    assert retry_after_seconds({"retry-after": "soon"}) is None
+    assert retry_after_seconds({}) is None
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock
+from src.adapters.numpy_adapter import NumpyAdapter
+from src.adapters.sharded_storage_adapter import ShardedVectorStore
+from src.config import Settings
+from src.core.domain import DocumentChunk, DocumentSource, SearchQuery
+from src.core.exceptions import EntityNotFoundError
+from src.core.rag_service import RAGService
+
+def _store(path):
+    return NumpyAdapter(Settings(OPENAI_API_KEY="test", NUMPY_STORE_DIRECTORY=str(path)))
+
+def _sharded(tmp_path, count=3):
+    return ShardedVectorStore([_store(tmp_path / f"shard{i}") for i in range(count)])
+
+def _corpus(rows=60, dim=8):
+    vectors = np.random.default_rng(0).standard_normal((rows, dim)).astype(np.float32)
+    return [
+        DocumentChunk(id=f"c{i}", content=f"chunk {i}", metadata={"source": f"doc{i % 12}.txt"}, embedding=vector)
+        for i, vector in enumerate(vectors)
+    ]
+
+@pytest.mark.asyncio
+async def test_merged_top_k_matches_a_single_store(tmp_path):
+    single, sharded = _store(tmp_path / "single"), _sharded(tmp_path)
+    chunks = _corpus()
+    await single.upsert(chunks)
+    await sharded.upsert(chunks)
+    queries = [
+        SearchQuery(query="q", embedding=vector, top_k=k)
+        for k, vector in zip([1, 5, 10], np.random.default_rng(1).standard_normal((3, 8)))
+    ] + [SearchQuery(query="q", embedding=chunks[7].embedding, top_k=3, filters={"source": "doc7.txt"})]
+    
+    expected = [[r.chunk.id for r in await single.search(query)] for query in queries]
+    
+    assert [[r.chunk.id for r in await sharded.search(query)] for query in queries] == expected
+    assert [[r.chunk.id for r in found] for found in await sharded.search_many(queries)] == expected
+    # Every source lives in one shard
+    for chunk in chunks:
+        owner = sharded.shard_for_source(chunk.metadata["source"])
+        query = SearchQuery(query="q", embedding=chunk.embedding, top_k=1)
+        assert [r.chunk.id for r in await sharded.shards[owner].search(query)] == [chunk.id]
+
+@pytest.mark.asyncio
+async def test_clear_shard_keeps_other_shards(tmp_path, mock_llm, mock_doc_processor):
+    store = _sharded(tmp_path)
+    chunks = _corpus()
+    await store.upsert(chunks)
+    sources = sorted({chunk.metadata["source"] for chunk in chunks})
+    manifest = AsyncMock()
+    manifest.list_sources.return_value = [DocumentSource(source=source, chunks=5) for source in sources]
+    service = RAGService(storage=store, llm=mock_llm, doc_processor=mock_doc_processor, manifest=manifest)
+    
+    cleared = await service.clear_shard(1)
+    
+    assert cleared and cleared == [source for source in sources if store.shard_for_source(source) == 1]
+    assert [call.args[0] for call in manifest.remove_source.call_args_list] == cleared
+    remaining = await store.search(SearchQuery(query="q", embedding=[1.0] * 8, top_k=len(chunks)))
+    assert {r.chunk.metadata["source"] for r in remaining} == set(sources) - set(cleared)
+    with pytest.raises(EntityNotFoundError):
+        await service.clear_shard(3)
+
+@pytest.mark.asyncio
+async def test_clear_shard_requires_a_sharded_store(rag_service):
+    with pytest.raises(EntityNotFoundError):
+        await rag_service.clear_shard(0)
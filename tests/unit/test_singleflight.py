@@ -0,0 +1,98 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+from src.adapters.coalescing_llm_adapter import CoalescingLLMAdapter
+from src.core.metrics import COALESCED_CALLS
+from src.core.singleflight import SingleFlight
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight("test_share")
+    calls = 0
+    
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+    
+    results = await asyncio.gather(*(flight.do("q", work) for _ in range(5)))
+    
+    assert results == [1] * 5
+    assert COALESCED_CALLS.value(operation="test_share") == 4
+    assert flight.in_flight == 0
+    # Finished calls are not reused
+    assert await flight.do("q", work) == 2
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_waiter():
+    flight = SingleFlight("test_errors")
+    
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream down")
+    
+    results = await asyncio.gather(*(flight.do("q", fail) for _ in range(3)), return_exceptions=True)
+    
+    assert [type(r) for r in results] == [ValueError] * 3
+    assert flight.in_flight == 0
+
+@pytest.mark.asyncio
+async def test_cancelling_one_waiter_keeps_the_call_for_others():
+    flight = SingleFlight("test_cancel")
+    started = asyncio.Event()
+    release = asyncio.Event()
+    
+    async def work():
+        started.set()
+        await release.wait()
+        return "done"
+    
+    first = asyncio.create_task(flight.do("q", work))
+    second = asyncio.create_task(flight.do("q", work))
+    await started.wait()
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+    
+    assert await second == "done"
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+@pytest.mark.asyncio
+async def test_call_is_cancelled_once_every_waiter_is_gone():
+    flight = SingleFlight("test_abandon")
+    cancelled = asyncio.Event()
+    
+    async def work():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+    
+    waiters = [asyncio.create_task(flight.do("q", work)) for _ in range(2)]
+    await asyncio.sleep(0)
+    for waiter in waiters:
+        waiter.cancel()
+    await asyncio.gather(*waiters, return_exceptions=True)
+    
+    await asyncio.wait_for(cancelled.wait(), 1)
+    await asyncio.sleep(0)
+    assert flight.in_flight == 0
+
+@pytest.mark.asyncio
+async def test_coalescing_adapter_shares_identical_embeddings(mock_llm):
+    async def embed(text):
+        await asyncio.sleep(0.01)
+        return [float(len(text))]
+    
+    mock_llm.generate_embeddings = AsyncMock(side_effect=embed)
+    adapter = CoalescingLLMAdapter(mock_llm)
+    
+    results = await asyncio.gather(
+        adapter.generate_embeddings("same"), adapter.generate_embeddings("same"), adapter.generate_embeddings("other")
+    )
+    
+    assert results == [[4.0], [4.0], [5.0]]
+    assert mock_llm.generate_embeddings.await_count == 2